@@ -0,0 +1,159 @@
+import argparse
+import asyncio
+import datetime
+import gc
+import json
+import os
+import platform
+import sys
+import tracemalloc
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from igloo import Client  # noqa: E402
+from igloo.models.access_token import AccessToken  # noqa: E402
+from igloo.models.boolean_variable import BooleanVariable  # noqa: E402
+from igloo.models.category_series_node import CategorySeriesNode  # noqa: E402
+from igloo.models.category_series_variable import CategorySeriesVariable  # noqa: E402
+from igloo.models.environment import Environment  # noqa: E402
+from igloo.models.file_variable import FileVariable  # noqa: E402
+from igloo.models.float_series_node import FloatSeriesNode  # noqa: E402
+from igloo.models.float_series_variable import FloatSeriesVariable  # noqa: E402
+from igloo.models.float_variable import FloatVariable  # noqa: E402
+from igloo.models.notification import Notification  # noqa: E402
+from igloo.models.pending_share import PendingShare  # noqa: E402
+from igloo.models.pending_transfer import PendingTransfer  # noqa: E402
+from igloo.models.string_variable import StringVariable  # noqa: E402
+from igloo.models.thing import Thing  # noqa: E402
+from igloo.models.user import User  # noqa: E402
+from igloo.testing import StandInServer, Store, seed  # noqa: E402
+
+# Measures the memory held by model objects: bytes per instance of each
+# model class, created directly on a sync and on an async client, and per
+# node of a materialized FloatSeriesNodeList slice. Bytes are those still
+# allocated while the objects are alive, the list holding them included.
+#
+#     python benchmarks/memory.py --output before.json
+#     python benchmarks/memory.py --compare before.json
+
+MODELS = [AccessToken, BooleanVariable, CategorySeriesNode, CategorySeriesVariable, Environment,
+          FileVariable, FloatSeriesNode, FloatSeriesVariable, FloatVariable, Notification,
+          PendingShare, PendingTransfer, StringVariable, Thing, User]
+
+
+def _version():
+    try:
+        from importlib.metadata import version
+        return version("igloo_python")
+    except Exception:
+        return "unknown"
+
+
+def measure(create, count):
+    # (bytes retained per object, peak bytes per object)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        start, _ = tracemalloc.get_traced_memory()
+        objects = create()
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert len(objects) == count
+    del objects
+    return (current - start) / count, (peak - start) / count
+
+
+def _result(mode, count, measured):
+    per_instance, peak = measured
+    return {"mode": mode, "instances": count,
+            "bytes_per_instance": round(per_instance, 1),
+            "peak_bytes_per_instance": round(peak, 1)}
+
+
+def model_instances(model, count):
+    # no identity map, so every object is a new one
+    ids = [str(uuid.uuid4()) for _ in range(count)]
+    client = Client("benchmark", identity_map=False)
+    results = {"sync": _result("sync", count, measure(lambda: [model(client, id) for id in ids], count))}
+
+    async def create_async():
+        async_client = Client("benchmark", asynchronous=True, identity_map=False)
+        return measure(lambda: [model(async_client, id) for id in ids], count)
+
+    results["async"] = _result("async", count, asyncio.run(create_async()))
+    return results
+
+
+def float_series_nodes_slice(count):
+    store = seed(Store(), environments=1, things=1, variables=1, nodes=count)
+    with StandInServer(store) as server:
+        client = server.client()
+        series = FloatSeriesVariable(client, store.find("FloatSeriesVariable")[0]["id"])
+        try:
+            return _result("sync", count, measure(lambda: series.nodes[0:count], count))
+        finally:
+            client.close()
+
+
+def run(instances=10000, nodes=10000, only=None):
+    results = {}
+    for model in MODELS:
+        name = model.__name__
+        if only and not any(pattern in name for pattern in only):
+            continue
+        for mode, result in model_instances(model, instances).items():
+            results["{}_{}".format(name, mode)] = result
+
+    if not only or any(pattern in "float_series_nodes_slice" for pattern in only):
+        results["float_series_nodes_slice"] = float_series_nodes_slice(nodes)
+
+    return {"version": _version(),
+            "python": platform.python_version(),
+            "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "config": {"instances": instances, "nodes": nodes},
+            "results": results}
+
+
+def compare(old, new):
+    lines = []
+    for name, result in new["results"].items():
+        previous = old["results"].get(name)
+        if previous is None:
+            lines.append("{:<36} new".format(name))
+            continue
+
+        before, after = previous["bytes_per_instance"], result["bytes_per_instance"]
+        ratio = after / before if before else float("inf")
+        lines.append("{:<36} {:.0f} -> {:.0f} bytes per instance ({:+.0%})".format(name, before, after, ratio - 1))
+
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Memory held by model objects")
+    parser.add_argument("--output", "-o", help="write the JSON report to this file instead of stdout")
+    parser.add_argument("--compare", help="a previous report to compare the results with")
+    parser.add_argument("--instances", type=int, default=10000, help="objects created per model class")
+    parser.add_argument("--nodes", type=int, default=10000, help="nodes in the FloatSeriesNodeList slice")
+    parser.add_argument("--only", action="append", help="only run scenarios whose name contains this")
+    args = parser.parse_args(argv)
+
+    report = run(args.instances, args.nodes, args.only)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+    if args.compare:
+        with open(args.compare) as f:
+            print(compare(json.load(f), report), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,287 @@
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from igloo.models.environment import Environment  # noqa: E402
+from igloo.models.float_series_variable import FloatSeriesVariable  # noqa: E402
+from igloo.models.thing import Thing  # noqa: E402
+from igloo.models.variable import FloatVariable  # noqa: E402
+from igloo.testing import StandInServer, Store, seed  # noqa: E402
+
+# Runs the common model access patterns against the stand-in server and
+# reports, for each one, the HTTP requests and GraphQL operations it took,
+# the bytes on the wire and the wall time.
+#
+#     python benchmarks/roundtrips.py --output before.json
+#     python benchmarks/roundtrips.py --compare before.json
+
+THING_FIELDS = ("name", "index", "online", "battery", "battery_charging", "signal",
+                "firmware", "muted", "starred", "type", "stored_notifications", "createdAt")
+
+
+def _version():
+    try:
+        from importlib.metadata import version
+        return version("igloo_python")
+    except Exception:
+        return "unknown"
+
+
+class Fixture:
+    def __init__(self, server):
+        self.server = server
+        store = server.store
+        self.environment_id = store.find("Environment")[0]["id"]
+        self.thing_ids = [t["id"] for t in sorted(store.find("Thing"), key=lambda t: t["index"])]
+        self.series_id = store.find("FloatSeriesVariable")[0]["id"]
+        self.variable_id = store.find("FloatVariable")[0]["id"]
+
+
+# scenarios take the fixture and a sync client, async scenarios an
+# asynchronous client and are awaited on a fresh loop
+
+def thing_properties_sync(fixture, client):
+    thing = Thing(client, fixture.thing_ids[0])
+    return [getattr(thing, field) for field in THING_FIELDS]
+
+
+async def thing_properties_async(fixture, client):
+    thing = Thing(client, fixture.thing_ids[0])
+    return await asyncio.gather(*[getattr(thing, field) for field in THING_FIELDS])
+
+
+def thing_properties_fetch(fixture, client):
+    thing = Thing(client, fixture.thing_ids[0]).fetch(*THING_FIELDS)
+    return [getattr(thing, field) for field in THING_FIELDS]
+
+
+def thing_properties_many_sync(fixture, client):
+    return [Thing(client, id).name for id in fixture.thing_ids]
+
+
+async def thing_properties_many_async(fixture, client):
+    return await asyncio.gather(*[Thing(client, id).name for id in fixture.thing_ids])
+
+
+def environment_things_iterate(fixture, client):
+    return [thing.name for thing in Environment(client, fixture.environment_id).things]
+
+
+def environment_things_slice(fixture, client):
+    return [thing.name for thing in Environment(client, fixture.environment_id).things[0:len(fixture.thing_ids)]]
+
+
+def environment_things_prefetch(fixture, client):
+    things = Environment(client, fixture.environment_id).things.prefetch(*THING_FIELDS)
+    return [[getattr(thing, field) for field in THING_FIELDS] for thing in things[0:len(fixture.thing_ids)]]
+
+
+def float_series_nodes_iterate(fixture, client):
+    return [node.value for node in FloatSeriesVariable(client, fixture.series_id).nodes]
+
+
+def float_series_nodes_slice(fixture, client):
+    nodes = FloatSeriesVariable(client, fixture.series_id).nodes
+    return [node.value for node in nodes[0:len(nodes)]]
+
+
+def thing_variables_hydrate(fixture, client):
+    variables = Thing(client, fixture.thing_ids[0]).variables
+    return [(variable.name, variable.index, variable.developer_only) for variable in variables[0:len(variables)]]
+
+
+def thing_variables_prefetch(fixture, client):
+    variables = Thing(client, fixture.thing_ids[0]).variables.prefetch("name", "index", "developer_only")
+    return [(variable.name, variable.index, variable.developer_only) for variable in variables[0:len(variables)]]
+
+
+def environment_things_variables(fixture, client):
+    things = Environment(client, fixture.environment_id).things
+    return [[variable.name for variable in thing.variables] for thing in things[0:len(things)]]
+
+
+def environment_things_variables_prefetch(fixture, client):
+    things = Environment(client, fixture.environment_id).things.prefetch("variables{name}")
+    return [[variable.name for variable in thing.variables] for thing in things[0:len(things)]]
+
+
+def mutations_create(fixture, client):
+    mutation_root = client.mutation_root
+    thing = mutation_root.create_thing("benchmark")
+    variable = mutation_root.create_float_variable("READ_WRITE", "benchmark", thing_id=thing.id, value=1.0)
+    notification = mutation_root.create_notification(thing.id, "benchmark")
+    return thing.id, variable.id, notification.id
+
+
+def mutations_update(fixture, client):
+    mutation_root = client.mutation_root
+    mutation_root.update_thing(fixture.thing_ids[-1], battery=50.0)
+    mutation_root.update_float_variable(fixture.variable_id, value=2.0)
+    thing = Thing(client, fixture.thing_ids[-1])
+    thing.name = "benchmark"
+    FloatVariable(client, fixture.variable_id).value = 3.0
+
+
+SCENARIOS = [
+    ("thing_properties_sync", thing_properties_sync, False),
+    ("thing_properties_async", thing_properties_async, True),
+    ("thing_properties_fetch", thing_properties_fetch, False),
+    ("thing_properties_many_sync", thing_properties_many_sync, False),
+    ("thing_properties_many_async", thing_properties_many_async, True),
+    ("environment_things_iterate", environment_things_iterate, False),
+    ("environment_things_slice", environment_things_slice, False),
+    ("environment_things_prefetch", environment_things_prefetch, False),
+    ("float_series_nodes_iterate", float_series_nodes_iterate, False),
+    ("float_series_nodes_slice", float_series_nodes_slice, False),
+    ("thing_variables_hydrate", thing_variables_hydrate, False),
+    ("thing_variables_prefetch", thing_variables_prefetch, False),
+    ("environment_things_variables", environment_things_variables, False),
+    ("environment_things_variables_prefetch", environment_things_variables_prefetch, False),
+    ("mutations_create", mutations_create, False),
+    ("mutations_update", mutations_update, False),
+]
+
+
+def _counters(server, client):
+    stats = client.stats.as_dict()
+    return {"requests": server.requests,
+            "operations": server.operations,
+            "bytes_sent": stats["bytes_sent"],
+            "bytes_received": stats["bytes_received"],
+            "wall_time": time.perf_counter()}
+
+
+def _delta(before, after):
+    return {key: after[key] - before[key] for key in before}
+
+
+def _run_sync(server, fixture, scenario, client_options):
+    # a new client per run, so nothing is cached between repeats
+    client = server.client(**client_options)
+    try:
+        before = _counters(server, client)
+        scenario(fixture, client)
+        return _delta(before, _counters(server, client))
+    finally:
+        client.close()
+
+
+async def _run_async(server, fixture, scenario, client_options):
+    client = server.client(asynchronous=True, **client_options)
+    try:
+        before = _counters(server, client)
+        await scenario(fixture, client)
+        return _delta(before, _counters(server, client))
+    finally:
+        await client.aclose()
+
+
+def run_scenario(server, fixture, scenario, is_async, repeats, client_options):
+    runs = []
+    for _ in range(repeats):
+        if is_async:
+            runs.append(asyncio.run(_run_async(server, fixture, scenario, client_options)))
+        else:
+            runs.append(_run_sync(server, fixture, scenario, client_options))
+
+    times = [run["wall_time"] for run in runs]
+    # round trips and bytes only vary with timing dependent batching, the
+    # worst run is reported so regressions are not hidden
+    return {"mode": "async" if is_async else "sync",
+            "requests": max(run["requests"] for run in runs),
+            "operations": max(run["operations"] for run in runs),
+            "bytes_sent": max(run["bytes_sent"] for run in runs),
+            "bytes_received": max(run["bytes_received"] for run in runs),
+            "wall_time": {"min": min(times),
+                          "median": statistics.median(times),
+                          "mean": statistics.mean(times)}}
+
+
+def run(repeats=5, latency=0.002, things=10, variables=4, nodes=50, only=None, client_options=None):
+    client_options = client_options or {}
+    store = seed(Store(), environments=1, things=things, variables=variables, nodes=nodes or 1)
+
+    results = {}
+    with StandInServer(store, latency=latency) as server:
+        fixture = Fixture(server)
+        for name, scenario, is_async in SCENARIOS:
+            if only and not any(pattern in name for pattern in only):
+                continue
+            results[name] = run_scenario(server, fixture, scenario, is_async, repeats, client_options)
+
+    return {"version": _version(),
+            "python": platform.python_version(),
+            "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "config": {"repeats": repeats, "latency": latency, "things": things,
+                       "variables": variables, "nodes": nodes, "client_options": client_options},
+            "results": results}
+
+
+def compare(old, new):
+    lines = []
+    for name, result in new["results"].items():
+        previous = old["results"].get(name)
+        if previous is None:
+            lines.append("{:<30} new".format(name))
+            continue
+
+        changes = []
+        for key in ("requests", "operations", "bytes_sent", "bytes_received"):
+            if result[key] != previous[key]:
+                changes.append("{} {} -> {}".format(key, previous[key], result[key]))
+
+        before, after = previous["wall_time"]["median"], result["wall_time"]["median"]
+        ratio = after / before if before else float("inf")
+        changes.append("median {:.1f}ms -> {:.1f}ms ({:+.0%})".format(before * 1000, after * 1000, ratio - 1))
+        lines.append("{:<30} {}".format(name, ", ".join(changes)))
+
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Round trip benchmarks against the stand-in server")
+    parser.add_argument("--output", "-o", help="write the JSON report to this file instead of stdout")
+    parser.add_argument("--compare", help="a previous report to compare the results with")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.002,
+                        help="seconds the stand-in server waits before answering each request")
+    parser.add_argument("--things", type=int, default=10)
+    parser.add_argument("--variables", type=int, default=4)
+    parser.add_argument("--nodes", type=int, default=50)
+    parser.add_argument("--only", action="append", help="only run scenarios whose name contains this")
+    parser.add_argument("--option", action="append", default=[], metavar="KEY=VALUE",
+                        help="Client keyword argument, the value is parsed as JSON, e.g. batch_interval=0.005")
+    args = parser.parse_args(argv)
+
+    client_options = {}
+    for option in args.option:
+        key, _, value = option.partition("=")
+        try:
+            client_options[key] = json.loads(value)
+        except ValueError:
+            client_options[key] = value
+
+    report = run(args.repeats, args.latency, args.things, args.variables, args.nodes, args.only, client_options)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+    if args.compare:
+        with open(args.compare) as f:
+            print(compare(json.load(f), report), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
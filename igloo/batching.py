@@ -0,0 +1,253 @@
+import asyncio
+import time
+from igloo.instrumentation import loader_batch_size
+
+
+class BatchedResult:
+    def __init__(self, batch):
+        self._batch = batch
+        self._done = False
+        self._value = None
+        self._exception = None
+
+    def _set_result(self, value):
+        self._value = value
+        self._done = True
+
+    def _set_exception(self, exception):
+        self._exception = exception
+        self._done = True
+
+    def done(self):
+        return self._done
+
+    def result(self):
+        # asking for a result before the block exits sends what is pending
+        if not self._done:
+            self._batch.flush()
+
+        if self._exception is not None:
+            raise self._exception
+
+        return self._value
+
+    def __getitem__(self, key):
+        # code that looks into the result needs it now, like result()
+        return self.result()[key]
+
+    def then(self, fn):
+        # a result for fn(value), computed once the batch has been sent
+        return ChainedResult(self, fn)
+
+
+class ChainedResult(BatchedResult):
+    def __init__(self, source, fn):
+        super().__init__(source._batch)
+        self._source = source
+        self._fn = fn
+
+    def done(self):
+        return self._source.done()
+
+    def result(self):
+        if not self._done:
+            try:
+                self._set_result(self._fn(self._source.result()))
+            except Exception as e:
+                self._set_exception(e)
+
+        return super().result()
+
+
+class SyncBatch:
+    def __init__(self, send, max_batch_size=20, max_batch_wait=None):
+        # send takes a list of (query, variables, keys) and the matching
+        # request events (None when nobody observes them), and returns one
+        # (value, exception) pair per operation
+        self._send = send
+        self.max_batch_size = max_batch_size
+        self.max_batch_wait = max_batch_wait
+        self._pending = []
+        self._opened_at = None
+
+    def add(self, query, variables, keys, event=None):
+        if self._pending and self.max_batch_wait is not None and \
+                time.monotonic() - self._opened_at >= self.max_batch_wait:
+            self.flush()
+
+        result = BatchedResult(self)
+        if not self._pending:
+            self._opened_at = time.monotonic()
+        self._pending.append(((query, variables, keys), result, event))
+
+        if len(self._pending) >= self.max_batch_size:
+            self.flush()
+
+        return result
+
+    def flush(self):
+        pending, self._pending = self._pending, []
+        if not pending:
+            return
+
+        try:
+            outcomes = self._send([operation for operation, _, _ in pending],
+                                  [event for _, _, event in pending])
+        except Exception as e:
+            for _, result, _ in pending:
+                result._set_exception(e)
+            return
+
+        for (_, result, _), (value, exception) in zip(pending, outcomes):
+            if exception is not None:
+                result._set_exception(exception)
+            else:
+                result._set_result(value)
+
+
+class AsyncBatcher:
+    def __init__(self, send, batch_interval=0.005, max_batch_size=20):
+        # send is a coroutine function with the same contract as SyncBatch's
+        self._send = send
+        self.batch_interval = batch_interval
+        self.max_batch_size = max_batch_size
+        self._pending = []
+        self._handle = None
+        self.loop = asyncio.get_running_loop()
+
+    async def submit(self, query, variables, keys, event=None):
+        future = self.loop.create_future()
+        self._pending.append(((query, variables, keys), future, event))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._handle is None:
+            self._handle = self.loop.call_later(
+                self.batch_interval, self._flush)
+
+        return await future
+
+    def _flush(self):
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+
+        pending, self._pending = self._pending, []
+        if pending:
+            self.loop.create_task(self._dispatch(pending))
+
+    async def _dispatch(self, pending):
+        try:
+            outcomes = await self._send([operation for operation, _, _ in pending],
+                                        [event for _, _, event in pending])
+        except Exception as e:
+            for _, future, _ in pending:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future, _), (value, exception) in zip(pending, outcomes):
+            if future.done():
+                continue
+            elif exception is not None:
+                future.set_exception(exception)
+            else:
+                future.set_result(value)
+
+
+class BatchContext:
+    def __init__(self, client, max_batch_size=None, max_batch_wait=None):
+        self.client = client
+        self.max_batch_size = max_batch_size or client.max_batch_size
+        self.max_batch_wait = max_batch_wait
+        self.batch = None
+
+    def __enter__(self):
+        self.batch = SyncBatch(self.client._sync_batch_query,
+                               max_batch_size=self.max_batch_size,
+                               max_batch_wait=self.max_batch_wait)
+        self._previous = getattr(self.client._local, "batch", None)
+        self.client._local.batch = self.batch
+        return self.batch
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.client._local.batch = self._previous
+        self.batch.flush()
+
+
+def merged_query(entries):
+    # one aliased document for several objects, each entry is
+    # ((root field, id), fields): t0:thing(id:$v0){name} t1:floatVariable(...)
+    definitions = []
+    selections = []
+    variables = {}
+    for i, ((root, id), fields) in enumerate(entries):
+        definitions.append("$v%d:ID!" % i)
+        selections.append("t%d:%s(id:$v%d){%s}" % (i, root, i, " ".join(sorted(fields))))
+        variables["v%d" % i] = id
+
+    return "query(%s){%s}" % (",".join(definitions), " ".join(selections)), variables
+
+
+class TickBatcher:
+    def __init__(self, send, max_batch_size=100, split_on=()):
+        # send is a coroutine function taking a query and its variables and
+        # returning the data, loads made in the same loop iteration are sent
+        # together, max_batch_size objects per document
+        self._send = send
+        self.max_batch_size = max_batch_size
+        self.split_on = split_on
+        self._pending = {}
+        self._scheduled = False
+        self.loop = asyncio.get_running_loop()
+
+    def load(self, root, id, fields):
+        # loads of the same object from different instances share the entry
+        entry = self._pending.get((root, id))
+        if entry is None:
+            entry = self._pending[(root, id)] = (set(), [])
+        entry[0].update(fields)
+
+        future = self.loop.create_future()
+        entry[1].append(future)
+
+        # every DataLoader dispatching in this iteration runs before this
+        if not self._scheduled:
+            self._scheduled = True
+            self.loop.call_soon(self._flush)
+
+        return future
+
+    def _flush(self):
+        self._scheduled = False
+        pending, self._pending = list(self._pending.items()), {}
+        for start in range(0, len(pending), self.max_batch_size):
+            self.loop.create_task(self._dispatch(pending[start:start + self.max_batch_size]))
+
+    async def _dispatch(self, entries):
+        loader_batch_size.set(sum(len(fields) for _, (fields, _) in entries))
+        query, variables = merged_query([(key, fields) for key, (fields, _) in entries])
+        try:
+            data = await self._send(query, variables)
+        except self.split_on as e:
+            if len(entries) > 1:
+                # one missing object fails the whole document, so each
+                # one is asked for again on its own
+                await asyncio.gather(*[self._dispatch([entry]) for entry in entries])
+                return
+            self._set_exception(entries, e)
+            return
+        except Exception as e:
+            self._set_exception(entries, e)
+            return
+
+        for i, (_, (_, futures)) in enumerate(entries):
+            for future in futures:
+                if not future.done():
+                    future.set_result(data["t%d" % i])
+
+    def _set_exception(self, entries, exception):
+        for _, (_, futures) in entries:
+            for future in futures:
+                if not future.done():
+                    future.set_exception(exception)
@@ -0,0 +1,50 @@
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class JSONCodec:
+    name = "json"
+
+    def dumps(self, obj):
+        return json.dumps(obj).encode("utf-8")
+
+    def loads(self, data):
+        # json.loads detects the encoding of bytes by itself
+        return json.loads(data)
+
+
+class OrjsonCodec:
+    name = "orjson"
+
+    def __init__(self):
+        if orjson is None:
+            raise ImportError(
+                "orjson is not installed, install it with `pip install igloo-python[fast]`")
+
+    def dumps(self, obj):
+        return orjson.dumps(obj)
+
+    def loads(self, data):
+        return orjson.loads(data)
+
+
+codecs = {
+    "json": JSONCodec,
+    "orjson": OrjsonCodec,
+}
+
+
+def get_codec(codec=None):
+    # without an explicit choice use the fastest backend that is installed
+    if codec is None:
+        return OrjsonCodec() if orjson is not None else JSONCodec()
+    elif isinstance(codec, str):
+        if codec not in codecs:
+            raise ValueError("Unknown JSON codec: {}".format(codec))
+        return codecs[codec]()
+
+    return codec
@@ -0,0 +1,113 @@
+import asyncio
+import collections
+from igloo.instrumentation import Observer
+
+# the fields patched from each update, everything else the object had in
+# the cache is dropped since the message doesn't say what changed; the
+# objects of the identity map forget what they read of it too
+THING_UPDATED = 'subscription{thingUpdated{id name index type online signal battery batteryCharging firmware}}'
+ENVIRONMENT_UPDATED = 'subscription{environmentUpdated{id name index picture}}'
+VARIABLE_UPDATED = 'subscription{variableUpdated{id __typename name index}}'
+FLOAT_SERIES_NODE_CREATED = 'subscription{floatSeriesNodeCreated{id value timestamp series{id}}}'
+FLOAT_SERIES_NODE_DELETED = 'subscription{floatSeriesNodeDeleted}'
+
+# what a new or deleted node changes on its series
+SERIES_FIELDS = {"lastNode", "nodeCount", "nodes", "updatedAt"}
+
+
+class CacheCoherence(Observer):
+    def __init__(self, client, cache=None):
+        # keeps cache (the client's field cache by default) up to date with
+        # the update subscriptions, so its fields can be kept forever
+        self.client = client
+        self.cache = cache if cache is not None else client.field_cache
+        if self.cache is None:
+            raise Exception("Cache coherence needs a client with a field_cache")
+
+        self.streams = {THING_UPDATED: self._thing_updated,
+                        ENVIRONMENT_UPDATED: self._environment_updated,
+                        VARIABLE_UPDATED: self._variable_updated,
+                        FLOAT_SERIES_NODE_CREATED: self._float_series_node_created,
+                        FLOAT_SERIES_NODE_DELETED: self._float_series_node_deleted}
+        self.messages = collections.Counter()
+        self._future = None
+
+    def _forget(self, id=None, typename=None):
+        # the snapshots and DataLoaders of the mapped objects with that id,
+        # or of every one of typename, are served before the field cache
+        identity_map = self.client.identity_map
+        if identity_map is None:
+            return
+
+        objects = identity_map.find(id) if id is not None else identity_map.objects(typename)
+        for obj in objects:
+            obj._forget()
+
+    def _thing_updated(self, data):
+        data = dict(data)
+        id = data.pop("id")
+        self.cache.refresh("Thing", id, data)
+        self._forget(id)
+
+    def _environment_updated(self, data):
+        data = dict(data)
+        id = data.pop("id")
+        self.cache.refresh("Environment", id, data)
+        self._forget(id)
+
+    def _variable_updated(self, data):
+        data = dict(data)
+        id = data.pop("id")
+        self.cache.refresh(data.pop("__typename"), id, data)
+        self._forget(id)
+
+    def _float_series_node_created(self, data):
+        self.cache.update("FloatSeriesNode", data["id"], {"value": data["value"],
+                                                          "timestamp": data["timestamp"],
+                                                          "series{id}": data["series"]})
+        if data["series"] is not None:
+            self.cache.invalidate(data["series"]["id"], SERIES_FIELDS)
+            self._forget(data["series"]["id"])
+
+    def _float_series_node_deleted(self, id):
+        # only the id is sent, the series could be any of them
+        self.cache.invalidate(id)
+        self.cache.invalidate_all(SERIES_FIELDS)
+        self._forget(id)
+        self._forget(typename="FloatSeriesVariable")
+
+    def subscription_ack(self, event):
+        # updates sent while the subscription was down are lost, so what
+        # was cached before it (re)connected can't be trusted
+        if event.query in self.streams:
+            self.cache.clear()
+            self._forget(typename=None)
+
+    async def _consume(self, query, handler):
+        async for data in self.client.subscribe(query):
+            for key, value in data.items():
+                self.messages[key] += 1
+                handler(value)
+
+    async def run(self):
+        self.client.add_observer(self)
+        try:
+            await asyncio.gather(*[self._consume(query, handler) for query, handler in self.streams.items()])
+        finally:
+            self.client.remove_observer(self)
+
+    def start(self):
+        # on a sync client the subscriptions run on its background loop
+        if self.client.asyncio:
+            self._future = asyncio.ensure_future(self.run())
+        else:
+            self._future = asyncio.run_coroutine_threadsafe(self.run(), self.client.background_loop.start())
+        return self
+
+    def stop(self):
+        if self._future is not None:
+            self._future.cancel()
+            self._future = None
+
+    def stats(self):
+        return {"messages": dict(self.messages), "running": self._future is not None and not self._future.done()}
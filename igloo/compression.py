@@ -0,0 +1,64 @@
+import gzip
+import threading
+import zlib
+
+ACCEPT_ENCODING = "gzip, deflate"
+
+
+def compress(data, encoding, level=6):
+    if encoding == "gzip":
+        return gzip.compress(data, compresslevel=level)
+    elif encoding == "deflate":
+        return zlib.compress(data, level)
+
+    raise ValueError("Unsupported content encoding: {}".format(encoding))
+
+
+class TransferStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.requests = 0
+            self.compressed_requests = 0
+            # *_raw counters are the sizes before compression, the others
+            # are what actually went over the wire
+            self.bytes_sent = 0
+            self.bytes_sent_raw = 0
+            self.bytes_received = 0
+            self.bytes_received_raw = 0
+            self.last = None
+
+    def record(self, sent, sent_raw, received, received_raw):
+        request = {"bytes_sent": sent,
+                   "bytes_sent_raw": sent_raw,
+                   "bytes_received": received,
+                   "bytes_received_raw": received_raw}
+
+        with self._lock:
+            self.requests += 1
+            if sent != sent_raw:
+                self.compressed_requests += 1
+            self.bytes_sent += sent
+            self.bytes_sent_raw += sent_raw
+            self.bytes_received += received
+            self.bytes_received_raw += received_raw
+            self.last = request
+
+        return request
+
+    @property
+    def bytes_saved(self):
+        return (self.bytes_sent_raw - self.bytes_sent) + (self.bytes_received_raw - self.bytes_received)
+
+    def as_dict(self):
+        with self._lock:
+            return {"requests": self.requests,
+                    "compressed_requests": self.compressed_requests,
+                    "bytes_sent": self.bytes_sent,
+                    "bytes_sent_raw": self.bytes_sent_raw,
+                    "bytes_received": self.bytes_received,
+                    "bytes_received_raw": self.bytes_received_raw,
+                    "bytes_saved": self.bytes_saved}
@@ -0,0 +1,133 @@
+import collections
+import os
+import re
+import sys
+import threading
+import time
+import warnings
+from igloo.instrumentation import Observer
+
+_package_dir = os.path.dirname(os.path.abspath(__file__))
+# frames of these modules are never the call site the developer wrote
+_skipped_modules = ("asyncio", "concurrent", "threading", "aiodataloader")
+
+
+class NPlusOneWarning(UserWarning):
+    pass
+
+
+def _selection(query):
+    # the top level field names selected on the root field, e.g. ["name"]
+    # for query($id:ID!){thing(id:$id){name}}
+    start = query.find("{", query.find("{") + 1)
+    if start == -1:
+        return []
+
+    body = re.sub(r'\([^()]*\)', '', query[start + 1:])
+    body = re.sub(r'[_A-Za-z][_0-9A-Za-z]*\s*:\s*', '', body)
+
+    fields = []
+    depth = 0
+    for token in re.findall(r'[_A-Za-z][_0-9A-Za-z]*|[{}]', body):
+        if token == "{":
+            depth += 1
+        elif token == "}":
+            if depth == 0:
+                break
+            depth -= 1
+        elif depth == 0:
+            fields.append(token)
+
+    return fields
+
+
+def call_site():
+    # the innermost frame outside the SDK and the libraries it runs on
+    frame = sys._getframe(1)
+    while frame is not None:
+        filename = os.path.abspath(frame.f_code.co_filename)
+        module = frame.f_globals.get("__name__", "")
+        if not filename.startswith(_package_dir + os.sep) and module.split(".")[0] not in _skipped_modules:
+            return (frame.f_code.co_filename, frame.f_lineno, frame.f_code.co_name)
+        frame = frame.f_back
+
+    return ("<unknown>", 0, "<unknown>")
+
+
+class NPlusOneDetector(Observer):
+    def __init__(self, window=1.0, threshold=5, warn=True):
+        # threshold queries selecting the same single field of the same
+        # type from the same line within window seconds are an N+1
+        self.window = window
+        self.threshold = threshold
+        self.warn = warn
+        self._lock = threading.Lock()
+        self._recent = {}
+        self.counters = collections.Counter()
+        self.flagged = {}
+
+    def request_start(self, event):
+        if event.operation_type != "query":
+            return
+
+        root_field = event.operation_name
+        fields = tuple(_selection(event.query))
+        site = event.call_site or call_site()
+        key = (site, root_field, fields)
+        now = time.monotonic()
+
+        with self._lock:
+            self.counters[key] += 1
+            if len(fields) != 1:
+                return
+
+            recent = self._recent.setdefault(key, collections.deque())
+            recent.append(now)
+            while recent and now - recent[0] > self.window:
+                recent.popleft()
+
+            if len(recent) < self.threshold or key in self.flagged:
+                return
+            self.flagged[key] = now
+
+        if self.warn:
+            filename, lineno, function = site
+            # attributed to the developer's line, so warning filters and
+            # IDEs point at the loop to fix
+            warnings.warn_explicit("{}.{} was queried {} times in {}s from {}, read the fields of these "
+                                   "objects together, e.g. with client.batch() or client.fetch_many()"
+                                   .format(root_field, fields[0], self.threshold, self.window, function),
+                                   NPlusOneWarning, filename, lineno)
+
+    def report(self):
+        # one entry per function and type, with the fields that were read
+        # one query at a time: these are the ones to fetch together
+        entries = {}
+        with self._lock:
+            counters = list(self.counters.items())
+            flagged = set(self.flagged)
+
+        for (site, root_field, fields), count in counters:
+            filename, lineno, function = site
+            entry = entries.setdefault((filename, function, root_field), {
+                "file": filename, "function": function, "type": root_field, "lines": set(),
+                "queries": 0, "single_field_queries": 0, "fields": collections.Counter(), "n_plus_one": False})
+            entry["lines"].add(lineno)
+            entry["queries"] += count
+            if len(fields) == 1:
+                entry["single_field_queries"] += count
+                entry["fields"][fields[0]] += count
+            if (site, root_field, fields) in flagged:
+                entry["n_plus_one"] = True
+
+        entries = sorted(entries.values(), key=lambda entry: entry["single_field_queries"], reverse=True)
+        for entry in entries:
+            entry["lines"] = sorted(entry["lines"])
+            entry["fields"] = dict(entry["fields"].most_common())
+        return entries
+
+    def reset(self):
+        with self._lock:
+            self._recent.clear()
+            self.counters.clear()
+            self.flagged.clear()
@@ -0,0 +1,160 @@
+import asyncio
+import threading
+import time
+
+PROBE_QUERY = b'{"query":"{__typename}"}'
+PROBE_HEADERS = {"content-type": "application/json"}
+
+
+def subscriptions_url_for(url):
+    # https://host/graphql -> wss://host/subscriptions
+    scheme, _, rest = url.partition("://")
+    host = rest.split("/", 1)[0]
+    return "{}://{}/subscriptions".format("wss" if scheme == "https" else "ws", host)
+
+
+class Endpoint:
+    def __init__(self, url, subscriptions_url=None):
+        self.url = url
+        self.subscriptions_url = subscriptions_url or subscriptions_url_for(url)
+        # smoothed round trip of the probes, None until the first one
+        self.latency = None
+        self.failures = 0
+        self.down_until = 0
+
+    @property
+    def healthy(self):
+        return time.monotonic() >= self.down_until
+
+    def __repr__(self):
+        return "Endpoint({!r}, latency={}, healthy={})".format(self.url, self.latency, self.healthy)
+
+
+class EndpointPool:
+    def __init__(self, endpoints, probe_interval=300, probe_timeout=2, cooldown=30, max_cooldown=300,
+                 smoothing=0.3):
+        # endpoints are urls, (url, subscriptions_url) pairs or Endpoints,
+        # earlier ones are preferred until they have been probed
+        self.endpoints = []
+        for endpoint in endpoints:
+            if isinstance(endpoint, str):
+                endpoint = Endpoint(endpoint)
+            elif not isinstance(endpoint, Endpoint):
+                endpoint = Endpoint(*endpoint)
+            self.endpoints.append(endpoint)
+
+        if not self.endpoints:
+            raise ValueError("At least one endpoint is needed")
+
+        self.probe_interval = probe_interval
+        self.probe_timeout = probe_timeout
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.smoothing = smoothing
+
+        self._lock = threading.Lock()
+        self._probing = False
+        # probe on first use, unless there is nothing to choose from
+        self._probed_at = None if len(self.endpoints) > 1 else float("inf")
+
+    @property
+    def current(self):
+        healthy = [endpoint for endpoint in self.endpoints if endpoint.healthy]
+        if not healthy:
+            # everything is failing, try the one that comes back first
+            return min(self.endpoints, key=lambda endpoint: endpoint.down_until)
+
+        return min(healthy, key=lambda endpoint: float("inf") if endpoint.latency is None else endpoint.latency)
+
+    def record_latency(self, endpoint, latency):
+        with self._lock:
+            if endpoint.latency is None:
+                endpoint.latency = latency
+            else:
+                endpoint.latency += self.smoothing * (latency - endpoint.latency)
+
+    def record_success(self, endpoint):
+        if endpoint.failures:
+            with self._lock:
+                endpoint.failures = 0
+                endpoint.down_until = 0
+
+    def record_failure(self, endpoint):
+        # an endpoint that keeps failing is left alone for longer each time
+        with self._lock:
+            cooldown = min(self.max_cooldown, self.cooldown * 2 ** endpoint.failures)
+            endpoint.failures += 1
+            endpoint.down_until = time.monotonic() + cooldown
+
+    def start_probe(self):
+        # True if the caller should probe the endpoints now
+        with self._lock:
+            if self._probing:
+                return False
+            elif self._probed_at is not None and time.monotonic() - self._probed_at < self.probe_interval:
+                return False
+
+            self._probing = True
+            return True
+
+    def _finish_probe(self):
+        with self._lock:
+            self._probing = False
+            self._probed_at = time.monotonic()
+
+    def _probe_result(self, endpoint, start, status=None, error=None):
+        # any answer short of a gateway error means the endpoint is up, the
+        # probe is not authenticated and only measures the round trip
+        if error is None and status < 500:
+            self.record_latency(endpoint, time.perf_counter() - start)
+            self.record_success(endpoint)
+        else:
+            self.record_failure(endpoint)
+
+    def probe(self, transport):
+        # the endpoints are probed at the same time, so the request that
+        # triggers it waits for the slowest one rather than for all of them
+        def probe(endpoint):
+            start = time.perf_counter()
+            try:
+                response = transport.post(endpoint.url, data=PROBE_QUERY, headers=PROBE_HEADERS,
+                                          connect_timeout=self.probe_timeout, read_timeout=self.probe_timeout)
+            except Exception as e:
+                self._probe_result(endpoint, start, error=e)
+            else:
+                self._probe_result(endpoint, start, response.status_code)
+
+        try:
+            threads = [threading.Thread(target=probe, args=(endpoint,), name="igloo-probe", daemon=True)
+                       for endpoint in self.endpoints]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            self._finish_probe()
+
+    async def probe_async(self, transport):
+        async def probe(endpoint):
+            start = time.perf_counter()
+            try:
+                response, _ = await transport.post(endpoint.url, data=PROBE_QUERY, headers=PROBE_HEADERS,
+                                                   connect_timeout=self.probe_timeout,
+                                                   read_timeout=self.probe_timeout,
+                                                   total_timeout=self.probe_timeout)
+            except Exception as e:
+                self._probe_result(endpoint, start, error=e)
+            else:
+                self._probe_result(endpoint, start, response.status)
+
+        try:
+            await asyncio.gather(*[probe(endpoint) for endpoint in self.endpoints])
+        finally:
+            self._finish_probe()
+
+    def state(self):
+        return [{"url": endpoint.url,
+                 "subscriptions_url": endpoint.subscriptions_url,
+                 "latency": endpoint.latency,
+                 "failures": endpoint.failures,
+                 "healthy": endpoint.healthy} for endpoint in self.endpoints]
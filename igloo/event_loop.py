@@ -0,0 +1,86 @@
+import asyncio
+import threading
+
+
+class BackgroundLoop:
+    def __init__(self, name="igloo-event-loop"):
+        self.name = name
+        self.loop = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def get_loop(self):
+        # the loop exists before its thread runs, so objects can be bound
+        # to it without starting a thread for clients that never use it
+        with self._lock:
+            if self.loop is None:
+                self.loop = asyncio.new_event_loop()
+            return self.loop
+
+    def start(self):
+        loop = self.get_loop()
+        with self._lock:
+            if self._thread is not None:
+                return loop
+
+            ready = threading.Event()
+
+            def run():
+                asyncio.set_event_loop(loop)
+                loop.call_soon(ready.set)
+                loop.run_forever()
+
+            # daemon, so a client that is never closed doesn't keep the
+            # interpreter alive
+            self._thread = threading.Thread(target=run, name=self.name, daemon=True)
+            self._thread.start()
+            ready.wait()
+            return loop
+
+    @property
+    def running(self):
+        return self._thread is not None
+
+    def in_loop_thread(self):
+        return self._thread is not None and threading.current_thread() is self._thread
+
+    def run(self, coro, timeout=None):
+        if self.in_loop_thread():
+            coro.close()
+            raise Exception("Blocking calls can't be made from the client's event loop, await the coroutine instead")
+
+        loop = self.start()
+        future = asyncio.run_coroutine_threadsafe(coro, loop)
+        try:
+            return future.result(timeout)
+        except BaseException:
+            # a caller that stops waiting (timeout, KeyboardInterrupt) cancels the work
+            future.cancel()
+            raise
+
+    def iterate(self, agen):
+        try:
+            while True:
+                try:
+                    yield self.run(agen.__anext__())
+                except StopAsyncIteration:
+                    return
+        finally:
+            if self.loop is not None and not self.loop.is_closed():
+                self.run(agen.aclose())
+
+    def stop(self):
+        with self._lock:
+            loop, thread = self.loop, self._thread
+            self.loop, self._thread = None, None
+
+        if loop is None:
+            return
+        elif thread is None:
+            loop.close()
+            return
+
+        loop.call_soon_threadsafe(loop.stop)
+        if thread is not threading.current_thread():
+            thread.join()
+            loop.close()
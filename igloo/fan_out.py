@@ -0,0 +1,35 @@
+from concurrent.futures import ThreadPoolExecutor
+
+
+class MapResult(list):
+    def __init__(self, values, errors):
+        # values keeps the order of the input, with None where the call
+        # failed; errors maps those indexes to the exception raised
+        super().__init__(values)
+        self.errors = errors
+
+    @property
+    def ok(self):
+        return not self.errors
+
+    def raise_for_errors(self):
+        if self.errors:
+            index = min(self.errors)
+            raise self.errors[index]
+
+
+def map_items(fn, objects, max_workers):
+    objects = list(objects)
+    values = [None] * len(objects)
+    errors = {}
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(fn, obj) for obj in objects]
+
+        for index, future in enumerate(futures):
+            try:
+                values[index] = future.result()
+            except Exception as e:
+                errors[index] = e
+
+    return MapResult(values, errors)
@@ -0,0 +1,193 @@
+import collections
+import threading
+import time
+
+IMMUTABLE = "immutable"
+SLOW = "slow"
+LIVE = "live"
+
+# how long a field of each class may be served from the cache, None is
+# forever and 0 never
+DEFAULT_TTL = {IMMUTABLE: None, SLOW: 30, LIVE: 0}
+
+# fields that are not listed are SLOW, "Type.field" entries take precedence
+DEFAULT_VOLATILITY = {
+    "createdAt": IMMUTABLE,
+    "qrCode": IMMUTABLE,
+    "pairCode": IMMUTABLE,
+    "producer": IMMUTABLE,
+    "series": IMMUTABLE,
+    "thing": IMMUTABLE,
+    "FloatSeriesNode.timestamp": IMMUTABLE,
+    "CategorySeriesNode.timestamp": IMMUTABLE,
+
+    "updatedAt": LIVE,
+    "value": LIVE,
+    "online": LIVE,
+    "battery": LIVE,
+    "batteryCharging": LIVE,
+    "signal": LIVE,
+    "paired": LIVE,
+    "read": LIVE,
+    "lastNotification": LIVE,
+    "lastNode": LIVE,
+    "usedStorage": LIVE,
+    "usedThroughput": LIVE,
+}
+
+
+def field_name(selection):
+    # "environment{id}" and "thingCount(filter:$filter)" -> the field name
+    for separator in "{(":
+        selection = selection.split(separator, 1)[0]
+    return selection.strip()
+
+
+class FieldCache:
+    def __init__(self, ttl=None, volatility=None, max_objects=10000):
+        # ttl overrides DEFAULT_TTL per class, volatility DEFAULT_VOLATILITY
+        # per field or "Type.field"; the least recently used objects are
+        # dropped past max_objects
+        self.ttl = dict(DEFAULT_TTL, **(ttl or {}))
+        self.volatility = dict(DEFAULT_VOLATILITY, **(volatility or {}))
+        self.max_objects = max_objects
+
+        self._lock = threading.Lock()
+        self._objects = collections.OrderedDict()
+        self.hits = collections.Counter()
+        self.misses = collections.Counter()
+
+    def volatility_of(self, typename, field):
+        return self.volatility.get("{}.{}".format(typename, field), self.volatility.get(field, SLOW))
+
+    def _expires_at(self, typename, selection, now):
+        ttl = self.ttl[self.volatility_of(typename, field_name(selection))]
+        if ttl is None:
+            return float("inf")
+        return now + ttl
+
+    def get(self, typename, id, selection):
+        # returns (True, value) on a hit and (False, None) on a miss
+        volatility = self.volatility_of(typename, field_name(selection))
+        now = time.monotonic()
+        with self._lock:
+            fields = self._objects.get(id)
+            entry = fields.get(selection) if fields is not None else None
+            if entry is not None and entry[1] > now:
+                self._objects.move_to_end(id)
+                self.hits[volatility] += 1
+                return True, entry[0]
+
+            self.misses[volatility] += 1
+            return False, None
+
+    def find(self, typename, id, field):
+        # like get, for whatever selection of the field is cached, e.g. the
+        # "values{id __typename name}" prefetched with a thing for "values"
+        volatility = self.volatility_of(typename, field)
+        now = time.monotonic()
+        with self._lock:
+            for selection, entry in (self._objects.get(id) or {}).items():
+                if field_name(selection) == field and entry[1] > now:
+                    self._objects.move_to_end(id)
+                    self.hits[volatility] += 1
+                    return True, entry[0]
+
+            self.misses[volatility] += 1
+            return False, None
+
+    def references(self, id):
+        # the ids of the objects the cached fields of id point to, e.g. the
+        # environment of a thing
+        now = time.monotonic()
+        with self._lock:
+            return [entry[0]["id"] for entry in (self._objects.get(id) or {}).values()
+                    if entry[1] > now and isinstance(entry[0], dict) and entry[0].get("id") is not None]
+
+    def containing(self, id):
+        # the ids of the objects with a cached list holding id, e.g. the
+        # environment whose things were prefetched
+        now = time.monotonic()
+        with self._lock:
+            return [owner for owner, cached in self._objects.items()
+                    if any(entry[1] > now and isinstance(entry[0], list)
+                           and any(isinstance(item, dict) and item.get("id") == id for item in entry[0])
+                           for entry in cached.values())]
+
+    def lookup(self, typename, id, selections):
+        # splits selections in a dict of cached values and a list of missing
+        found = {}
+        missing = []
+        for selection in selections:
+            hit, value = self.get(typename, id, selection)
+            if hit:
+                found[selection] = value
+            else:
+                missing.append(selection)
+        return found, missing
+
+    def set(self, typename, id, selection, value):
+        now = time.monotonic()
+        expires_at = self._expires_at(typename, selection, now)
+        if expires_at <= now:
+            return
+
+        with self._lock:
+            self._objects.setdefault(id, {})[selection] = (value, expires_at)
+            self._objects.move_to_end(id)
+            while len(self._objects) > self.max_objects:
+                self._objects.popitem(last=False)
+
+    def update(self, typename, id, values):
+        # values maps selections to values, as returned by a query
+        for selection, value in values.items():
+            self.set(typename, id, selection, value)
+
+    def invalidate(self, id, fields=None):
+        # drops the given fields of the object, every field if None
+        with self._lock:
+            if fields is None:
+                self._objects.pop(id, None)
+                return
+
+            cached = self._objects.get(id)
+            if cached is None:
+                return
+            for selection in list(cached):
+                if field_name(selection) in fields:
+                    del cached[selection]
+
+    def refresh(self, typename, id, values):
+        # the object changed in unknown ways: values are its new fields and
+        # everything else but the immutable fields is dropped
+        with self._lock:
+            cached = self._objects.get(id)
+            if cached is not None:
+                for selection in list(cached):
+                    if self.volatility_of(typename, field_name(selection)) != IMMUTABLE:
+                        del cached[selection]
+        self.update(typename, id, values)
+
+    def invalidate_all(self, fields):
+        # drops the fields from every object, for changes whose object is
+        # unknown
+        with self._lock:
+            for cached in self._objects.values():
+                for selection in list(cached):
+                    if field_name(selection) in fields:
+                        del cached[selection]
+
+    def clear(self):
+        with self._lock:
+            self._objects.clear()
+
+    def __len__(self):
+        return len(self._objects)
+
+    def stats(self):
+        with self._lock:
+            return {"objects": len(self._objects),
+                    "hits": sum(self.hits.values()),
+                    "misses": sum(self.misses.values()),
+                    "by_volatility": {volatility: {"hits": self.hits[volatility], "misses": self.misses[volatility]}
+                                      for volatility in self.ttl}}
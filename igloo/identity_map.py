@@ -0,0 +1,65 @@
+import threading
+import weakref
+
+
+class IdentityMap:
+    def __init__(self):
+        # objects are only kept while something else refers to them
+        self._lock = threading.Lock()
+        self._objects = weakref.WeakValueDictionary()
+        # every type ever added, to find the objects with an id whatever
+        # their type (a Variable and a FloatVariable can share one)
+        self._typenames = set()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, typename, id):
+        obj = self._objects.get((typename, id))
+        with self._lock:
+            if obj is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return obj
+
+    def add(self, typename, id, obj):
+        # returns the object already mapped to the key if another thread
+        # created one in the meantime, so everybody ends up with the same
+        with self._lock:
+            existing = self._objects.get((typename, id))
+            if existing is not None:
+                return existing
+            self._objects[(typename, id)] = obj
+            self._typenames.add(typename)
+            return obj
+
+    def find(self, id):
+        # the objects mapped to id, of any type
+        objects = []
+        for typename in list(self._typenames):
+            obj = self._objects.get((typename, id))
+            if obj is not None:
+                objects.append(obj)
+        return objects
+
+    def objects(self, typename=None):
+        # the mapped objects, only those of typename if given
+        return [obj for (mapped, _), obj in list(self._objects.items())
+                if typename is None or mapped == typename]
+
+    def discard(self, typename, id):
+        with self._lock:
+            self._objects.pop((typename, id), None)
+
+    def clear(self):
+        with self._lock:
+            self._objects.clear()
+
+    def __len__(self):
+        return len(self._objects)
+
+    def __contains__(self, key):
+        return key in self._objects
+
+    def stats(self):
+        return {"objects": len(self._objects), "hits": self.hits, "misses": self.misses}
@@ -0,0 +1,189 @@
+import collections
+import contextvars
+import hashlib
+import re
+import threading
+import time
+import warnings
+
+# DataLoaders set this around their query, so the request event can tell
+# how many loads were merged into it
+loader_batch_size = contextvars.ContextVar("igloo_loader_batch_size", default=None)
+# requests are sent from tasks whose stack may not reach the code that made
+# them (DataLoaders, single-flight), so where that code called the client or
+# read a field is carried along with them
+request_site = contextvars.ContextVar("igloo_request_site", default=None)
+load_site = contextvars.ContextVar("igloo_load_site", default=None)
+
+_operation = re.compile(r'\s*(query|mutation|subscription)?\s*([_A-Za-z][_0-9A-Za-z]*)?')
+_root_field = re.compile(r'{\s*(?:[_A-Za-z][_0-9A-Za-z]*\s*:\s*)?([_A-Za-z][_0-9A-Za-z]*)')
+# the most recently described documents, batching and prefetching generate
+# new ones so they can't all be kept
+_documents = collections.OrderedDict()
+_documents_lock = threading.Lock()
+MAX_DOCUMENTS = 1000
+
+
+def describe_document(query):
+    # (operation type, operation name, sha256), each document is only looked
+    # at once while it is in _documents. Anonymous operations are named after
+    # their first root field, which is what every document in the SDK is
+    with _documents_lock:
+        description = _documents.get(query)
+        if description is not None:
+            _documents.move_to_end(query)
+
+    if description is None:
+        match = _operation.match(query)
+        operation_type = match.group(1) or "query"
+        name = match.group(2) if match.group(1) else None
+        if name is None:
+            # skip the variable definitions, they contain no braces
+            root = _root_field.search(query)
+            name = root.group(1) if root else None
+
+        description = (operation_type, name, hashlib.sha256(query.encode("utf-8")).hexdigest())
+        with _documents_lock:
+            _documents[query] = description
+            while len(_documents) > MAX_DOCUMENTS:
+                _documents.popitem(last=False)
+
+    return description
+
+
+class RequestEvent:
+    def __init__(self, query, variables_size=0, loader_batch_size=None, batch_size=1, call_site=None):
+        self.query = query
+        # (filename, lineno, function) of the code the request was made from,
+        # when it was captured
+        self.call_site = call_site
+        self.operation_type, self.operation_name, self.document_hash = describe_document(query)
+        self.variables_size = variables_size
+        self.loader_batch_size = loader_batch_size
+        # operations sent in the same HTTP request, bytes and retries are
+        # those of the whole request
+        self.batch_size = batch_size
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.retries = 0
+        self.http_status = None
+        self.status = None
+        self.error = None
+        self.started_at = time.time()
+        self._start = time.perf_counter()
+        self.latency = None
+
+    def finish(self, status, error=None):
+        self.latency = time.perf_counter() - self._start
+        self.status = status
+        self.error = error
+
+    def as_dict(self):
+        return {"operation_type": self.operation_type,
+                "operation_name": self.operation_name,
+                "document_hash": self.document_hash,
+                "variables_size": self.variables_size,
+                "loader_batch_size": self.loader_batch_size,
+                "batch_size": self.batch_size,
+                "bytes_sent": self.bytes_sent,
+                "bytes_received": self.bytes_received,
+                "retries": self.retries,
+                "http_status": self.http_status,
+                "status": self.status,
+                "error": repr(self.error) if self.error is not None else None,
+                "started_at": self.started_at,
+                "latency": self.latency}
+
+
+class SubscriptionEvent:
+    def __init__(self, kind, query, attempt=0, latency=None, bytes_received=None, delay=None, error=None):
+        # kind is "connect", "ack", "message" or "reconnect"
+        self.kind = kind
+        self.query = query
+        self.operation_type, self.operation_name, self.document_hash = describe_document(query)
+        self.attempt = attempt
+        self.latency = latency
+        self.bytes_received = bytes_received
+        self.delay = delay
+        self.error = error
+        self.timestamp = time.time()
+
+    def as_dict(self):
+        return {"kind": self.kind,
+                "operation_name": self.operation_name,
+                "document_hash": self.document_hash,
+                "attempt": self.attempt,
+                "latency": self.latency,
+                "bytes_received": self.bytes_received,
+                "delay": self.delay,
+                "error": repr(self.error) if self.error is not None else None,
+                "timestamp": self.timestamp}
+
+
+class Observer:
+    # subclass and override the events you need, any object with some of
+    # these methods works as well
+
+    def request_start(self, event):
+        pass
+
+    def request_end(self, event):
+        pass
+
+    def subscription_connect(self, event):
+        pass
+
+    def subscription_ack(self, event):
+        pass
+
+    def subscription_message(self, event):
+        pass
+
+    def subscription_reconnect(self, event):
+        pass
+
+
+class Instrumentation:
+    def __init__(self, observers=None):
+        self.observers = list(observers or [])
+
+    def add(self, observer):
+        self.observers.append(observer)
+
+    def remove(self, observer):
+        self.observers.remove(observer)
+
+    def __bool__(self):
+        return bool(self.observers)
+
+    def emit(self, name, event):
+        for observer in list(self.observers):
+            method = getattr(observer, name, None)
+            if method is None:
+                continue
+
+            # a broken metrics exporter must not break the request
+            try:
+                method(event)
+            except Exception as e:
+                warnings.warn("igloo observer {!r} failed on {}: {!r}".format(observer, name, e), RuntimeWarning)
+
+
+class EventRecorder(Observer):
+    # keeps the events in memory, handy in tests and benchmarks
+    def __init__(self):
+        self.events = []
+
+    def request_end(self, event):
+        self.events.append(("request", event))
+
+    def subscription_connect(self, event):
+        self.events.append(("subscription", event))
+
+    subscription_ack = subscription_message = subscription_reconnect = subscription_connect
+
+    def requests(self):
+        return [event for kind, event in self.events if kind == "request"]
+
+    def clear(self):
+        self.events = []
@@ -0,0 +1,134 @@
+import asyncio
+import threading
+import time
+
+QUOTA_QUERY = '{user{maxThroughput usedThroughput}}'
+
+
+class TokenBucket:
+    def __init__(self, rate, capacity=None):
+        # rate is in requests per second, capacity is the largest burst
+        self._lock = threading.Lock()
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+
+        self.acquired = 0
+        self.waiting = 0
+        self.total_wait = 0.0
+        self.last_wait = 0.0
+
+    def _refill(self, now):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def set_rate(self, rate, capacity=None):
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate = rate
+            if capacity is not None:
+                self.capacity = capacity
+            self._tokens = min(self._tokens, self.capacity)
+
+    def reserve(self, tokens=1):
+        # the tokens are taken right away, possibly going negative: the
+        # returned wait is the time until the debt is paid back, so callers
+        # queue up in the order they arrived instead of being rejected
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens -= tokens
+            wait = max(0.0, -self._tokens / self.rate)
+
+            self.acquired += tokens
+            self.total_wait += wait
+            self.last_wait = wait
+            return wait
+
+    def acquire(self, tokens=1):
+        wait = self.reserve(tokens)
+        if wait > 0:
+            self.waiting += 1
+            try:
+                time.sleep(wait)
+            finally:
+                self.waiting -= 1
+
+        return wait
+
+    async def acquire_async(self, tokens=1):
+        wait = self.reserve(tokens)
+        if wait > 0:
+            self.waiting += 1
+            try:
+                await asyncio.sleep(wait)
+            finally:
+                self.waiting -= 1
+
+        return wait
+
+    @property
+    def tokens(self):
+        with self._lock:
+            self._refill(time.monotonic())
+            return self._tokens
+
+    def state(self):
+        return {"rate": self.rate,
+                "capacity": self.capacity,
+                "tokens": self.tokens,
+                "waiting": self.waiting,
+                "acquired": self.acquired,
+                "total_wait": self.total_wait,
+                "last_wait": self.last_wait}
+
+
+class QuotaLimiter(TokenBucket):
+    def __init__(self, period=30 * 24 * 3600, refresh_interval=60, capacity=10, min_rate=0.01, rate=1):
+        # what is left of the quota is spread evenly over period seconds, so
+        # a bulk job can't spend it all in a burst and get throttled
+        super().__init__(rate, capacity)
+        self.period = period
+        self.refresh_interval = refresh_interval
+        self.min_rate = min_rate
+
+        self.max_throughput = None
+        self.used_throughput = None
+        self.refreshed_at = None
+        self._refreshing = False
+
+    def update_quota(self, max_throughput, used_throughput):
+        remaining = max(0, max_throughput - used_throughput)
+        self.set_rate(max(self.min_rate, remaining / self.period))
+
+        with self._lock:
+            self.max_throughput = max_throughput
+            self.used_throughput = used_throughput
+            self.refreshed_at = time.monotonic()
+            self._refreshing = False
+
+    def start_refresh(self):
+        # only one caller at a time fetches the quota, the others go on
+        # with the rate they have
+        with self._lock:
+            if self._refreshing:
+                return False
+            elif self.refreshed_at is not None and \
+                    time.monotonic() - self.refreshed_at < self.refresh_interval:
+                return False
+
+            self._refreshing = True
+            return True
+
+    def cancel_refresh(self):
+        with self._lock:
+            self._refreshing = False
+            # try again at the next interval rather than on every request
+            self.refreshed_at = time.monotonic()
+
+    def state(self):
+        state = super().state()
+        state.update({"max_throughput": self.max_throughput,
+                      "used_throughput": self.used_throughput,
+                      "refreshed_at": self.refreshed_at})
+        return state
@@ -1,12 +1,29 @@
-import requests
 import asyncio
 import pathlib
+import sys
+import threading
+import time
 import websockets
-import json
 from igloo.mutations import MutationRoot
 from igloo.subscriptions import SubscriptionRoot
 from igloo.utils import get_from_dict, _Undefined, UNDEFINED, undefined
-from aiohttp import ClientSession
+from igloo.transport import SyncTransport, AsyncTransport
+from igloo.codec import get_codec
+from igloo.compression import ACCEPT_ENCODING, TransferStats, compress
+from igloo.batching import AsyncBatcher, BatchContext, TickBatcher
+from igloo.retry import RetryPolicy, CircuitBreaker, CircuitOpenError, TransientError, TRANSIENT_STATUSES, full_jitter, is_mutation, parse_retry_after
+from igloo.limiter import QuotaLimiter, QUOTA_QUERY
+from igloo.single_flight import SingleFlight
+from igloo.timeouts import DeadlineExceeded, Timeout, get_timeout
+from igloo.fan_out import MapResult, map_items
+from igloo.event_loop import BackgroundLoop
+from igloo.endpoints import EndpointPool
+from igloo.identity_map import IdentityMap
+from igloo.field_cache import FieldCache, field_name
+from igloo.coherence import CacheCoherence
+from igloo.diagnostics import NPlusOneDetector, call_site
+from igloo.instrumentation import Instrumentation, RequestEvent, SubscriptionEvent, describe_document, loader_batch_size, load_site, request_site
+from igloo.persisted_queries import PersistedQueryRegistry, get_error_code, PERSISTED_QUERY_NOT_FOUND, PERSISTED_QUERY_NOT_SUPPORTED
 from .query import QueryRoot
 import asyncio
 
@@ -18,29 +35,232 @@ class GraphQLException(Exception):
     pass
 
 
-def exponential_backoff():
-    yield 1
-    yield 5
-
+def exponential_backoff(base_delay=1, max_delay=20):
+    attempt = 0
     while True:
-        yield 20
+        yield full_jitter(attempt, base_delay, max_delay)
+        attempt += 1
+
+
+async def _with_request_site(site, coro):
+    token = request_site.set(site)
+    try:
+        return await coro
+    finally:
+        request_site.reset(token)
 
 
 class Client:
-    def __init__(self, token, asynchronous=False):
+    def __init__(self, token, asynchronous=False, sync_transport=None, pool_connections=10, pool_maxsize=10, max_idle_time=60,
+                 async_transport=None, limit=100, limit_per_host=0, keepalive_timeout=15, ttl_dns_cache=10,
+                 persisted_queries=False, batch_interval=None, max_batch_size=20,
+                 compression="gzip", compression_threshold=1024, compression_level=6, stats=None,
+                 codec=None, retry_policy=None, circuit_breaker=None, throughput_limiter=None,
+                 single_flight=True, timeout=None, hybrid=False, url=None, subscriptions_url=None,
+                 observers=None, endpoints=None, probe_interval=300, tick_batch=False, tick_batch_size=100,
+                 identity_map=True, field_cache=False):
         self.token = token
-        self.session = ClientSession()
         self.asyncio = asynchronous
 
+        # None follows the module level host, so it can still be changed globally
+        self._url = url
+        self._subscriptions_url = subscriptions_url
+
+        # a list of candidate urls (or EndpointPool), requests go to the
+        # fastest healthy one and move on to the next when it fails
+        if endpoints is not None and not isinstance(endpoints, EndpointPool):
+            endpoints = EndpointPool(endpoints, probe_interval=probe_interval)
+        self.endpoints = endpoints
+
+        # the sync transport is thread safe, so it can be shared between clients
+        if sync_transport is None:
+            sync_transport = SyncTransport(pool_connections=pool_connections,
+                                           pool_maxsize=pool_maxsize,
+                                           max_idle_time=max_idle_time)
+        self.sync_transport = sync_transport
+
+        # the aiohttp session is opened lazily inside the running loop
+        if async_transport is None:
+            async_transport = AsyncTransport(limit=limit,
+                                             limit_per_host=limit_per_host,
+                                             keepalive_timeout=keepalive_timeout,
+                                             ttl_dns_cache=ttl_dns_cache)
+        self.async_transport = async_transport
+
+        # pass a PersistedQueryRegistry to share registered hashes between clients
+        if persisted_queries is True:
+            persisted_queries = PersistedQueryRegistry()
+        elif persisted_queries is False:
+            persisted_queries = None
+        self.persisted_queries = persisted_queries
+
+        # async queries issued within batch_interval seconds of each other
+        # are sent together, sync ones only inside a `with client.batch()`
+        self.batch_interval = batch_interval
+        self.max_batch_size = max_batch_size
+        self._async_batcher = None
+        self._local = threading.local()
+
+        # request bodies larger than compression_threshold bytes are sent
+        # compressed, compression=None always sends them as they are
+        self.compression = compression
+        self.compression_threshold = compression_threshold
+        self.compression_level = compression_level
+        self.stats = stats if stats is not None else TransferStats()
+
+        # "json", "orjson" or any object with dumps (returning bytes) and loads
+        self.codec = get_codec(codec)
+
+        # reads are retried on transient errors by default, pass False to
+        # disable retries or the circuit breaker
+        if retry_policy is None:
+            retry_policy = RetryPolicy()
+        elif retry_policy is False:
+            retry_policy = None
+        self.retry_policy = retry_policy
+
+        if circuit_breaker is None:
+            circuit_breaker = CircuitBreaker()
+        elif circuit_breaker is False:
+            circuit_breaker = None
+        self.circuit_breaker = circuit_breaker
+
+        # True keeps requests within the user's throughput quota, a
+        # TokenBucket sets a fixed rate instead
+        if throughput_limiter is True:
+            throughput_limiter = QuotaLimiter()
+        elif throughput_limiter is False:
+            throughput_limiter = None
+        self.throughput_limiter = throughput_limiter
+
+        # identical queries running at the same time share one request
+        if single_flight is True:
+            single_flight = SingleFlight()
+        elif single_flight is False:
+            single_flight = None
+        self.single_flight = single_flight
+
+        # default deadlines, each call can pass its own timeout instead
+        self.timeout = get_timeout(timeout, Timeout(connect=10, read=60))
+
+        # in hybrid mode sync calls are run on a private event loop in a
+        # background thread, so calls from different threads share the
+        # aiohttp pool and are batched together
+        self.hybrid = hybrid
+        self.background_loop = BackgroundLoop()
+        if hybrid and self.batch_interval is None:
+            self.batch_interval = 0.002
+
+        # DataLoader loads of any object made in the same loop iteration are
+        # sent as one aliased query, tick_batch_size objects at most
+        self.tick_batch = tick_batch
+        self.tick_batch_size = tick_batch_size
+        self._tick_batcher = None
+
+        # model objects are shared per (__typename, id) while in use, pass
+        # False to get a new object on every access
+        if identity_map is True:
+            identity_map = IdentityMap()
+        elif identity_map is False:
+            identity_map = None
+        self.identity_map = identity_map
+
+        # fields the models read are kept for a time depending on how often
+        # they change, see igloo.field_cache; True uses the default classes
+        if field_cache is True:
+            field_cache = FieldCache()
+        elif field_cache is False:
+            field_cache = None
+        self.field_cache = field_cache
+
+        # objects notified of every request and subscription event, see
+        # igloo.instrumentation.Observer
+        self.instrumentation = Instrumentation(observers)
+
+    def add_observer(self, observer):
+        self.instrumentation.add(observer)
+
+    def remove_observer(self, observer):
+        self.instrumentation.remove(observer)
+
+    def detect_n_plus_one(self, window=1.0, threshold=5, warn=True):
+        # opt-in diagnostic, see detector.report() for the per call site counts
+        detector = NPlusOneDetector(window=window, threshold=threshold, warn=warn)
+        self.add_observer(detector)
+        return detector
+
+    def keep_cache_coherent(self):
+        # patches the field cache from the update subscriptions until
+        # .stop() is called, see igloo.coherence
+        return CacheCoherence(self).start()
+
     def set_token(self, newToken):
         self.token = newToken
 
-    def __del__(self):
-        loop = asyncio.get_event_loop()
-        loop.run_until_complete(self.__close__())
+    @property
+    def url(self):
+        if self.endpoints is not None:
+            return self.endpoints.current.url
+        return self._url if self._url is not None else url
 
-    async def __close__(self):
-        await self.session.close()
+    @property
+    def subscriptions_url(self):
+        if self.endpoints is not None:
+            return self.endpoints.current.subscriptions_url
+        elif self._subscriptions_url is not None:
+            return self._subscriptions_url
+        return 'wss://{}/subscriptions'.format(host)
+
+    @property
+    def session(self):
+        return self.async_transport.session
+
+    @property
+    def loader_loop(self):
+        # the loop DataLoaders are bound to: sync clients use the background
+        # loop, which also lets client.run() await their loads, async ones
+        # whatever loop is current when the object is created
+        if self.asyncio:
+            return None
+        return self.background_loop.get_loop()
+
+    def close(self):
+        self.sync_transport.close()
+        if self.background_loop.running and not self.background_loop.in_loop_thread():
+            self.background_loop.run(self.async_transport.close())
+            self.background_loop.stop()
+        else:
+            self.async_transport.close_nowait()
+            if not self.background_loop.in_loop_thread():
+                self.background_loop.stop()
+
+    async def aclose(self):
+        self.sync_transport.close()
+        await self.async_transport.close()
+
+    __close__ = aclose
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.aclose()
+
+    def __del__(self):
+        # at interpreter exit the background loop's daemon thread is frozen
+        # and waiting for it would never return
+        if sys.is_finalizing():
+            return
+        try:
+            self.close()
+        except Exception:
+            pass
 
     @property
     def query_root(self):
@@ -54,83 +274,741 @@ class Client:
     def subscription_root(self):
         return SubscriptionRoot(self)
 
-    async def __async_query(self, query, variables=None, keys=[]):
-        payload = {"query": query}
+    def _build_payload(self, query, variables=None, send_query=False):
+        if self.persisted_queries is None:
+            payload = {"query": query}
+        else:
+            # known documents are sent as their hash only, new ones are sent
+            # in full once so that the server registers them
+            sha = self.persisted_queries.hash(query)
+            if send_query or not self.persisted_queries.is_registered(sha):
+                payload = {"query": query}
+            else:
+                payload = {}
+            payload["extensions"] = {"persistedQuery": {
+                "version": 1, "sha256Hash": sha}}
+
         if variables != None:
             payload["variables"] = variables
 
-        headers = {
+        return payload
+
+    def _build_headers(self):
+        return {
             'content-type': "application/json",
+            'accept-encoding': ACCEPT_ENCODING,
             'authorization': "Bearer " + self.token
         }
 
-        async with self.session.post(url, data=json.dumps(payload), headers=headers) as response:
-            parsedRes = await response.json()
+    def _encode_body(self, payload):
+        data = self.codec.dumps(payload)
+        headers = self._build_headers()
 
-        if "errors" in parsedRes.keys():
-            raise GraphQLException(parsedRes["errors"][0]["message"])
+        if self.compression is not None and len(data) > self.compression_threshold:
+            headers['content-encoding'] = self.compression
+            return data, compress(data, self.compression, self.compression_level), headers
 
-        return get_from_dict(parsedRes, ["data", *keys])
+        return data, data, headers
 
-    def __sync_query(self, query, variables=None, keys=[]):
-        payload = {"query": query}
-        if variables != None:
-            payload["variables"] = variables
+    def _persisted_query_fallback(self, query, variables, payload, parsedRes):
+        # returns the payload to send again if the server could not use the hash
+        if "extensions" not in payload:
+            return None
 
-        headers = {
-            'content-type': "application/json",
-            'authorization': "Bearer " + self.token
-        }
+        sha = payload["extensions"]["persistedQuery"]["sha256Hash"]
+        code = get_error_code(parsedRes)
+        if code == PERSISTED_QUERY_NOT_FOUND and "query" not in payload:
+            # the server evicted the document, send the full text again
+            self.persisted_queries.unregister(sha)
+            return self._build_payload(query, variables, send_query=True)
+        elif code == PERSISTED_QUERY_NOT_SUPPORTED:
+            self.persisted_queries = None
+            return self._build_payload(query, variables)
+        elif "errors" not in parsedRes and "query" in payload:
+            self.persisted_queries.register(sha)
 
-        response = requests.request(
-            "POST", url, data=json.dumps(payload), headers=headers)
+        return None
 
-        parsedRes = json.loads(response.text)
+    def _parse_result(self, parsedRes, keys):
         if "errors" in parsedRes.keys():
             raise GraphQLException(parsedRes["errors"][0]["message"])
 
         return get_from_dict(parsedRes, ["data", *keys])
 
-    def query(self, query, variables=None, keys=[], asyncio=None):
-        if asyncio == False or (asyncio is None and not self.asyncio):
-            return self.__sync_query(query, variables=variables, keys=keys)
+    def _check_status(self, status, headers):
+        # these come from proxies as often as from the API itself, and
+        # rarely carry a GraphQL body
+        if status in TRANSIENT_STATUSES:
+            raise TransientError("The server responded with status {}".format(status), status=status,
+                                 retry_after=parse_retry_after(headers.get("retry-after")))
+
+    def _before_request(self):
+        if self.circuit_breaker is not None:
+            self.circuit_breaker.before_request()
+
+    def _after_request(self, exception=None):
+        if self.circuit_breaker is None:
+            return
+        elif exception is None:
+            self.circuit_breaker.record_success()
+        elif isinstance(exception, TransientError) and exception.status == 429:
+            # a throttled request is retried after a while, but the server
+            # is up: opening the breaker would only add an outage to it
+            self.circuit_breaker.release()
+        else:
+            self.circuit_breaker.record_failure()
+
+    def _caller_timeout(self, exception, deadline, timeout_errors):
+        # a timeout from the caller's own deadline, rather than the client's
+        # defaults, says nothing about the endpoint
+        return isinstance(exception, timeout_errors) and \
+            (deadline.expired() or deadline.timeout is not self.timeout)
+
+    def _release_request(self):
+        if self.circuit_breaker is not None:
+            self.circuit_breaker.release()
+
+    def _abandon_request(self, exception):
+        # cancelled or out of time before the endpoint answered: the breaker
+        # learnt nothing, anything else raised after the response did
+        if isinstance(exception, (asyncio.CancelledError, DeadlineExceeded, KeyboardInterrupt)):
+            self._release_request()
+        else:
+            self._after_request()
+
+    def _should_retry(self, attempt, exception, idempotent):
+        return self.retry_policy is not None and \
+            self.retry_policy.should_retry(attempt, exception, idempotent)
+
+    def _start_deadline(self, timeout=None):
+        return get_timeout(timeout, self.timeout).start()
+
+    def _start_event(self, query, variables=None, batch_size=1):
+        # without observers nothing is measured
+        if not self.instrumentation:
+            return None
+
+        event = RequestEvent(query, len(self.codec.dumps(variables)) if variables is not None else 0,
+                             loader_batch_size.get(), batch_size, request_site.get())
+        self.instrumentation.emit("request_start", event)
+        return event
+
+    def _end_event(self, event, exception=None):
+        if event is None:
+            return
+
+        if exception is None:
+            status = "ok"
+        elif isinstance(exception, GraphQLException):
+            status = "graphql_error"
+        elif isinstance(exception, (DeadlineExceeded, asyncio.TimeoutError)):
+            status = "timeout"
+        elif isinstance(exception, asyncio.CancelledError):
+            status = "cancelled"
+        elif isinstance(exception, CircuitOpenError):
+            status = "circuit_open"
         else:
-            return self.__async_query(query, variables=variables, keys=keys)
+            status = "error"
+
+        event.finish(status, exception)
+        self.instrumentation.emit("request_end", event)
+
+    def _record_transfer(self, events, sent, sent_raw, received, received_raw, http_status):
+        self.stats.record(sent, sent_raw, received, received_raw)
+        for event in events or ():
+            event.bytes_sent += sent
+            event.bytes_received += received
+            event.http_status = http_status
+
+    def _current_endpoint(self):
+        return self.endpoints.current if self.endpoints is not None else None
+
+    def _endpoint_result(self, endpoint, status=None):
+        # no status means the endpoint could not be reached at all
+        if endpoint is None:
+            return
+        elif status is None or status in (502, 503, 504):
+            self.endpoints.record_failure(endpoint)
+        else:
+            self.endpoints.record_success(endpoint)
+
+    async def __async_probe(self):
+        if self.endpoints is not None and self.endpoints.start_probe():
+            await self.endpoints.probe_async(self.async_transport)
+
+    def __sync_probe(self):
+        if self.endpoints is not None and self.endpoints.start_probe():
+            self.endpoints.probe(self.sync_transport)
+
+    async def __async_send(self, payload, deadline, events=None):
+        raw, data, headers = self._encode_body(payload)
+        endpoint = self._current_endpoint()
+        try:
+            response, body = await self.async_transport.post(endpoint.url if endpoint is not None else self.url,
+                                                             data=data, headers=headers,
+                                                             connect_timeout=deadline.connect,
+                                                             read_timeout=deadline.read,
+                                                             total_timeout=deadline.total)
+        except self.async_transport.transient_errors as e:
+            if not self._caller_timeout(e, deadline, self.async_transport.timeout_errors):
+                self._endpoint_result(endpoint)
+            raise
+        self._endpoint_result(endpoint, response.status)
+
+        self._record_transfer(events, len(data), len(raw),
+                              self.async_transport.wire_size(response, body), len(body), response.status)
+        self._check_status(response.status, response.headers)
+        return self.codec.loads(body)
+
+    def __sync_send(self, payload, deadline, events=None):
+        raw, data, headers = self._encode_body(payload)
+        endpoint = self._current_endpoint()
+        try:
+            response = self.sync_transport.post(endpoint.url if endpoint is not None else self.url,
+                                                data=data, headers=headers,
+                                                connect_timeout=deadline.connect,
+                                                read_timeout=deadline.read)
+        except self.sync_transport.transient_errors as e:
+            if not self._caller_timeout(e, deadline, self.sync_transport.timeout_errors):
+                self._endpoint_result(endpoint)
+            raise
+        self._endpoint_result(endpoint, response.status_code)
+
+        self._record_transfer(events, len(data), len(raw),
+                              self.sync_transport.wire_size(response), len(response.content), response.status_code)
+        self._check_status(response.status_code, response.headers)
+        return self.codec.loads(response.content)
+
+    def _request_cost(self, payload):
+        return len(payload) if isinstance(payload, list) else 1
+
+    def _update_quota(self, parsedRes):
+        user = get_from_dict(parsedRes, ["data", "user"]) if "errors" not in parsedRes else None
+        if user is None:
+            self.throughput_limiter.cancel_refresh()
+        else:
+            self.throughput_limiter.update_quota(
+                user["maxThroughput"], user["usedThroughput"])
+
+    async def __async_throttle(self, payload):
+        limiter = self.throughput_limiter
+        if limiter is None:
+            return
+
+        if isinstance(limiter, QuotaLimiter) and limiter.start_refresh():
+            try:
+                self._update_quota(await self.__async_send({"query": QUOTA_QUERY}, self._start_deadline()))
+            except Exception:
+                limiter.cancel_refresh()
+
+        await limiter.acquire_async(self._request_cost(payload))
+
+    def __sync_throttle(self, payload):
+        limiter = self.throughput_limiter
+        if limiter is None:
+            return
+
+        if isinstance(limiter, QuotaLimiter) and limiter.start_refresh():
+            try:
+                self._update_quota(self.__sync_send({"query": QUOTA_QUERY}, self._start_deadline()))
+            except Exception:
+                limiter.cancel_refresh()
+
+        limiter.acquire(self._request_cost(payload))
+
+    async def __async_post(self, payload, idempotent=False, deadline=None, events=None):
+        transient_errors = self.async_transport.transient_errors + (TransientError,)
+        if deadline is None:
+            deadline = self._start_deadline()
+        await self.__async_probe()
+        attempt = 0
+        while True:
+            await self.__async_throttle(payload)
+            deadline.check()
+            self._before_request()
+            try:
+                parsedRes = await self.__async_send(payload, deadline, events)
+            except transient_errors as e:
+                if self._caller_timeout(e, deadline, self.async_transport.timeout_errors):
+                    self._release_request()
+                else:
+                    self._after_request(e)
+                if not self._should_retry(attempt, e, idempotent):
+                    raise
+                delay = self.retry_policy.delay(attempt, e)
+                if not deadline.allows(delay):
+                    raise
+                await asyncio.sleep(delay)
+                attempt += 1
+                for event in events or ():
+                    event.retries += 1
+                continue
+            except BaseException as e:
+                self._abandon_request(e)
+                raise
+
+            self._after_request()
+            return parsedRes
+
+    def __sync_post(self, payload, idempotent=False, deadline=None, events=None):
+        transient_errors = self.sync_transport.transient_errors + (TransientError,)
+        if deadline is None:
+            deadline = self._start_deadline()
+        self.__sync_probe()
+        attempt = 0
+        while True:
+            self.__sync_throttle(payload)
+            deadline.check()
+            self._before_request()
+            try:
+                parsedRes = self.__sync_send(payload, deadline, events)
+            except transient_errors as e:
+                if self._caller_timeout(e, deadline, self.sync_transport.timeout_errors):
+                    self._release_request()
+                else:
+                    self._after_request(e)
+                if not self._should_retry(attempt, e, idempotent):
+                    raise
+                delay = self.retry_policy.delay(attempt, e)
+                if not deadline.allows(delay):
+                    raise
+                time.sleep(delay)
+                attempt += 1
+                for event in events or ():
+                    event.retries += 1
+                continue
+            except BaseException as e:
+                self._abandon_request(e)
+                raise
+
+            self._after_request()
+            return parsedRes
+
+    async def __async_query(self, query, variables=None, keys=[], timeout=None):
+        event = self._start_event(query, variables)
+        events = [event] if event is not None else None
+        try:
+            deadline = self._start_deadline(timeout)
+            idempotent = not is_mutation(query)
+            payload = self._build_payload(query, variables)
+            parsedRes = await self.__async_post(payload, idempotent, deadline, events)
+
+            retry_payload = self._persisted_query_fallback(
+                query, variables, payload, parsedRes)
+            if retry_payload is not None:
+                parsedRes = await self.__async_post(retry_payload, idempotent, deadline, events)
+                self._persisted_query_fallback(
+                    query, variables, retry_payload, parsedRes)
+
+            result = self._parse_result(parsedRes, keys)
+        except BaseException as e:
+            self._end_event(event, e)
+            raise
+        finally:
+            self._invalidate_fields(query, variables)
+
+        self._end_event(event)
+        return result
+
+    def __sync_query(self, query, variables=None, keys=[], timeout=None):
+        event = self._start_event(query, variables)
+        events = [event] if event is not None else None
+        try:
+            deadline = self._start_deadline(timeout)
+            idempotent = not is_mutation(query)
+            payload = self._build_payload(query, variables)
+            parsedRes = self.__sync_post(payload, idempotent, deadline, events)
+
+            retry_payload = self._persisted_query_fallback(
+                query, variables, payload, parsedRes)
+            if retry_payload is not None:
+                parsedRes = self.__sync_post(retry_payload, idempotent, deadline, events)
+                self._persisted_query_fallback(
+                    query, variables, retry_payload, parsedRes)
+
+            result = self._parse_result(parsedRes, keys)
+        except BaseException as e:
+            self._end_event(event, e)
+            raise
+        finally:
+            self._invalidate_fields(query, variables)
+
+        self._end_event(event)
+        return result
+
+    def _check_batch_response(self, payloads, results):
+        if isinstance(results, dict) and "errors" in results:
+            raise GraphQLException(results["errors"][0]["message"])
+        elif not isinstance(results, list) or len(results) != len(payloads):
+            raise GraphQLException("The server does not support batched queries")
+
+    def _batch_fallbacks(self, operations, payloads, results):
+        retries = []
+        for i, ((query, variables, _), payload, parsedRes) in enumerate(zip(operations, payloads, results)):
+            retry_payload = self._persisted_query_fallback(
+                query, variables, payload, parsedRes)
+            if retry_payload is not None:
+                retries.append((i, retry_payload))
+
+        return retries
+
+    def _apply_batch_retries(self, operations, retries, retried, results):
+        for (i, payload), parsedRes in zip(retries, retried):
+            query, variables, _ = operations[i]
+            self._persisted_query_fallback(query, variables, payload, parsedRes)
+            results[i] = parsedRes
+
+    def _batch_events(self, operations, events):
+        events = list(events) if events is not None else [None] * len(operations)
+        for event in events:
+            if event is not None:
+                event.batch_size = len(operations)
+        return events
+
+    def _batch_outcomes(self, operations, results):
+        outcomes = []
+        for (_, _, keys), parsedRes in zip(operations, results):
+            try:
+                outcomes.append((self._parse_result(parsedRes, keys), None))
+            except Exception as e:
+                outcomes.append((None, e))
+
+        return outcomes
+
+    def _sync_batch_query(self, operations, events=None):
+        events = self._batch_events(operations, events)
+        observed = [event for event in events if event is not None]
+        try:
+            payloads = [self._build_payload(query, variables)
+                        for query, variables, _ in operations]
+            idempotent = not any(is_mutation(query) for query, _, _ in operations)
+            results = self.__sync_post(payloads, idempotent, events=observed)
+            self._check_batch_response(payloads, results)
+
+            retries = self._batch_fallbacks(operations, payloads, results)
+            if retries:
+                retried = self.__sync_post([payload for _, payload in retries], idempotent, events=observed)
+                self._check_batch_response(retries, retried)
+                self._apply_batch_retries(operations, retries, retried, results)
+        except BaseException as e:
+            for event in events:
+                self._end_event(event, e)
+            raise
+        finally:
+            for query, variables, _ in operations:
+                self._invalidate_fields(query, variables)
+
+        outcomes = self._batch_outcomes(operations, results)
+        for event, (_, exception) in zip(events, outcomes):
+            self._end_event(event, exception)
+        return outcomes
+
+    async def _async_batch_query(self, operations, events=None):
+        events = self._batch_events(operations, events)
+        observed = [event for event in events if event is not None]
+        try:
+            payloads = [self._build_payload(query, variables)
+                        for query, variables, _ in operations]
+            idempotent = not any(is_mutation(query) for query, _, _ in operations)
+            results = await self.__async_post(payloads, idempotent, events=observed)
+            self._check_batch_response(payloads, results)
+
+            retries = self._batch_fallbacks(operations, payloads, results)
+            if retries:
+                retried = await self.__async_post([payload for _, payload in retries], idempotent, events=observed)
+                self._check_batch_response(retries, retried)
+                self._apply_batch_retries(operations, retries, retried, results)
+        except BaseException as e:
+            for event in events:
+                self._end_event(event, e)
+            raise
+        finally:
+            for query, variables, _ in operations:
+                self._invalidate_fields(query, variables)
+
+        outcomes = self._batch_outcomes(operations, results)
+        for event, (_, exception) in zip(events, outcomes):
+            self._end_event(event, exception)
+        return outcomes
+
+    async def __async_batched_query(self, query, variables=None, keys=[], timeout=None):
+        loop = asyncio.get_running_loop()
+        if self._async_batcher is None or self._async_batcher.loop is not loop:
+            self._async_batcher = AsyncBatcher(self._async_batch_query,
+                                               batch_interval=self.batch_interval,
+                                               max_batch_size=self.max_batch_size)
+
+        # the batch itself is sent with the client's default timeout, a
+        # shorter one only bounds how long this caller waits for it
+        total = get_timeout(timeout, self.timeout).total
+        event = self._start_event(query, variables)
+        return await asyncio.wait_for(self._async_batcher.submit(query, variables, keys, event), total)
+
+    def map(self, fn, objects, max_workers=None):
+        if self.asyncio:
+            raise Exception("map is only available on synchronous clients, use asyncio.gather instead")
+
+        # by default there is a worker for each pooled connection, so no
+        # worker waits for a socket and none is opened outside the pool
+        if max_workers is None:
+            max_workers = self.sync_transport.pool_maxsize
+
+        return map_items(fn, objects, max_workers)
+
+    def fetch_many(self, objects, fields, max_workers=None):
+        objects = list(objects)
+        pairs = [(obj, field) for obj in objects for field in fields]
+        fetched = self.map(lambda pair: getattr(*pair), pairs, max_workers=max_workers)
+
+        # regroup the values as one dict per object, an object with a
+        # failing field gets the first error instead
+        values = []
+        errors = {}
+        for index, obj in enumerate(objects):
+            start = index * len(fields)
+            failed = [fetched.errors[i] for i in range(start, start + len(fields)) if i in fetched.errors]
+            if failed:
+                values.append(None)
+                errors[index] = failed[0]
+            else:
+                values.append(dict(zip(fields, fetched[start:start + len(fields)])))
+
+        return MapResult(values, errors)
+
+    def batch(self, max_batch_size=None, max_batch_wait=None):
+        return BatchContext(self, max_batch_size=max_batch_size, max_batch_wait=max_batch_wait)
+
+    def _shares_flight(self, query):
+        return self.single_flight is not None and not is_mutation(query)
+
+    async def __async_shared_query(self, query, variables=None, keys=[], timeout=None):
+        key = SingleFlight.key(query, variables, self.token, keys)
+        return await self.single_flight.do_async(key, lambda: self.__async_dispatch(query, variables, keys, timeout),
+                                                 get_timeout(timeout, self.timeout).total)
+
+    def __async_dispatch(self, query, variables=None, keys=[], timeout=None):
+        if self.batch_interval is not None:
+            return self.__async_batched_query(query, variables=variables, keys=keys, timeout=timeout)
+        else:
+            return self.__async_query(query, variables=variables, keys=keys, timeout=timeout)
+
+    def __async_call(self, query, variables=None, keys=[], timeout=None):
+        if self._shares_flight(query):
+            return self.__async_shared_query(query, variables=variables, keys=keys, timeout=timeout)
+        else:
+            return self.__async_dispatch(query, variables=variables, keys=keys, timeout=timeout)
+
+    def _invalidate_fields(self, query, variables):
+        # the variables of the SDK's mutations are named after the fields
+        # they change, e.g. updateThing(id:$id,name:$name); creating or
+        # deleting a child (thingId, environmentId) changes its parent's lists;
+        # the objects of the identity map forget what they read of them
+        if not variables or not is_mutation(query):
+            return
+
+        name = describe_document(query)[1] or ""
+        id = variables.get("id")
+        parents = [value for variable, value in variables.items()
+                   if variable.endswith("Id") and isinstance(value, str)]
+        if name.startswith(("delete", "move")):
+            # the parents the object is taken out of aren't in the variables,
+            # e.g. the environment a thing is moved away from
+            parents += self._referenced(parents + ([id] if id is not None else []))
+
+        if self.identity_map is not None:
+            for touched in parents + ([id] if id is not None else []):
+                for obj in self.identity_map.find(touched):
+                    obj._forget()
+
+        if self.field_cache is None:
+            return
+
+        if id is not None:
+            if name.startswith("delete"):
+                self.field_cache.invalidate(id)
+            else:
+                self.field_cache.invalidate(id, set(variables) - {"id"} | {"updatedAt"})
+
+        for parent in parents:
+            self.field_cache.invalidate(parent)
+
+    def _referenced(self, ids):
+        # the ids of the objects what was read of ids points to, and of
+        # those listing them
+        referenced = []
+        for id in ids:
+            if self.field_cache is not None:
+                referenced += self.field_cache.references(id) + self.field_cache.containing(id)
+            if self.identity_map is not None:
+                for obj in self.identity_map.objects():
+                    for value in (obj._snapshot or {}).values():
+                        if obj._id == id and isinstance(value, dict) and value.get("id") is not None:
+                            referenced.append(value["id"])
+                        elif isinstance(value, list) and any(isinstance(item, dict) and item.get("id") == id
+                                                             for item in value):
+                            referenced.append(obj._id)
+        return referenced
+
+    def load_fields(self, root, id, fields):
+        # what the models' DataLoaders call, returns an awaitable of the
+        # object's fields
+        if self.instrumentation:
+            request_site.set(load_site.get())
+
+        if self.field_cache is not None:
+            return self.__cached_load_fields(root, id, fields)
+
+        return self.__load_fields(root, id, fields)
+
+    async def __cached_load_fields(self, root, id, fields):
+        typename = root[0].upper() + root[1:]
+        values, missing = self.field_cache.lookup(typename, id, fields)
+        if missing:
+            res = await self.__load_fields(root, id, set(missing))
+            loaded = {selection: res[field_name(selection)] for selection in missing}
+            self.field_cache.update(typename, id, loaded)
+            values.update(loaded)
+
+        return {field_name(selection): value for selection, value in values.items()}
+
+    def __load_fields(self, root, id, fields):
+        if self.tick_batch:
+            loop = asyncio.get_running_loop()
+            if self._tick_batcher is None or self._tick_batcher.loop is not loop:
+                self._tick_batcher = TickBatcher(self.__tick_batch_query, max_batch_size=self.tick_batch_size,
+                                                 split_on=(GraphQLException,))
+            return self._tick_batcher.load(root, id, fields)
+
+        return self.query('query($id:ID!){%s(id:$id){%s}}' % (root, " ".join(sorted(fields))),
+                          variables={"id": id}, keys=[root])
+
+    def __tick_batch_query(self, query, variables):
+        return self.query(query, variables=variables, asyncio=True)
+
+    def run(self, coro, timeout=None):
+        # runs a coroutine on the client's background loop and waits for it
+        return self.background_loop.run(coro, timeout)
+
+    def iterate(self, agen):
+        # iterates an async generator, like subscribe(), from sync code
+        return self.background_loop.iterate(agen)
+
+    def _reads_directly(self, asyncio=None):
+        # whether query() returns the value itself rather than a coroutine
+        # or the pending result of a batch
+        if self.background_loop.in_loop_thread():
+            return False
+        return (asyncio == False or (asyncio is None and not self.asyncio)) and getattr(self._local, "batch", None) is None
+
+    def query(self, query, variables=None, keys=[], asyncio=None, timeout=None):
+        if self.background_loop.in_loop_thread():
+            # code running on the background loop (DataLoaders, coroutines
+            # passed to client.run) can't block it, so it gets a coroutine;
+            # callers that need the result right away, like the setters, can't
+            # use one
+            if asyncio == False:
+                raise Exception("Blocking calls can't be made from the client's event loop, await the coroutine instead")
+            return self._at_call_site(self.__async_call(query, variables=variables, keys=keys, timeout=timeout))
+        elif asyncio == False or (asyncio is None and not self.asyncio):
+            batch = getattr(self._local, "batch", None)
+            if batch is not None:
+                return batch.add(query, variables, keys, self._start_event(query, variables))
+            elif self.hybrid:
+                return self.run(self._at_call_site(self.__async_call(query, variables=variables, keys=keys, timeout=timeout)))
+            elif self._shares_flight(query):
+                key = SingleFlight.key(query, variables, self.token, keys)
+                return self.single_flight.do(key, lambda: self.__sync_query(query, variables=variables, keys=keys, timeout=timeout),
+                                             get_timeout(timeout, self.timeout).total)
+
+            return self.__sync_query(query, variables=variables, keys=keys, timeout=timeout)
+        else:
+            return self._at_call_site(self.__async_call(query, variables=variables, keys=keys, timeout=timeout))
 
     mutation = query
 
-    async def _subscribe(self, query):
-        async with websockets.connect(
-                'wss://{}/subscriptions'.format(host), ssl=True, subprotocols=["graphql-ws"]) as websocket:
-            await websocket.send('{"type":"connection_init","payload":{"Authorization":"Bearer %s"}}' % (self.token))
-
-            res = await websocket.recv()
-            if json.loads(res)["type"] != "connection_ack":
-                raise Exception("failed to connect")
-
-            # TODO: escape better the query
-            listen_query_message = '{"id":"1","type":"start","payload":{"query":"%s","variables":null}}' % (
-                query.replace('"', '\\"').replace('\n', '\\n')
-            )
-            await websocket.send(listen_query_message)
-            while True:
-                response = await websocket.recv()
-                parsedResponse = json.loads(response)
-                if parsedResponse["type"] == "data":
-                    if "errors" in parsedResponse["payload"].keys():
-                        raise GraphQLException(
-                            parsedResponse["payload"]["errors"][0]["message"])
-                    else:
-                        yield parsedResponse["payload"]["data"]
-
-    async def subscribe(self, query, autoreconnect=True):
-        for backoff in exponential_backoff():
+    def _at_call_site(self, coro):
+        # the coroutine may send its request from another task or thread,
+        # the site is captured here while the caller is still on the stack
+        if not self.instrumentation:
+            return coro
+        return _with_request_site(request_site.get() or call_site(), coro)
+
+    def _subscription_event(self, kind, query, **kwargs):
+        if self.instrumentation:
+            self.instrumentation.emit("subscription_" + kind, SubscriptionEvent(kind, query, **kwargs))
+
+    async def _subscribe(self, query, variables=None, timeout=None, receive_timeout=None, attempt=0):
+        # a subscription has no total deadline, connect bounds the handshake
+        # and read the wait for the server's ack; receive_timeout is how long
+        # the connection may stay silent before it is considered dead, the
+        # read timeout by default since the server sends keep alives
+        timeout = get_timeout(timeout, self.timeout)
+        if receive_timeout is None:
+            receive_timeout = timeout.read
+        await self.__async_probe()
+        endpoint = self._current_endpoint()
+        subscriptions_url = endpoint.subscriptions_url if endpoint is not None else self.subscriptions_url
+        self._subscription_event("connect", query, attempt=attempt)
+        start = time.perf_counter()
+        acked = False
+        try:
+            async with websockets.connect(
+                    subscriptions_url, ssl=True if subscriptions_url.startswith("wss://") else None,
+                    subprotocols=["graphql-ws"], open_timeout=timeout.connect) as websocket:
+                # graphql-ws expects text frames
+                await websocket.send(self.codec.dumps({"type": "connection_init",
+                                                       "payload": {"Authorization": "Bearer " + self.token}}).decode("utf-8"))
+
+                res = await asyncio.wait_for(websocket.recv(), timeout.read)
+                if self.codec.loads(res)["type"] != "connection_ack":
+                    raise Exception("failed to connect")
+                acked = True
+                self._endpoint_result(endpoint, 101)
+                self._subscription_event("ack", query, attempt=attempt, latency=time.perf_counter() - start)
+
+                listen_query_message = self.codec.dumps({"id": "1",
+                                                         "type": "start",
+                                                         "payload": {"query": query, "variables": variables}}).decode("utf-8")
+                await websocket.send(listen_query_message)
+                while True:
+                    response = await asyncio.wait_for(websocket.recv(), receive_timeout)
+                    parsedResponse = self.codec.loads(response)
+                    if parsedResponse["type"] == "data":
+                        if self.instrumentation:
+                            self._subscription_event("message", query, attempt=attempt,
+                                                     bytes_received=len(response.encode("utf-8") if isinstance(response, str) else response))
+                        if "errors" in parsedResponse["payload"].keys():
+                            raise GraphQLException(
+                                parsedResponse["payload"]["errors"][0]["message"])
+                        else:
+                            yield parsedResponse["payload"]["data"]
+        except (OSError, asyncio.TimeoutError, websockets.WebSocketException):
+            # the reconnect goes to another endpoint if this one never answered
+            if not acked:
+                self._endpoint_result(endpoint)
+            raise
+
+    async def subscribe(self, query, autoreconnect=True, variables=None, timeout=None, receive_timeout=None):
+        backoff = exponential_backoff()
+        attempt = 0
+        while True:
+            received = False
             try:
-                async for res in self._subscribe(query):
+                async for res in self._subscribe(query, variables=variables, timeout=timeout,
+                                                 receive_timeout=receive_timeout, attempt=attempt):
+                    received = True
                     yield res
             except GraphQLException:
                 raise
-            except Exception:
+            except Exception as e:
                 if not autoreconnect:
                     raise
-                await asyncio.sleep(backoff)
+
+                # a connection that delivered data was healthy, so the
+                # next drop starts again from the shortest delay
+                if received:
+                    backoff = exponential_backoff()
+                delay = next(backoff)
+                attempt += 1
+                self._subscription_event("reconnect", query, attempt=attempt, delay=delay, error=e)
+                await asyncio.sleep(delay)
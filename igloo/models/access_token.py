@@ -1,17 +1,18 @@
 
 from aiodataloader import DataLoader
-from igloo.models.utils import wrapWith
+from igloo.instrumentation import loader_batch_size
+from igloo.models.utils import Model, wrapWith, prefetch_fields, prefetch_selection, prefetched, PAGE_SIZE
 
 
 class AccessTokenLoader(DataLoader):
     def __init__(self, client, id):
-        super().__init__()
+        super().__init__(loop=client.loader_loop)
         self.client = client
         self._id = id
 
     async def batch_load_fn(self, keys):
-        fields = " ".join(set(keys))
-        res = await self.client.query('{accessToken(id:"%s"){%s}}' % (self._id, fields), keys=["accessToken"])
+        loader_batch_size.set(len(keys))
+        res = await self.client.load_fields("accessToken", self._id, set(keys))
 
         # if fetching object the key will be the first part of the field
         # e.g. when fetching thing{id} the result is in the thing key
@@ -20,11 +21,14 @@ class AccessTokenLoader(DataLoader):
         return resolvedValues
 
 
-class AccessToken:
+class AccessToken(Model):
+    _root = "accessToken"
+    _loader_class = AccessTokenLoader
+    __slots__ = ()
+
     def __init__(self, client, id):
         self.client = client
         self._id = id
-        self.loader = AccessTokenLoader(client, id)
 
     @property
     def id(self):
@@ -35,7 +39,7 @@ class AccessToken:
         if self.client.asyncio:
             res = self.loader.load("user{id}")
         else:
-            res = self.client.query('{accessToken(id:"%s"){user{id}}}' % self._id, keys=[
+            res = self._query('query($id:ID!){accessToken(id:$id){user{id}}}', variables={"id": self._id}, keys=[
                 "accessToken", "user"])
 
         from .user import User
@@ -50,7 +54,7 @@ class AccessToken:
         if self.client.asyncio:
             return self.loader.load("name")
         else:
-            return self.client.query('{accessToken(id:"%s"){name}}' % self._id, keys=[
+            return self._query('query($id:ID!){accessToken(id:$id){name}}', variables={"id": self._id}, keys=[
                 "accessToken", "name"])
 
     @property
@@ -58,7 +62,7 @@ class AccessToken:
         if self.client.asyncio:
             return self.loader.load("createdAt")
         else:
-            return self.client.query('{accessToken(id:"%s"){createdAt}}' % self._id, keys=[
+            return self._query('query($id:ID!){accessToken(id:$id){createdAt}}', variables={"id": self._id}, keys=[
                 "accessToken", "createdAt"])
 
     @property
@@ -66,7 +70,7 @@ class AccessToken:
         if self.client.asyncio:
             return self.loader.load("updatedAt")
         else:
-            return self.client.query('{accessToken(id:"%s"){updatedAt}}' % self._id, keys=[
+            return self._query('query($id:ID!){accessToken(id:$id){updatedAt}}', variables={"id": self._id}, keys=[
                 "accessToken", "updatedAt"])
 
     @property
@@ -74,7 +78,7 @@ class AccessToken:
         if self.client.asyncio:
             return self.loader.load("lastUsed")
         else:
-            return self.client.query('{accessToken(id:"%s"){lastUsed}}' % self._id, keys=[
+            return self._query('query($id:ID!){accessToken(id:$id){lastUsed}}', variables={"id": self._id}, keys=[
                 "accessToken", "lastUsed"])
 
 
@@ -82,25 +86,31 @@ class AccessTokenList:
     def __init__(self, client, userId):
         self.client = client
         self.current = 0
+        self._page = []
+        self._prefetch = ()
         self.userId = userId
 
+    def prefetch(self, *fields):
+        self._prefetch = prefetch_fields(self.client, (AccessToken,), fields)
+        return self
+
     def __len__(self):
         res = self.client.query(
-            '{user(id:%s){accessTokenCount}}' % self.userId)
+            'query($id:ID!){user(id:$id){accessTokenCount}}', variables={"id": self.userId})
         return res["user"]["accessTokenCount"]
 
     def __getitem__(self, i):
         if isinstance(i, int):
             res = self.client.query(
-                '{user(id:%s){accessTokens(limit:1, offset:%d){id}}}' % (self.userId, i))
+                'query($id:ID!,$offset:Int!){user(id:$id){accessTokens(limit:1,offset:$offset){id%s}}}' % prefetch_selection(self._prefetch), variables={"id": self.userId, "offset": i})
             if len(res["user"]["accessTokens"]) != 1:
                 raise IndexError()
-            return AccessToken(self.client, res["user"]["accessTokens"][0]["id"])
+            return prefetched(AccessToken(self.client, res["user"]["accessTokens"][0]["id"]), res["user"]["accessTokens"][0], self._prefetch)
         elif isinstance(i, slice):
             start, end, _ = i.indices(len(self))
             res = self.client.query(
-                '{user(id:%s){accessTokens(offset:%d, limit:%d){id}}}' % (self.userId, start, end-start))
-            return [AccessToken(self.client, token["id"]) for token in res["user"]["accessTokens"]]
+                'query($id:ID!,$offset:Int!,$limit:Int!){user(id:$id){accessTokens(offset:$offset,limit:$limit){id%s}}}' % prefetch_selection(self._prefetch), variables={"id": self.userId, "offset": start, "limit": end-start})
+            return [prefetched(AccessToken(self.client, token["id"]), token, self._prefetch) for token in res["user"]["accessTokens"]]
         else:
             raise TypeError("Unexpected type {} passed as index".format(i))
 
@@ -108,14 +118,16 @@ class AccessTokenList:
         return self
 
     def __next__(self):
-        res = self.client.query(
-            '{user(id:%s){accessTokens(limit:1, offset:%d){id}}}' % (self.userId, self.current))
-
-        if len(res["user", "accessTokens"]) != 1:
-            raise StopIteration
+        if not self._page:
+            res = self.client.query(
+                'query($id:ID!,$offset:Int!,$limit:Int!){user(id:$id){accessTokens(limit:$limit,offset:$offset){id%s}}}' % prefetch_selection(self._prefetch), variables={"id": self.userId, "offset": self.current, "limit": PAGE_SIZE})
+            self._page = res["user"]["accessTokens"]
+            if not self._page:
+                raise StopIteration
 
         self.current += 1
-        return AccessToken(self.client, res["user"]["accessTokens"][0]["id"])
+        token = self._page.pop(0)
+        return prefetched(AccessToken(self.client, token["id"]), token, self._prefetch)
 
     def next(self):
         return self.__next__()
@@ -1,16 +1,18 @@
 
 from aiodataloader import DataLoader
+from igloo.instrumentation import loader_batch_size
+from igloo.models.utils import Model, wrapWith
 
 
 class BooleanVariableLoader(DataLoader):
     def __init__(self, client, id):
-        super().__init__()
+        super().__init__(loop=client.loader_loop)
         self.client = client
         self._id = id
 
     async def batch_load_fn(self, keys):
-        fields = " ".join(set(keys))
-        res = await self.client.query('{booleanVariable(id:"%s"){%s}}' % (self._id, fields), keys=["booleanVariable"])
+        loader_batch_size.set(len(keys))
+        res = await self.client.load_fields("booleanVariable", self._id, set(keys))
 
         # if fetching object the key will be the first part of the field
         # e.g. when fetching thing{id} the result is in the thing key
@@ -19,11 +21,14 @@ class BooleanVariableLoader(DataLoader):
         return resolvedValues
 
 
-class BooleanVariable:
+class BooleanVariable(Model):
+    _root = "booleanVariable"
+    _loader_class = BooleanVariableLoader
+    __slots__ = ()
+
     def __init__(self, client, id):
         self.client = client
         self._id = id
-        self.loader = BooleanVariableLoader(client, id)
 
     @property
     def id(self):
@@ -34,72 +39,72 @@ class BooleanVariable:
         if self.client.asyncio:
             return self.loader.load("name")
         else:
-            return self.client.query('{booleanVariable(id:"%s"){name}}' % self._id, keys=[
+            return self._query('query($id:ID!){booleanVariable(id:$id){name}}', variables={"id": self._id}, keys=[
                 "booleanVariable", "name"])
 
     @name.setter
     def name(self, newName):
-        self.client.mutation(
-            'mutation{updateBooleanVariable(id:"%s", name:"%s"){id}}' % (self._id, newName), asyncio=False)
+        self._mutation(
+            'mutation($id:ID!,$name:String){updateBooleanVariable(id:$id,name:$name){id}}', variables={"id": self._id, "name": newName}, asyncio=False)
 
     @property
     def developer_only(self):
         if self.client.asyncio:
             return self.loader.load("developerOnly")
         else:
-            return self.client.query('{booleanVariable(id:"%s"){developerOnly}}' % self._id, keys=[
+            return self._query('query($id:ID!){booleanVariable(id:$id){developerOnly}}', variables={"id": self._id}, keys=[
                 "booleanVariable", "developerOnly"])
 
     @developer_only.setter
     def developer_only(self, newValue):
-        self.client.mutation(
-            'mutation{updateBooleanVariable(id:"%s", developerOnly:%s){id}}' % (self._id, newValue), asyncio=False)
+        self._mutation(
+            'mutation($id:ID!,$developerOnly:Boolean){updateBooleanVariable(id:$id,developerOnly:$developerOnly){id}}', variables={"id": self._id, "developerOnly": newValue}, asyncio=False)
 
     @property
     def user_permission(self):
         if self.client.asyncio:
             return self.loader.load("userPermission")
         else:
-            return self.client.query('{booleanVariable(id:"%s"){userPermission}}' % self._id, keys=[
+            return self._query('query($id:ID!){booleanVariable(id:$id){userPermission}}', variables={"id": self._id}, keys=[
                 "booleanVariable", "userPermission"])
 
     @user_permission.setter
     def user_permission(self, newValue):
-        self.client.mutation(
-            'mutation{updateBooleanVariable(id:"%s", userPermission:%s){id}}' % (self._id, newValue), asyncio=False)
+        self._mutation(
+            'mutation($id:ID!,$userPermission:Permission){updateBooleanVariable(id:$id,userPermission:$userPermission){id}}', variables={"id": self._id, "userPermission": newValue}, asyncio=False)
 
     @property
     def hidden(self):
         if self.client.asyncio:
             return self.loader.load("hidden")
         else:
-            return self.client.query('{booleanVariable(id:"%s"){hidden}}' % self._id, keys=[
+            return self._query('query($id:ID!){booleanVariable(id:$id){hidden}}', variables={"id": self._id}, keys=[
                 "booleanVariable", "hidden"])
 
     @hidden.setter
     def hidden(self, newValue):
-        self.client.mutation(
-            'mutation{updateBooleanVariable(id:"%s", hidden:%s){id}}' % (self._id, newValue), asyncio=False)
+        self._mutation(
+            'mutation($id:ID!,$hidden:Boolean){updateBooleanVariable(id:$id,hidden:$hidden){id}}', variables={"id": self._id, "hidden": newValue}, asyncio=False)
 
     @property
     def index(self):
         if self.client.asyncio:
             return self.loader.load("index")
         else:
-            return self.client.query('{booleanVariable(id:"%s"){index}}' % self._id, keys=[
+            return self._query('query($id:ID!){booleanVariable(id:$id){index}}', variables={"id": self._id}, keys=[
                 "booleanVariable", "index"])
 
     @index.setter
     def index(self, newValue):
-        self.client.mutation(
-            'mutation{updateBooleanVariable(id:"%s", index:%s){id}}' % (self._id, newValue), asyncio=False)
+        self._mutation(
+            'mutation($id:ID!,$index:Int){updateBooleanVariable(id:$id,index:$index){id}}', variables={"id": self._id, "index": newValue}, asyncio=False)
 
     @property
     def my_role(self):
         if self.client.asyncio:
             return self.loader.load("myRole")
         else:
-            return self.client.query('{booleanVariable(id:"%s"){myRole}}' % self._id, keys=[
+            return self._query('query($id:ID!){booleanVariable(id:$id){myRole}}', variables={"id": self._id}, keys=[
                 "booleanVariable", "myRole"])
 
     @property
@@ -107,7 +112,7 @@ class BooleanVariable:
         if self.client.asyncio:
             return self.loader.load("createdAt")
         else:
-            return self.client.query('{booleanVariable(id:"%s"){createdAt}}' % self._id, keys=[
+            return self._query('query($id:ID!){booleanVariable(id:$id){createdAt}}', variables={"id": self._id}, keys=[
                 "booleanVariable", "createdAt"])
 
     @property
@@ -115,7 +120,7 @@ class BooleanVariable:
         if self.client.asyncio:
             return self.loader.load("updatedAt")
         else:
-            return self.client.query('{booleanVariable(id:"%s"){updatedAt}}' % self._id, keys=[
+            return self._query('query($id:ID!){booleanVariable(id:$id){updatedAt}}', variables={"id": self._id}, keys=[
                 "booleanVariable", "updatedAt"])
 
     async def _async_load_thing(self):
@@ -128,21 +133,24 @@ class BooleanVariable:
         if self.client.asyncio:
             return self._async_load_thing()
         else:
-            id = self.client.query('{booleanVariable(id:"%s"){thing{id}}}' % self._id, keys=[
-                "booleanVariable", "thing", "id"])
+            res = self._query('query($id:ID!){booleanVariable(id:$id){thing{id}}}', variables={"id": self._id}, keys=[
+                "booleanVariable", "thing"])
+
+            def wrapper(res):
+                from .thing import Thing
+                return Thing(self.client, res["id"])
 
-            from .thing import Thing
-            return Thing(self.client, id)
+            return wrapWith(res, wrapper)
 
     @property
     def value(self):
         if self.client.asyncio:
             return self.loader.load("value")
         else:
-            return self.client.query('{booleanVariable(id:"%s"){value}}' % self._id, keys=[
+            return self._query('query($id:ID!){booleanVariable(id:$id){value}}', variables={"id": self._id}, keys=[
                 "booleanVariable", "value"])
 
     @value.setter
     def value(self, newValue):
-        self.client.mutation(
-            'mutation{updateBooleanVariable(id:"%s", value:%s){id}}' % (self._id, "true" if newValue else "false"), asyncio=False)
+        self._mutation(
+            'mutation($id:ID!,$value:Boolean){updateBooleanVariable(id:$id,value:$value){id}}', variables={"id": self._id, "value": newValue}, asyncio=False)
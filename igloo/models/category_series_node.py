@@ -1,17 +1,18 @@
 
 from aiodataloader import DataLoader
-from igloo.models.utils import wrapWith
+from igloo.instrumentation import loader_batch_size
+from igloo.models.utils import Model, wrapWith, prefetch_fields, prefetch_selection, prefetched, prefetched_items, PAGE_SIZE
 
 
 class CategorySeriesNodeLoader(DataLoader):
     def __init__(self, client, id):
-        super().__init__()
+        super().__init__(loop=client.loader_loop)
         self.client = client
         self._id = id
 
     async def batch_load_fn(self, keys):
-        fields = " ".join(set(keys))
-        res = await self.client.query('{categorySeriesNode(id:"%s"){%s}}' % (self._id, fields), keys=["categorySeriesNode"])
+        loader_batch_size.set(len(keys))
+        res = await self.client.load_fields("categorySeriesNode", self._id, set(keys))
 
         # if fetching object the key will be the first part of the field
         # e.g. when fetching thing{id} the result is in the thing key
@@ -20,11 +21,14 @@ class CategorySeriesNodeLoader(DataLoader):
         return resolvedValues
 
 
-class CategorySeriesNode:
+class CategorySeriesNode(Model):
+    _root = "categorySeriesNode"
+    _loader_class = CategorySeriesNodeLoader
+    __slots__ = ()
+
     def __init__(self, client, id):
         self.client = client
         self._id = id
-        self.loader = CategorySeriesNodeLoader(client, id)
 
     @property
     def id(self):
@@ -35,7 +39,7 @@ class CategorySeriesNode:
         if self.client.asyncio:
             return self.loader.load("createdAt")
         else:
-            return self.client.query('{categorySeriesNode(id:"%s"){createdAt}}' % self._id, keys=[
+            return self._query('query($id:ID!){categorySeriesNode(id:$id){createdAt}}', variables={"id": self._id}, keys=[
                 "categorySeriesNode", "createdAt"])
 
     @property
@@ -43,7 +47,7 @@ class CategorySeriesNode:
         if self.client.asyncio:
             return self.loader.load("updatedAt")
         else:
-            return self.client.query('{categorySeriesNode(id:"%s"){updatedAt}}' % self._id, keys=[
+            return self._query('query($id:ID!){categorySeriesNode(id:$id){updatedAt}}', variables={"id": self._id}, keys=[
                 "categorySeriesNode", "updatedAt"])
 
     @property
@@ -51,7 +55,7 @@ class CategorySeriesNode:
         if self.client.asyncio:
             res = self.loader.load("thing{id}")
         else:
-            res = self.client.query('{categorySeriesNode(id:"%s"){thing{id}}}' % self._id, keys=[
+            res = self._query('query($id:ID!){categorySeriesNode(id:$id){thing{id}}}', variables={"id": self._id}, keys=[
                 "categorySeriesNode", "thing"])
 
         def wrapper(res):
@@ -65,7 +69,7 @@ class CategorySeriesNode:
         if self.client.asyncio:
             res = self.loader.load("series{id}")
         else:
-            res = self.client.query('{categorySeriesNode(id:"%s"){series{id}}}' % self._id, keys=[
+            res = self._query('query($id:ID!){categorySeriesNode(id:$id){series{id}}}', variables={"id": self._id}, keys=[
                 "categorySeriesNode", "series"])
 
         def wrapper(res):
@@ -79,51 +83,71 @@ class CategorySeriesNode:
         if self.client.asyncio:
             return self.loader.load("timestamp")
         else:
-            return self.client.query('{categorySeriesNode(id:"%s"){timestamp}}' % self._id, keys=[
+            return self._query('query($id:ID!){categorySeriesNode(id:$id){timestamp}}', variables={"id": self._id}, keys=[
                 "categorySeriesNode", "timestamp"])
 
     @timestamp.setter
     def timestamp(self, newValue):
-        self.client.mutation(
-            'mutation{categorySeriesNode(id:"%s", timestamp:"%s"){id}}' % (self._id, newValue), asyncio=False)
+        self._mutation(
+            'mutation($id:ID!,$timestamp:DateTime){categorySeriesNode(id:$id,timestamp:$timestamp){id}}', variables={"id": self._id, "timestamp": newValue}, asyncio=False)
 
     @property
     def value(self):
         if self.client.asyncio:
             return self.loader.load("value")
         else:
-            return self.client.query('{categorySeriesNode(id:"%s"){value}}' % self._id, keys=[
+            return self._query('query($id:ID!){categorySeriesNode(id:$id){value}}', variables={"id": self._id}, keys=[
                 "categorySeriesNode", "value"])
 
     @value.setter
     def value(self, newValue):
-        self.client.mutation(
-            'mutation{categorySeriesNode(id:"%s", value:"%s"){id}}' % (self._id, newValue), asyncio=False)
+        self._mutation(
+            'mutation($id:ID!,$value:String){categorySeriesNode(id:$id,value:$value){id}}', variables={"id": self._id, "value": newValue}, asyncio=False)
 
 
 class CategorySeriesNodeList:
+    _field = "nodes"
+    _item_selection = "id"
+
     def __init__(self, client, seriesId):
         self.client = client
         self.seriesId = seriesId
         self.current = 0
+        self._page = []
+        self._prefetch = ()
+
+    def prefetch(self, *fields):
+        self._prefetch = prefetch_fields(self.client, (CategorySeriesNode,), fields)
+        return self
 
     def __len__(self):
+        items = prefetched_items(self, "CategorySeriesVariable", self.seriesId)
+        if items is not None:
+            return len(items)
+
         res = self.client.query(
-            '{categorySeriesVariable(id:"%s"){nodeCount}}' % self.seriesId)
+            'query($id:ID!){categorySeriesVariable(id:$id){nodeCount}}', variables={"id": self.seriesId})
         return res["categorySeriesVariable"]["nodeCount"]
 
     def __getitem__(self, i):
+        items = prefetched_items(self, "CategorySeriesVariable", self.seriesId)
+        if items is not None:
+            # prefetched with the series
+            if isinstance(i, slice):
+                return [prefetched(CategorySeriesNode(self.client, node["id"]), node) for node in items[i]]
+            return prefetched(CategorySeriesNode(self.client, items[i]["id"]), items[i])
+
         if isinstance(i, int):
             res = self.client.query(
-                '{categorySeriesVariable(id:"%s"){nodes(limit:1, offset:%d){id}}}' % (self.seriesId, i))
+                'query($id:ID!,$offset:Int!){categorySeriesVariable(id:$id){nodes(limit:1,offset:$offset){id%s}}}' % prefetch_selection(self._prefetch), variables={"id": self.seriesId, "offset": i})
             if len(res["categorySeriesVariable"]["nodes"]) != 1:
                 raise IndexError()
-            return CategorySeriesNode(self.client, res["categorySeriesVariable"]["nodes"][0]["id"])
+            return prefetched(CategorySeriesNode(self.client, res["categorySeriesVariable"]["nodes"][0]["id"]), res["categorySeriesVariable"]["nodes"][0], self._prefetch)
         elif isinstance(i, slice):
             start, end, _ = i.indices(len(self))
             res = self.client.query(
-                '{categorySeriesVariable(id:"%s"){nodes(offset:%d, limit:%d){id}}}' % (self.seriesId, start, end-start))
-            return [CategorySeriesNode(self.client, node["id"]) for node in res["categorySeriesVariable"]["nodes"]]
+                'query($id:ID!,$offset:Int!,$limit:Int!){categorySeriesVariable(id:$id){nodes(offset:$offset,limit:$limit){id%s}}}' % prefetch_selection(self._prefetch), variables={"id": self.seriesId, "offset": start, "limit": end-start})
+            return [prefetched(CategorySeriesNode(self.client, node["id"]), node, self._prefetch) for node in res["categorySeriesVariable"]["nodes"]]
         else:
             raise TypeError("Unexpected type {} passed as index".format(i))
 
@@ -131,14 +155,23 @@ class CategorySeriesNodeList:
         return self
 
     def __next__(self):
-        res = self.client.query(
-            '{categorySeriesVariable(id:"%s"){nodes(limit:1, offset:%d){id}}}' % (self.seriesId, self.current))
-
-        if len(res["categorySeriesVariable", "nodes"]) != 1:
-            raise StopIteration
+        items = prefetched_items(self, "CategorySeriesVariable", self.seriesId)
+        if items is not None:
+            if self.current >= len(items):
+                raise StopIteration
+            self.current += 1
+            return prefetched(CategorySeriesNode(self.client, items[self.current - 1]["id"]), items[self.current - 1])
+
+        if not self._page:
+            res = self.client.query(
+                'query($id:ID!,$offset:Int!,$limit:Int!){categorySeriesVariable(id:$id){nodes(limit:$limit,offset:$offset){id%s}}}' % prefetch_selection(self._prefetch), variables={"id": self.seriesId, "offset": self.current, "limit": PAGE_SIZE})
+            self._page = res["categorySeriesVariable"]["nodes"]
+            if not self._page:
+                raise StopIteration
 
         self.current += 1
-        return CategorySeriesNode(self.client, res["categorySeriesVariable"]["nodes"][0]["id"])
+        node = self._page.pop(0)
+        return prefetched(CategorySeriesNode(self.client, node["id"]), node, self._prefetch)
 
     def next(self):
         return self.__next__()
@@ -1,17 +1,18 @@
 
 from aiodataloader import DataLoader
-from igloo.models.utils import wrapWith
+from igloo.instrumentation import loader_batch_size
+from igloo.models.utils import Model, wrapWith
 
 
 class CategorySeriesVariableLoader(DataLoader):
     def __init__(self, client, id):
-        super().__init__()
+        super().__init__(loop=client.loader_loop)
         self.client = client
         self._id = id
 
     async def batch_load_fn(self, keys):
-        fields = " ".join(set(keys))
-        res = await self.client.query('{categorySeriesVariable(id:"%s"){%s}}' % (self._id, fields), keys=["categorySeriesVariable"])
+        loader_batch_size.set(len(keys))
+        res = await self.client.load_fields("categorySeriesVariable", self._id, set(keys))
 
         # if fetching object the key will be the first part of the field
         # e.g. when fetching thing{id} the result is in the thing key
@@ -20,11 +21,14 @@ class CategorySeriesVariableLoader(DataLoader):
         return resolvedValues
 
 
-class CategorySeriesVariable:
+class CategorySeriesVariable(Model):
+    _root = "categorySeriesVariable"
+    _loader_class = CategorySeriesVariableLoader
+    __slots__ = ()
+
     def __init__(self, client, id):
         self.client = client
         self._id = id
-        self.loader = CategorySeriesVariableLoader(client, id)
 
     @property
     def id(self):
@@ -35,7 +39,7 @@ class CategorySeriesVariable:
         if self.client.asyncio:
             res = self.loader.load("lastNode{id}")
         else:
-            res = self.client.query('{categorySeriesVariable(id:"%s"){lastNode{id}}}' % self._id, keys=[
+            res = self._query('query($id:ID!){categorySeriesVariable(id:$id){lastNode{id}}}', variables={"id": self._id}, keys=[
                 "categorySeriesVariable", "lastNode"])
 
         def wrapper(res):
@@ -54,85 +58,85 @@ class CategorySeriesVariable:
         if self.client.asyncio:
             return self.loader.load("name")
         else:
-            return self.client.query('{categorySeriesVariable(id:"%s"){name}}' % self._id, keys=[
+            return self._query('query($id:ID!){categorySeriesVariable(id:$id){name}}', variables={"id": self._id}, keys=[
                 "categorySeriesVariable", "name"])
 
     @name.setter
     def name(self, newName):
-        self.client.mutation(
-            'mutation{categorySeriesVariable(id:"%s", name:"%s"){id}}' % (self._id, newName), asyncio=False)
+        self._mutation(
+            'mutation($id:ID!,$name:String){categorySeriesVariable(id:$id,name:$name){id}}', variables={"id": self._id, "name": newName}, asyncio=False)
 
     @property
     def developer_only(self):
         if self.client.asyncio:
             return self.loader.load("developerOnly")
         else:
-            return self.client.query('{categorySeriesVariable(id:"%s"){developerOnly}}' % self._id, keys=[
+            return self._query('query($id:ID!){categorySeriesVariable(id:$id){developerOnly}}', variables={"id": self._id}, keys=[
                 "categorySeriesVariable", "developerOnly"])
 
     @developer_only.setter
     def developer_only(self, newValue):
-        self.client.mutation(
-            'mutation{categorySeriesVariable(id:"%s", developerOnly:%s){id}}' % (self._id, newValue), asyncio=False)
+        self._mutation(
+            'mutation($id:ID!,$developerOnly:Boolean){categorySeriesVariable(id:$id,developerOnly:$developerOnly){id}}', variables={"id": self._id, "developerOnly": newValue}, asyncio=False)
 
     @property
     def hidden(self):
         if self.client.asyncio:
             return self.loader.load("hidden")
         else:
-            return self.client.query('{categorySeriesVariable(id:"%s"){hidden}}' % self._id, keys=[
+            return self._query('query($id:ID!){categorySeriesVariable(id:$id){hidden}}', variables={"id": self._id}, keys=[
                 "categorySeriesVariable", "hidden"])
 
     @hidden.setter
     def hidden(self, newValue):
-        self.client.mutation(
-            'mutation{categorySeriesVariable(id:"%s", hidden:%s){id}}' % (self._id, newValue), asyncio=False)
+        self._mutation(
+            'mutation($id:ID!,$hidden:Boolean){categorySeriesVariable(id:$id,hidden:$hidden){id}}', variables={"id": self._id, "hidden": newValue}, asyncio=False)
 
     @property
     def shown_nodes(self):
         if self.client.asyncio:
             return self.loader.load("shownNodes")
         else:
-            return self.client.query('{categorySeriesVariable(id:"%s"){shownNodes}}' % self._id, keys=[
+            return self._query('query($id:ID!){categorySeriesVariable(id:$id){shownNodes}}', variables={"id": self._id}, keys=[
                 "categorySeriesVariable", "shownNodes"])
 
     @shown_nodes.setter
     def shown_nodes(self, newValue):
-        self.client.mutation(
-            'mutation{categorySeriesVariable(id:"%s", shownNodes:%s){id}}' % (self._id, newValue), asyncio=False)
+        self._mutation(
+            'mutation($id:ID!,$shownNodes:Int){categorySeriesVariable(id:$id,shownNodes:$shownNodes){id}}', variables={"id": self._id, "shownNodes": newValue}, asyncio=False)
 
     @property
     def stored_nodes(self):
         if self.client.asyncio:
             return self.loader.load("storedNodes")
         else:
-            return self.client.query('{categorySeriesVariable(id:"%s"){storedNodes}}' % self._id, keys=[
+            return self._query('query($id:ID!){categorySeriesVariable(id:$id){storedNodes}}', variables={"id": self._id}, keys=[
                 "categorySeriesVariable", "storedNodes"])
 
     @stored_nodes.setter
     def stored_nodes(self, newValue):
-        self.client.mutation(
-            'mutation{categorySeriesVariable(id:"%s", storedNodes:%s){id}}' % (self._id, newValue), asyncio=False)
+        self._mutation(
+            'mutation($id:ID!,$storedNodes:Int){categorySeriesVariable(id:$id,storedNodes:$storedNodes){id}}', variables={"id": self._id, "storedNodes": newValue}, asyncio=False)
 
     @property
     def index(self):
         if self.client.asyncio:
             return self.loader.load("index")
         else:
-            return self.client.query('{categorySeriesVariable(id:"%s"){index}}' % self._id, keys=[
+            return self._query('query($id:ID!){categorySeriesVariable(id:$id){index}}', variables={"id": self._id}, keys=[
                 "categorySeriesVariable", "index"])
 
     @index.setter
     def index(self, newValue):
-        self.client.mutation(
-            'mutation{categorySeriesVariable(id:"%s", index:%s){id}}' % (self._id, newValue), asyncio=False)
+        self._mutation(
+            'mutation($id:ID!,$index:Int){categorySeriesVariable(id:$id,index:$index){id}}', variables={"id": self._id, "index": newValue}, asyncio=False)
 
     @property
     def my_role(self):
         if self.client.asyncio:
             return self.loader.load("myRole")
         else:
-            return self.client.query('{categorySeriesVariable(id:"%s"){myRole}}' % self._id, keys=[
+            return self._query('query($id:ID!){categorySeriesVariable(id:$id){myRole}}', variables={"id": self._id}, keys=[
                 "categorySeriesVariable", "myRole"])
 
     @property
@@ -140,7 +144,7 @@ class CategorySeriesVariable:
         if self.client.asyncio:
             return self.loader.load("createdAt")
         else:
-            return self.client.query('{categorySeriesVariable(id:"%s"){createdAt}}' % self._id, keys=[
+            return self._query('query($id:ID!){categorySeriesVariable(id:$id){createdAt}}', variables={"id": self._id}, keys=[
                 "categorySeriesVariable", "createdAt"])
 
     @property
@@ -148,7 +152,7 @@ class CategorySeriesVariable:
         if self.client.asyncio:
             return self.loader.load("updatedAt")
         else:
-            return self.client.query('{categorySeriesVariable(id:"%s"){updatedAt}}' % self._id, keys=[
+            return self._query('query($id:ID!){categorySeriesVariable(id:$id){updatedAt}}', variables={"id": self._id}, keys=[
                 "categorySeriesVariable", "updatedAt"])
 
     async def _async_load_thing(self):
@@ -161,21 +165,24 @@ class CategorySeriesVariable:
         if self.client.asyncio:
             return self._async_load_thing()
         else:
-            id = self.client.query('{categorySeriesVariable(id:"%s"){thing{id}}}' % self._id, keys=[
-                "categorySeriesVariable", "thing", "id"])
+            res = self._query('query($id:ID!){categorySeriesVariable(id:$id){thing{id}}}', variables={"id": self._id}, keys=[
+                "categorySeriesVariable", "thing"])
+
+            def wrapper(res):
+                from .thing import Thing
+                return Thing(self.client, res["id"])
 
-            from .thing import Thing
-            return Thing(self.client, id)
+            return wrapWith(res, wrapper)
 
     @property
     def allowed_values(self):
         if self.client.asyncio:
             return self.loader.load("allowedValues")
         else:
-            return self.client.query('{categorySeriesVariable(id:"%s"){allowedValues}}' % self._id, keys=[
+            return self._query('query($id:ID!){categorySeriesVariable(id:$id){allowedValues}}', variables={"id": self._id}, keys=[
                 "categorySeriesVariable", "allowedValues"])
 
     @allowed_values.setter
     def allowed_values(self, newValue):
-        self.client.mutation(
-            'mutation{categorySeriesVariable(id:"%s", allowedValues:%s){id}}' % (self._id, str(newValue)), asyncio=False)
+        self._mutation(
+            'mutation($id:ID!,$allowedValues:[String!]){categorySeriesVariable(id:$id,allowedValues:$allowedValues){id}}', variables={"id": self._id, "allowedValues": newValue}, asyncio=False)
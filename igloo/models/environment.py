@@ -1,28 +1,32 @@
-from igloo.models.utils import wrapWith
-from igloo.utils import get_representation
+from igloo.models.utils import Model, wrapWith, prefetch_fields, prefetch_selection, prefetched, PAGE_SIZE
+from igloo.utils import get_variable_value
 from aiodataloader import DataLoader
+from igloo.instrumentation import loader_batch_size
 
 
 class EnvironmentLoader(DataLoader):
     def __init__(self, client, id):
-        super().__init__()
+        super().__init__(loop=client.loader_loop)
         self.client = client
         self._id = id
 
     async def batch_load_fn(self, keys):
-        fields = " ".join(set(keys))
-        res = await self.client.query('{environment(id:"%s"){%s}}' % (self._id, fields), keys=["environment"])
+        loader_batch_size.set(len(keys))
+        res = await self.client.load_fields("environment", self._id, set(keys))
 
         resolvedValues = [res[key.split("{")[0]] for key in keys]
 
         return resolvedValues
 
 
-class Environment:
+class Environment(Model):
+    _root = "environment"
+    _loader_class = EnvironmentLoader
+    __slots__ = ()
+
     def __init__(self, client, id):
         self.client = client
         self._id = id
-        self.loader = EnvironmentLoader(client, id)
 
     @property
     def id(self):
@@ -33,7 +37,7 @@ class Environment:
         if self.client.asyncio:
             return self.loader.load("createdAt")
         else:
-            return self.client.query('{environment(id:"%s"){createdAt}}' % self._id, keys=[
+            return self._query('query($id:ID!){environment(id:$id){createdAt}}', variables={"id": self._id}, keys=[
                 "environment", "createdAt"])
 
     @property
@@ -41,7 +45,7 @@ class Environment:
         if self.client.asyncio:
             return self.loader.load("updatedAt")
         else:
-            return self.client.query('{environment(id:"%s"){updatedAt}}' % self._id, keys=[
+            return self._query('query($id:ID!){environment(id:$id){updatedAt}}', variables={"id": self._id}, keys=[
                 "environment", "updatedAt"])
 
     @property
@@ -49,20 +53,20 @@ class Environment:
         if self.client.asyncio:
             return self.loader.load("name")
         else:
-            return self.client.query('{environment(id:"%s"){name}}' % self._id, keys=[
+            return self._query('query($id:ID!){environment(id:$id){name}}', variables={"id": self._id}, keys=[
                 "environment", "name"])
 
     @name.setter
     def name(self, newName):
-        self.client.mutation(
-            'mutation{updateEnvironment(id:"%s", name:"%s"){id}}' % (self._id, newName), asyncio=False)
+        self._mutation(
+            'mutation($id:ID!,$name:String){updateEnvironment(id:$id,name:$name){id}}', variables={"id": self._id, "name": newName}, asyncio=False)
 
     @property
     def owner(self):
         if self.client.asyncio:
             res = self.loader.load("owner{id}")
         else:
-            res = self.client.query('{environment(id:"%s"){owner{id}}}' % self._id, keys=[
+            res = self._query('query($id:ID!){environment(id:$id){owner{id}}}', variables={"id": self._id}, keys=[
                 "environment", "owner"])
 
         def wrapper(res):
@@ -78,7 +82,7 @@ class Environment:
         if self.client.asyncio:
             return self.loader.load("myRole")
         else:
-            return self.client.query('{environment(id:"%s"){myRole}}' % self._id, keys=[
+            return self._query('query($id:ID!){environment(id:$id){myRole}}', variables={"id": self._id}, keys=[
                 "environment", "myRole"])
 
     @property
@@ -86,20 +90,20 @@ class Environment:
         if self.client.asyncio:
             return self.loader.load("picture")
         else:
-            return self.client.query('{environment(id:"%s"){picture}}' % self._id, keys=[
+            return self._query('query($id:ID!){environment(id:$id){picture}}', variables={"id": self._id}, keys=[
                 "environment", "picture"])
 
     @picture.setter
     def picture(self, newPicture):
-        self.client.mutation(
-            'mutation{updateEnvironment(id:"%s", picture:"%s"){id}}' % (self._id, newPicture), asyncio=False)
+        self._mutation(
+            'mutation($id:ID!,$picture:EnvironmentPicture){updateEnvironment(id:$id,picture:$picture){id}}', variables={"id": self._id, "picture": newPicture}, asyncio=False)
 
     @property
     def unique_firmwares(self):
         if self.client.asyncio:
             return self.loader.load("uniqueFirmwares")
         else:
-            return self.client.query('{environment(id:"%s"){uniqueFirmwares}}' % self._id, keys=[
+            return self._query('query($id:ID!){environment(id:$id){uniqueFirmwares}}', variables={"id": self._id}, keys=[
                 "environment", "uniqueFirmwares"])
 
     @property
@@ -107,26 +111,26 @@ class Environment:
         if self.client.asyncio:
             return self.loader.load("index")
         else:
-            return self.client.query('{environment(id:"%s"){index}}' % self._id, keys=[
+            return self._query('query($id:ID!){environment(id:$id){index}}', variables={"id": self._id}, keys=[
                 "environment", "index"])
 
     @index.setter
     def index(self, newIndex):
-        self.client.mutation(
-            'mutation{updateEnvironment(id:"%s", index:%s){id}}' % (self._id, newIndex), asyncio=False)
+        self._mutation(
+            'mutation($id:ID!,$index:Int){updateEnvironment(id:$id,index:$index){id}}', variables={"id": self._id, "index": newIndex}, asyncio=False)
 
     @property
     def muted(self):
         if self.client.asyncio:
             return self.loader.load("muted")
         else:
-            return self.client.query('{environment(id:"%s"){muted}}' % self._id, keys=[
+            return self._query('query($id:ID!){environment(id:$id){muted}}', variables={"id": self._id}, keys=[
                 "environment", "muted"])
 
     @muted.setter
     def muted(self, newMuted):
-        self.client.mutation(
-            'mutation{updateEnvironment(id:"%s", muted:%s){id}}' % (self._id, "true" if newMuted else "false"), asyncio=False)
+        self._mutation(
+            'mutation($id:ID!,$muted:Boolean){updateEnvironment(id:$id,muted:$muted){id}}', variables={"id": self._id, "muted": newMuted}, asyncio=False)
 
     @property
     def things(self):
@@ -153,7 +157,7 @@ class Environment:
         if self.client.asyncio:
             res = self.loader.load("pendingTransfer{id}")
         else:
-            res = self.client.query('{environment(id:"%s"){pendingTransfer{id}}}' % self._id, keys=[
+            res = self._query('query($id:ID!){environment(id:$id){pendingTransfer{id}}}', variables={"id": self._id}, keys=[
                 "environment", "pendingTransfer"])
 
         def wrapper(res):
@@ -169,30 +173,36 @@ class EnvironmentList:
     def __init__(self, client, userId):
         self.client = client
         self.current = 0
-        self._filter = "{}"
+        self._page = []
+        self._prefetch = ()
+        self._filter = {}
         self.userId = userId
 
+    def prefetch(self, *fields):
+        self._prefetch = prefetch_fields(self.client, (Environment,), fields)
+        return self
+
     def filter(self, _filter):
-        self._filter = get_representation(_filter)
+        self._filter = get_variable_value(_filter)
         return self
 
     def __len__(self):
-        res = self.client.query('{user(id:%s){environmentCount(filter:%s)}}' % (self.userId, self._filter), keys=[
+        res = self.client.query('query($id:ID!,$filter:Json){user(id:$id){environmentCount(filter:$filter)}}', variables={"id": self.userId, "filter": self._filter}, keys=[
                                 "user", "environmentCount"])
         return res
 
     def __getitem__(self, i):
         if isinstance(i, int):
             res = self.client.query(
-                '{user(id:%s){environments(limit:1, offset:%d, filter:%s){id}}}' % (self.userId, i, self._filter))
+                'query($id:ID!,$offset:Int!,$filter:Json){user(id:$id){environments(limit:1,offset:$offset,filter:$filter){id%s}}}' % prefetch_selection(self._prefetch), variables={"id": self.userId, "offset": i, "filter": self._filter})
             if len(res["user"]["environments"]) != 1:
                 raise IndexError()
-            return Environment(self.client, res["user"]["environments"][0]["id"])
+            return prefetched(Environment(self.client, res["user"]["environments"][0]["id"]), res["user"]["environments"][0], self._prefetch)
         elif isinstance(i, slice):
             start, end, _ = i.indices(len(self))
             res = self.client.query(
-                '{user(id:%s){environments(offset:%d, limit:%d, filter:%s){id}}}' % (self.userId, start, end-start, self._filter))
-            return [Environment(self.client, environment["id"]) for environment in res["user"]["environments"]]
+                'query($id:ID!,$offset:Int!,$limit:Int!,$filter:Json){user(id:$id){environments(offset:$offset,limit:$limit,filter:$filter){id%s}}}' % prefetch_selection(self._prefetch), variables={"id": self.userId, "offset": start, "limit": end-start, "filter": self._filter})
+            return [prefetched(Environment(self.client, environment["id"]), environment, self._prefetch) for environment in res["user"]["environments"]]
         else:
             raise TypeError("Unexpected type {} passed as index".format(i))
 
@@ -200,14 +210,16 @@ class EnvironmentList:
         return self
 
     def __next__(self):
-        res = self.client.query(
-            '{user(id:%s){environments(limit:1, offset:%d, filter:%s){id}}}' % (self.userId, self.current, self._filter))
-
-        if len(res["user"]["environments"]) != 1:
-            raise StopIteration
+        if not self._page:
+            res = self.client.query(
+                'query($id:ID!,$offset:Int!,$limit:Int!,$filter:Json){user(id:$id){environments(limit:$limit,offset:$offset,filter:$filter){id%s}}}' % prefetch_selection(self._prefetch), variables={"id": self.userId, "offset": self.current, "limit": PAGE_SIZE, "filter": self._filter})
+            self._page = res["user"]["environments"]
+            if not self._page:
+                raise StopIteration
 
         self.current += 1
-        return Environment(self.client, res["user"]["environments"][0]["id"])
+        environment = self._page.pop(0)
+        return prefetched(Environment(self.client, environment["id"]), environment, self._prefetch)
 
     def next(self):
         return self.__next__()
@@ -1,16 +1,18 @@
 
 from aiodataloader import DataLoader
+from igloo.instrumentation import loader_batch_size
+from igloo.models.utils import Model, wrapWith
 
 
 class FileVariableLoader(DataLoader):
     def __init__(self, client, id):
-        super().__init__()
+        super().__init__(loop=client.loader_loop)
         self.client = client
         self._id = id
 
     async def batch_load_fn(self, keys):
-        fields = " ".join(set(keys))
-        res = await self.client.query('{fileVariable(id:"%s"){%s}}' % (self._id, fields), keys=["fileVariable"])
+        loader_batch_size.set(len(keys))
+        res = await self.client.load_fields("fileVariable", self._id, set(keys))
 
         # if fetching object the key will be the first part of the field
         # e.g. when fetching thing{id} the result is in the thing key
@@ -19,11 +21,14 @@ class FileVariableLoader(DataLoader):
         return resolvedValues
 
 
-class FileVariable:
+class FileVariable(Model):
+    _root = "fileVariable"
+    _loader_class = FileVariableLoader
+    __slots__ = ()
+
     def __init__(self, client, id):
         self.client = client
         self._id = id
-        self.loader = FileVariableLoader(client, id)
 
     @property
     def id(self):
@@ -34,7 +39,7 @@ class FileVariable:
         if self.client.asyncio:
             return self.loader.load("createdAt")
         else:
-            return self.client.query('{fileVariable(id:"%s"){createdAt}}' % self._id, keys=[
+            return self._query('query($id:ID!){fileVariable(id:$id){createdAt}}', variables={"id": self._id}, keys=[
                 "fileVariable", "createdAt"])
 
     @property
@@ -42,7 +47,7 @@ class FileVariable:
         if self.client.asyncio:
             return self.loader.load("updatedAt")
         else:
-            return self.client.query('{fileVariable(id:"%s"){updatedAt}}' % self._id, keys=[
+            return self._query('query($id:ID!){fileVariable(id:$id){updatedAt}}', variables={"id": self._id}, keys=[
                 "fileVariable", "updatedAt"])
 
     @property
@@ -50,59 +55,59 @@ class FileVariable:
         if self.client.asyncio:
             return self.loader.load("name")
         else:
-            return self.client.query('{fileVariable(id:"%s"){name}}' % self._id, keys=[
+            return self._query('query($id:ID!){fileVariable(id:$id){name}}', variables={"id": self._id}, keys=[
                 "fileVariable", "name"])
 
     @name.setter
     def name(self, newName):
-        self.client.mutation(
-            'mutation{fileVariable(id:"%s", name:"%s"){id}}' % (self._id, newName), asyncio=False)
+        self._mutation(
+            'mutation($id:ID!,$name:String){fileVariable(id:$id,name:$name){id}}', variables={"id": self._id, "name": newName}, asyncio=False)
 
     @property
     def private(self):
         if self.client.asyncio:
             return self.loader.load("private")
         else:
-            return self.client.query('{fileVariable(id:"%s"){private}}' % self._id, keys=[
+            return self._query('query($id:ID!){fileVariable(id:$id){private}}', variables={"id": self._id}, keys=[
                 "fileVariable", "private"])
 
     @private.setter
     def private(self, newValue):
-        self.client.mutation(
-            'mutation{fileVariable(id:"%s", private:%s){id}}' % (self._id, newValue), asyncio=False)
+        self._mutation(
+            'mutation($id:ID!,$private:Boolean){fileVariable(id:$id,private:$private){id}}', variables={"id": self._id, "private": newValue}, asyncio=False)
 
     @property
     def hidden(self):
         if self.client.asyncio:
             return self.loader.load("hidden")
         else:
-            return self.client.query('{fileVariable(id:"%s"){hidden}}' % self._id, keys=[
+            return self._query('query($id:ID!){fileVariable(id:$id){hidden}}', variables={"id": self._id}, keys=[
                 "fileVariable", "hidden"])
 
     @hidden.setter
     def hidden(self, newValue):
-        self.client.mutation(
-            'mutation{fileVariable(id:"%s", hidden:%s){id}}' % (self._id, newValue), asyncio=False)
+        self._mutation(
+            'mutation($id:ID!,$hidden:Boolean){fileVariable(id:$id,hidden:$hidden){id}}', variables={"id": self._id, "hidden": newValue}, asyncio=False)
 
     @property
     def index(self):
         if self.client.asyncio:
             return self.loader.load("index")
         else:
-            return self.client.query('{fileVariable(id:"%s"){index}}' % self._id, keys=[
+            return self._query('query($id:ID!){fileVariable(id:$id){index}}', variables={"id": self._id}, keys=[
                 "fileVariable", "index"])
 
     @index.setter
     def index(self, newValue):
-        self.client.mutation(
-            'mutation{fileVariable(id:"%s", index:%s){id}}' % (self._id, newValue), asyncio=False)
+        self._mutation(
+            'mutation($id:ID!,$index:Int){fileVariable(id:$id,index:$index){id}}', variables={"id": self._id, "index": newValue}, asyncio=False)
 
     @property
     def myRole(self):
         if self.client.asyncio:
             return self.loader.load("myRole")
         else:
-            return self.client.query('{fileVariable(id:"%s"){myRole}}' % self._id, keys=[
+            return self._query('query($id:ID!){fileVariable(id:$id){myRole}}', variables={"id": self._id}, keys=[
                 "fileVariable", "myRole"])
 
     async def _async_load_thing(self):
@@ -116,30 +121,34 @@ class FileVariable:
         if self.client.asyncio:
             return self._async_load_thing()
         else:
-            id = self.client.query('{fileVariable(id:"%s"){thing{id}}}' % self._id, keys=[
-                "fileVariable", "thing", "id"])
+            res = self._query('query($id:ID!){fileVariable(id:$id){thing{id}}}', variables={"id": self._id}, keys=[
+                "fileVariable", "thing"])
+
+            def wrapper(res):
+                from .thing import Thing
+                return Thing(self.client, res["id"])
 
-            return Thing(self.client, id)
+            return wrapWith(res, wrapper)
 
     @property
     def user_permission(self):
         if self.client.asyncio:
             return self.loader.load("userPermission")
         else:
-            return self.client.query('{fileVariable(id:"%s"){userPermission}}' % self._id, keys=[
+            return self._query('query($id:ID!){fileVariable(id:$id){userPermission}}', variables={"id": self._id}, keys=[
                 "fileVariable", "userPermission"])
 
     @user_permission.setter
     def user_permission(self, newValue):
-        self.client.mutation(
-            'mutation{fileVariable(id:"%s", userPermission:%s){id}}' % (self._id, newValue), asyncio=False)
+        self._mutation(
+            'mutation($id:ID!,$userPermission:Permission){fileVariable(id:$id,userPermission:$userPermission){id}}', variables={"id": self._id, "userPermission": newValue}, asyncio=False)
 
     @property
     def value(self):
         if self.client.asyncio:
             return self.loader.load("value")
         else:
-            return self.client.query('{fileVariable(id:"%s"){value}}' % self._id, keys=[
+            return self._query('query($id:ID!){fileVariable(id:$id){value}}', variables={"id": self._id}, keys=[
                 "fileVariable", "value"])
 
     @property
@@ -147,7 +156,7 @@ class FileVariable:
         if self.client.asyncio:
             return self.loader.load("fileName")
         else:
-            return self.client.query('{fileVariable(id:"%s"){fileName}}' % self._id, keys=[
+            return self._query('query($id:ID!){fileVariable(id:$id){fileName}}', variables={"id": self._id}, keys=[
                 "fileVariable", "fileName"])
 
     @property
@@ -155,7 +164,7 @@ class FileVariable:
         if self.client.asyncio:
             return self.loader.load("mimeType")
         else:
-            return self.client.query('{fileVariable(id:"%s"){mimeType}}' % self._id, keys=[
+            return self._query('query($id:ID!){fileVariable(id:$id){mimeType}}', variables={"id": self._id}, keys=[
                 "fileVariable", "mimeType"])
 
     @property
@@ -163,5 +172,5 @@ class FileVariable:
         if self.client.asyncio:
             return self.loader.load("size")
         else:
-            return self.client.query('{fileVariable(id:"%s"){size}}' % self._id, keys=[
+            return self._query('query($id:ID!){fileVariable(id:$id){size}}', variables={"id": self._id}, keys=[
                 "fileVariable", "size"])
@@ -1,16 +1,17 @@
 from aiodataloader import DataLoader
-from igloo.models.utils import wrapWith
+from igloo.instrumentation import loader_batch_size
+from igloo.models.utils import Model, wrapWith, prefetch_fields, prefetch_selection, prefetched, prefetched_items, PAGE_SIZE
 
 
 class FloatSeriesNodeLoader(DataLoader):
     def __init__(self, client, id):
-        super().__init__()
+        super().__init__(loop=client.loader_loop)
         self.client = client
         self._id = id
 
     async def batch_load_fn(self, keys):
-        fields = " ".join(set(keys))
-        res = await self.client.query('{floatSeriesNode(id:"%s"){%s}}' % (self._id, fields), keys=["floatSeriesNode"])
+        loader_batch_size.set(len(keys))
+        res = await self.client.load_fields("floatSeriesNode", self._id, set(keys))
 
         # if fetching object the key will be the first part of the field
         # e.g. when fetching thing{id} the result is in the thing key
@@ -19,11 +20,14 @@ class FloatSeriesNodeLoader(DataLoader):
         return resolvedValues
 
 
-class FloatSeriesNode:
+class FloatSeriesNode(Model):
+    _root = "floatSeriesNode"
+    _loader_class = FloatSeriesNodeLoader
+    __slots__ = ()
+
     def __init__(self, client, id):
         self.client = client
         self._id = id
-        self.loader = FloatSeriesNodeLoader(client, id)
 
     @property
     def id(self):
@@ -34,7 +38,7 @@ class FloatSeriesNode:
         if self.client.asyncio:
             return self.loader.load("createdAt")
         else:
-            return self.client.query('{floatSeriesNode(id:"%s"){createdAt}}' % self._id, keys=[
+            return self._query('query($id:ID!){floatSeriesNode(id:$id){createdAt}}', variables={"id": self._id}, keys=[
                 "floatSeriesNode", "createdAt"])
 
     @property
@@ -42,7 +46,7 @@ class FloatSeriesNode:
         if self.client.asyncio:
             return self.loader.load("updatedAt")
         else:
-            return self.client.query('{floatSeriesNode(id:"%s"){updatedAt}}' % self._id, keys=[
+            return self._query('query($id:ID!){floatSeriesNode(id:$id){updatedAt}}', variables={"id": self._id}, keys=[
                 "floatSeriesNode", "updatedAt"])
 
     @property
@@ -50,7 +54,7 @@ class FloatSeriesNode:
         if self.client.asyncio:
             res = self.loader.load("thing{id}")
         else:
-            res = self.client.query('{floatSeriesNode(id:"%s"){thing{id}}}' % self._id, keys=[
+            res = self._query('query($id:ID!){floatSeriesNode(id:$id){thing{id}}}', variables={"id": self._id}, keys=[
                 "floatSeriesNode", "thing"])
 
         def wrapper(res):
@@ -64,7 +68,7 @@ class FloatSeriesNode:
         if self.client.asyncio:
             res = self.loader.load("series{id}")
         else:
-            res = self.client.query('{floatSeriesNode(id:"%s"){series{id}}}' % self._id, keys=[
+            res = self._query('query($id:ID!){floatSeriesNode(id:$id){series{id}}}', variables={"id": self._id}, keys=[
                 "floatSeriesNode", "series"])
 
         def wrapper(res):
@@ -78,51 +82,71 @@ class FloatSeriesNode:
         if self.client.asyncio:
             return self.loader.load("timestamp")
         else:
-            return self.client.query('{floatSeriesNode(id:"%s"){timestamp}}' % self._id, keys=[
+            return self._query('query($id:ID!){floatSeriesNode(id:$id){timestamp}}', variables={"id": self._id}, keys=[
                 "floatSeriesNode", "timestamp"])
 
     @timestamp.setter
     def timestamp(self, newValue):
-        self.client.mutation(
-            'mutation{updateFloatSeriesNode(id:"%s", timestamp:"%s"){id}}' % (self._id, newValue), asyncio=False)
+        self._mutation(
+            'mutation($id:ID!,$timestamp:DateTime){updateFloatSeriesNode(id:$id,timestamp:$timestamp){id}}', variables={"id": self._id, "timestamp": newValue}, asyncio=False)
 
     @property
     def value(self):
         if self.client.asyncio:
             return self.loader.load("value")
         else:
-            return self.client.query('{floatSeriesNode(id:"%s"){value}}' % self._id, keys=[
+            return self._query('query($id:ID!){floatSeriesNode(id:$id){value}}', variables={"id": self._id}, keys=[
                 "floatSeriesNode", "value"])
 
     @value.setter
     def value(self, newValue):
-        self.client.mutation(
-            'mutation{updateFloatSeriesNode(id:"%s", value:%s){id}}' % (self._id, newValue), asyncio=False)
+        self._mutation(
+            'mutation($id:ID!,$value:Float){updateFloatSeriesNode(id:$id,value:$value){id}}', variables={"id": self._id, "value": newValue}, asyncio=False)
 
 
 class FloatSeriesNodeList:
+    _field = "nodes"
+    _item_selection = "id"
+
     def __init__(self, client, seriesId):
         self.client = client
         self.seriesId = seriesId
         self.current = 0
+        self._page = []
+        self._prefetch = ()
+
+    def prefetch(self, *fields):
+        self._prefetch = prefetch_fields(self.client, (FloatSeriesNode,), fields)
+        return self
 
     def __len__(self):
+        items = prefetched_items(self, "FloatSeriesVariable", self.seriesId)
+        if items is not None:
+            return len(items)
+
         res = self.client.query(
-            '{floatSeriesVariable(id:"%s"){nodeCount}}' % self.seriesId)
+            'query($id:ID!){floatSeriesVariable(id:$id){nodeCount}}', variables={"id": self.seriesId})
         return res["floatSeriesVariable"]["nodeCount"]
 
     def __getitem__(self, i):
+        items = prefetched_items(self, "FloatSeriesVariable", self.seriesId)
+        if items is not None:
+            # prefetched with the series
+            if isinstance(i, slice):
+                return [prefetched(FloatSeriesNode(self.client, node["id"]), node) for node in items[i]]
+            return prefetched(FloatSeriesNode(self.client, items[i]["id"]), items[i])
+
         if isinstance(i, int):
             res = self.client.query(
-                '{floatSeriesVariable(id:"%s"){nodes(limit:1, offset:%d){id}}}' % (self.seriesId, i))
+                'query($id:ID!,$offset:Int!){floatSeriesVariable(id:$id){nodes(limit:1,offset:$offset){id%s}}}' % prefetch_selection(self._prefetch), variables={"id": self.seriesId, "offset": i})
             if len(res["floatSeriesVariable"]["nodes"]) != 1:
                 raise IndexError()
-            return FloatSeriesNode(self.client, res["floatSeriesVariable"]["nodes"][0]["id"])
+            return prefetched(FloatSeriesNode(self.client, res["floatSeriesVariable"]["nodes"][0]["id"]), res["floatSeriesVariable"]["nodes"][0], self._prefetch)
         elif isinstance(i, slice):
             start, end, _ = i.indices(len(self))
             res = self.client.query(
-                '{floatSeriesVariable(id:"%s"){nodes(offset:%d, limit:%d){id}}}' % (self.seriesId, start, end-start))
-            return [FloatSeriesNode(self.client, node["id"]) for node in res["floatSeriesVariable"]["nodes"]]
+                'query($id:ID!,$offset:Int!,$limit:Int!){floatSeriesVariable(id:$id){nodes(offset:$offset,limit:$limit){id%s}}}' % prefetch_selection(self._prefetch), variables={"id": self.seriesId, "offset": start, "limit": end-start})
+            return [prefetched(FloatSeriesNode(self.client, node["id"]), node, self._prefetch) for node in res["floatSeriesVariable"]["nodes"]]
         else:
             raise TypeError("Unexpected type {} passed as index".format(i))
 
@@ -130,14 +154,23 @@ class FloatSeriesNodeList:
         return self
 
     def __next__(self):
-        res = self.client.query(
-            '{floatSeriesVariable(id:"%s"){nodes(limit:1, offset:%d){id}}}' % (self.seriesId, self.current))
-
-        if len(res["floatSeriesVariable", "nodes"]) != 1:
-            raise StopIteration
+        items = prefetched_items(self, "FloatSeriesVariable", self.seriesId)
+        if items is not None:
+            if self.current >= len(items):
+                raise StopIteration
+            self.current += 1
+            return prefetched(FloatSeriesNode(self.client, items[self.current - 1]["id"]), items[self.current - 1])
+
+        if not self._page:
+            res = self.client.query(
+                'query($id:ID!,$offset:Int!,$limit:Int!){floatSeriesVariable(id:$id){nodes(limit:$limit,offset:$offset){id%s}}}' % prefetch_selection(self._prefetch), variables={"id": self.seriesId, "offset": self.current, "limit": PAGE_SIZE})
+            self._page = res["floatSeriesVariable"]["nodes"]
+            if not self._page:
+                raise StopIteration
 
         self.current += 1
-        return FloatSeriesNode(self.client, res["floatSeriesVariable"]["nodes"][0]["id"])
+        node = self._page.pop(0)
+        return prefetched(FloatSeriesNode(self.client, node["id"]), node, self._prefetch)
 
     def next(self):
         return self.__next__()
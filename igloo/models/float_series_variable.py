@@ -1,17 +1,18 @@
 
 from aiodataloader import DataLoader
-from igloo.models.utils import wrapWith
+from igloo.instrumentation import loader_batch_size
+from igloo.models.utils import Model, wrapWith
 
 
 class FloatSeriesVariableLoader(DataLoader):
     def __init__(self, client, id):
-        super().__init__()
+        super().__init__(loop=client.loader_loop)
         self.client = client
         self._id = id
 
     async def batch_load_fn(self, keys):
-        fields = " ".join(set(keys))
-        res = await self.client.query('{floatSeriesVariable(id:"%s"){%s}}' % (self._id, fields), keys=["floatSeriesVariable"])
+        loader_batch_size.set(len(keys))
+        res = await self.client.load_fields("floatSeriesVariable", self._id, set(keys))
 
         # if fetching object the key will be the first part of the field
         # e.g. when fetching thing{id} the result is in the thing key
@@ -20,11 +21,14 @@ class FloatSeriesVariableLoader(DataLoader):
         return resolvedValues
 
 
-class FloatSeriesVariable:
+class FloatSeriesVariable(Model):
+    _root = "floatSeriesVariable"
+    _loader_class = FloatSeriesVariableLoader
+    __slots__ = ()
+
     def __init__(self, client, id):
         self.client = client
         self._id = id
-        self.loader = FloatSeriesVariableLoader(client, id)
 
     @property
     def id(self):
@@ -35,7 +39,7 @@ class FloatSeriesVariable:
         if self.client.asyncio:
             res = self.loader.load("lastNode{id}")
         else:
-            res = self.client.query('{floatSeriesVariable(id:"%s"){lastNode{id}}}' % self._id, keys=[
+            res = self._query('query($id:ID!){floatSeriesVariable(id:$id){lastNode{id}}}', variables={"id": self._id}, keys=[
                 "floatSeriesVariable", "lastNode"])
 
         def wrapper(res):
@@ -54,85 +58,85 @@ class FloatSeriesVariable:
         if self.client.asyncio:
             return self.loader.load("name")
         else:
-            return self.client.query('{floatSeriesVariable(id:"%s"){name}}' % self._id, keys=[
+            return self._query('query($id:ID!){floatSeriesVariable(id:$id){name}}', variables={"id": self._id}, keys=[
                 "floatSeriesVariable", "name"])
 
     @name.setter
     def name(self, newName):
-        self.client.mutation(
-            'mutation{updateFloatSeriesVariable(id:"%s", name:"%s"){id}}' % (self._id, newName), asyncio=False)
+        self._mutation(
+            'mutation($id:ID!,$name:String){updateFloatSeriesVariable(id:$id,name:$name){id}}', variables={"id": self._id, "name": newName}, asyncio=False)
 
     @property
     def developer_only(self):
         if self.client.asyncio:
             return self.loader.load("developerOnly")
         else:
-            return self.client.query('{floatSeriesVariable(id:"%s"){developerOnly}}' % self._id, keys=[
+            return self._query('query($id:ID!){floatSeriesVariable(id:$id){developerOnly}}', variables={"id": self._id}, keys=[
                 "floatSeriesVariable", "developerOnly"])
 
     @developer_only.setter
     def developer_only(self, newValue):
-        self.client.mutation(
-            'mutation{updateFloatSeriesVariable(id:"%s", developerOnly:%s){id}}' % (self._id, newValue), asyncio=False)
+        self._mutation(
+            'mutation($id:ID!,$developerOnly:Boolean){updateFloatSeriesVariable(id:$id,developerOnly:$developerOnly){id}}', variables={"id": self._id, "developerOnly": newValue}, asyncio=False)
 
     @property
     def hidden(self):
         if self.client.asyncio:
             return self.loader.load("hidden")
         else:
-            return self.client.query('{floatSeriesVariable(id:"%s"){hidden}}' % self._id, keys=[
+            return self._query('query($id:ID!){floatSeriesVariable(id:$id){hidden}}', variables={"id": self._id}, keys=[
                 "floatSeriesVariable", "hidden"])
 
     @hidden.setter
     def hidden(self, newValue):
-        self.client.mutation(
-            'mutation{updateFloatSeriesVariable(id:"%s", hidden:%s){id}}' % (self._id, newValue), asyncio=False)
+        self._mutation(
+            'mutation($id:ID!,$hidden:Boolean){updateFloatSeriesVariable(id:$id,hidden:$hidden){id}}', variables={"id": self._id, "hidden": newValue}, asyncio=False)
 
     @property
     def index(self):
         if self.client.asyncio:
             return self.loader.load("index")
         else:
-            return self.client.query('{floatSeriesVariable(id:"%s"){index}}' % self._id, keys=[
+            return self._query('query($id:ID!){floatSeriesVariable(id:$id){index}}', variables={"id": self._id}, keys=[
                 "floatSeriesVariable", "index"])
 
     @index.setter
     def index(self, newValue):
-        self.client.mutation(
-            'mutation{updateFloatSeriesVariable(id:"%s", index:%s){id}}' % (self._id, newValue), asyncio=False)
+        self._mutation(
+            'mutation($id:ID!,$index:Int){updateFloatSeriesVariable(id:$id,index:$index){id}}', variables={"id": self._id, "index": newValue}, asyncio=False)
 
     @property
     def shown_nodes(self):
         if self.client.asyncio:
             return self.loader.load("index")
         else:
-            return self.client.query('{floatSeriesVariable(id:"%s"){shownNodes}}' % self._id, keys=[
+            return self._query('query($id:ID!){floatSeriesVariable(id:$id){shownNodes}}', variables={"id": self._id}, keys=[
                 "floatSeriesVariable", "shownNodes"])
 
     @shown_nodes.setter
     def shown_nodes(self, newValue):
-        self.client.mutation(
-            'mutation{updateFloatSeriesVariable(id:"%s", shownNodes:%s){id}}' % (self._id, newValue), asyncio=False)
+        self._mutation(
+            'mutation($id:ID!,$shownNodes:Int){updateFloatSeriesVariable(id:$id,shownNodes:$shownNodes){id}}', variables={"id": self._id, "shownNodes": newValue}, asyncio=False)
 
     @property
     def stored_nodes(self):
         if self.client.asyncio:
             return self.loader.load("index")
         else:
-            return self.client.query('{floatSeriesVariable(id:"%s"){storedNodes}}' % self._id, keys=[
+            return self._query('query($id:ID!){floatSeriesVariable(id:$id){storedNodes}}', variables={"id": self._id}, keys=[
                 "floatSeriesVariable", "storedNodes"])
 
     @stored_nodes.setter
     def stored_nodes(self, newValue):
-        self.client.mutation(
-            'mutation{updateFloatSeriesVariable(id:"%s", storedNodes:%s){id}}' % (self._id, newValue), asyncio=False)
+        self._mutation(
+            'mutation($id:ID!,$storedNodes:Int){updateFloatSeriesVariable(id:$id,storedNodes:$storedNodes){id}}', variables={"id": self._id, "storedNodes": newValue}, asyncio=False)
 
     @property
     def my_role(self):
         if self.client.asyncio:
             return self.loader.load("myRole")
         else:
-            return self.client.query('{floatSeriesVariable(id:"%s"){myRole}}' % self._id, keys=[
+            return self._query('query($id:ID!){floatSeriesVariable(id:$id){myRole}}', variables={"id": self._id}, keys=[
                 "floatSeriesVariable", "myRole"])
 
     @property
@@ -140,7 +144,7 @@ class FloatSeriesVariable:
         if self.client.asyncio:
             return self.loader.load("createdAt")
         else:
-            return self.client.query('{floatSeriesVariable(id:"%s"){createdAt}}' % self._id, keys=[
+            return self._query('query($id:ID!){floatSeriesVariable(id:$id){createdAt}}', variables={"id": self._id}, keys=[
                 "floatSeriesVariable", "createdAt"])
 
     @property
@@ -148,7 +152,7 @@ class FloatSeriesVariable:
         if self.client.asyncio:
             return self.loader.load("updatedAt")
         else:
-            return self.client.query('{floatSeriesVariable(id:"%s"){updatedAt}}' % self._id, keys=[
+            return self._query('query($id:ID!){floatSeriesVariable(id:$id){updatedAt}}', variables={"id": self._id}, keys=[
                 "floatSeriesVariable", "updatedAt"])
 
     async def _async_load_thing(self):
@@ -161,60 +165,63 @@ class FloatSeriesVariable:
         if self.client.asyncio:
             return self._async_load_thing()
         else:
-            id = self.client.query('{floatSeriesVariable(id:"%s"){thing{id}}}' % self._id, keys=[
-                "floatSeriesVariable", "thing", "id"])
+            res = self._query('query($id:ID!){floatSeriesVariable(id:$id){thing{id}}}', variables={"id": self._id}, keys=[
+                "floatSeriesVariable", "thing"])
+
+            def wrapper(res):
+                from .thing import Thing
+                return Thing(self.client, res["id"])
 
-            from .thing import Thing
-            return Thing(self.client, id)
+            return wrapWith(res, wrapper)
 
     @property
     def unit_of_measurement(self):
         if self.client.asyncio:
             return self.loader.load("unitOfMeasurement")
         else:
-            return self.client.query('{floatSeriesVariable(id:"%s"){unitOfMeasurement}}' % self._id, keys=[
+            return self._query('query($id:ID!){floatSeriesVariable(id:$id){unitOfMeasurement}}', variables={"id": self._id}, keys=[
                 "floatSeriesVariable", "unitOfMeasurement"])
 
     @unit_of_measurement.setter
     def unit_of_measurement(self, newValue):
-        self.client.mutation(
-            'mutation{updateFloatSeriesVariable(id:"%s", unitOfMeasurement:"%s"){id}}' % (self._id, newValue), asyncio=False)
+        self._mutation(
+            'mutation($id:ID!,$unitOfMeasurement:String){updateFloatSeriesVariable(id:$id,unitOfMeasurement:$unitOfMeasurement){id}}', variables={"id": self._id, "unitOfMeasurement": newValue}, asyncio=False)
 
     @property
     def precision(self):
         if self.client.asyncio:
             return self.loader.load("precision")
         else:
-            return self.client.query('{floatSeriesVariable(id:"%s"){precision}}' % self._id, keys=[
+            return self._query('query($id:ID!){floatSeriesVariable(id:$id){precision}}', variables={"id": self._id}, keys=[
                 "floatSeriesVariable", "precision"])
 
     @precision.setter
     def precision(self, newValue):
-        self.client.mutation(
-            'mutation{updateFloatSeriesVariable(id:"%s", precision:%s){id}}' % (self._id, newValue), asyncio=False)
+        self._mutation(
+            'mutation($id:ID!,$precision:Int){updateFloatSeriesVariable(id:$id,precision:$precision){id}}', variables={"id": self._id, "precision": newValue}, asyncio=False)
 
     @property
     def min(self):
         if self.client.asyncio:
             return self.loader.load("min")
         else:
-            return self.client.query('{floatSeriesVariable(id:"%s"){min}}' % self._id, keys=[
+            return self._query('query($id:ID!){floatSeriesVariable(id:$id){min}}', variables={"id": self._id}, keys=[
                 "floatSeriesVariable", "min"])
 
     @min.setter
     def min(self, newValue):
-        self.client.mutation(
-            'mutation{updateFloatSeriesVariable(id:"%s", min:%s){id}}' % (self._id, newValue), asyncio=False)
+        self._mutation(
+            'mutation($id:ID!,$min:Float){updateFloatSeriesVariable(id:$id,min:$min){id}}', variables={"id": self._id, "min": newValue}, asyncio=False)
 
     @property
     def max(self):
         if self.client.asyncio:
             return self.loader.load("max")
         else:
-            return self.client.query('{floatSeriesVariable(id:"%s"){max}}' % self._id, keys=[
+            return self._query('query($id:ID!){floatSeriesVariable(id:$id){max}}', variables={"id": self._id}, keys=[
                 "floatSeriesVariable", "max"])
 
     @max.setter
     def max(self, newValue):
-        self.client.mutation(
-            'mutation{updateFloatSeriesVariable(id:"%s", max:%s){id}}' % (self._id, newValue), asyncio=False)
+        self._mutation(
+            'mutation($id:ID!,$max:Float){updateFloatSeriesVariable(id:$id,max:$max){id}}', variables={"id": self._id, "max": newValue}, asyncio=False)
@@ -1,16 +1,18 @@
 
 from aiodataloader import DataLoader
+from igloo.instrumentation import loader_batch_size
+from igloo.models.utils import Model, wrapWith
 
 
 class FloatVariableLoader(DataLoader):
     def __init__(self, client, id):
-        super().__init__()
+        super().__init__(loop=client.loader_loop)
         self.client = client
         self._id = id
 
     async def batch_load_fn(self, keys):
-        fields = " ".join(set(keys))
-        res = await self.client.query('{floatVariable(id:"%s"){%s}}' % (self._id, fields), keys=["floatVariable"])
+        loader_batch_size.set(len(keys))
+        res = await self.client.load_fields("floatVariable", self._id, set(keys))
 
         # if fetching object the key will be the first part of the field
         # e.g. when fetching thing{id} the result is in the thing key
@@ -19,11 +21,14 @@ class FloatVariableLoader(DataLoader):
         return resolvedValues
 
 
-class FloatVariable:
+class FloatVariable(Model):
+    _root = "floatVariable"
+    _loader_class = FloatVariableLoader
+    __slots__ = ()
+
     def __init__(self, client, id):
         self.client = client
         self._id = id
-        self.loader = FloatVariableLoader(client, id)
 
     @property
     def id(self):
@@ -34,59 +39,59 @@ class FloatVariable:
         if self.client.asyncio:
             return self.loader.load("name")
         else:
-            return self.client.query('{floatVariable(id:"%s"){name}}' % self._id, keys=[
+            return self._query('query($id:ID!){floatVariable(id:$id){name}}', variables={"id": self._id}, keys=[
                 "floatVariable", "name"])
 
     @name.setter
     def name(self, newName):
-        self.client.mutation(
-            'mutation{updateFloatVariable(id:"%s", name:"%s"){id}}' % (self._id, newName), asyncio=False)
+        self._mutation(
+            'mutation($id:ID!,$name:String){updateFloatVariable(id:$id,name:$name){id}}', variables={"id": self._id, "name": newName}, asyncio=False)
 
     @property
     def private(self):
         if self.client.asyncio:
             return self.loader.load("private")
         else:
-            return self.client.query('{floatVariable(id:"%s"){private}}' % self._id, keys=[
+            return self._query('query($id:ID!){floatVariable(id:$id){private}}', variables={"id": self._id}, keys=[
                 "floatVariable", "private"])
 
     @private.setter
     def private(self, newValue):
-        self.client.mutation(
-            'mutation{updateFloatVariable(id:"%s", private:%s){id}}' % (self._id, newValue), asyncio=False)
+        self._mutation(
+            'mutation($id:ID!,$private:Boolean){updateFloatVariable(id:$id,private:$private){id}}', variables={"id": self._id, "private": newValue}, asyncio=False)
 
     @property
     def hidden(self):
         if self.client.asyncio:
             return self.loader.load("hidden")
         else:
-            return self.client.query('{floatVariable(id:"%s"){hidden}}' % self._id, keys=[
+            return self._query('query($id:ID!){floatVariable(id:$id){hidden}}', variables={"id": self._id}, keys=[
                 "floatVariable", "hidden"])
 
     @hidden.setter
     def hidden(self, newValue):
-        self.client.mutation(
-            'mutation{updateFloatVariable(id:"%s", hidden:%s){id}}' % (self._id, newValue), asyncio=False)
+        self._mutation(
+            'mutation($id:ID!,$hidden:Boolean){updateFloatVariable(id:$id,hidden:$hidden){id}}', variables={"id": self._id, "hidden": newValue}, asyncio=False)
 
     @property
     def index(self):
         if self.client.asyncio:
             return self.loader.load("index")
         else:
-            return self.client.query('{floatVariable(id:"%s"){index}}' % self._id, keys=[
+            return self._query('query($id:ID!){floatVariable(id:$id){index}}', variables={"id": self._id}, keys=[
                 "floatVariable", "index"])
 
     @index.setter
     def index(self, newValue):
-        self.client.mutation(
-            'mutation{updateFloatVariable(id:"%s", index:%s){id}}' % (self._id, newValue), asyncio=False)
+        self._mutation(
+            'mutation($id:ID!,$index:Int){updateFloatVariable(id:$id,index:$index){id}}', variables={"id": self._id, "index": newValue}, asyncio=False)
 
     @property
     def my_role(self):
         if self.client.asyncio:
             return self.loader.load("myRole")
         else:
-            return self.client.query('{floatVariable(id:"%s"){myRole}}' % self._id, keys=[
+            return self._query('query($id:ID!){floatVariable(id:$id){myRole}}', variables={"id": self._id}, keys=[
                 "floatVariable", "myRole"])
 
     @property
@@ -94,7 +99,7 @@ class FloatVariable:
         if self.client.asyncio:
             return self.loader.load("createdAt")
         else:
-            return self.client.query('{floatVariable(id:"%s"){createdAt}}' % self._id, keys=[
+            return self._query('query($id:ID!){floatVariable(id:$id){createdAt}}', variables={"id": self._id}, keys=[
                 "floatVariable", "createdAt"])
 
     @property
@@ -102,7 +107,7 @@ class FloatVariable:
         if self.client.asyncio:
             return self.loader.load("updatedAt")
         else:
-            return self.client.query('{floatVariable(id:"%s"){updatedAt}}' % self._id, keys=[
+            return self._query('query($id:ID!){floatVariable(id:$id){updatedAt}}', variables={"id": self._id}, keys=[
                 "floatVariable", "updatedAt"])
 
     async def _async_load_thing(self):
@@ -116,112 +121,115 @@ class FloatVariable:
         if self.client.asyncio:
             return self._async_load_thing()
         else:
-            id = self.client.query('{floatVariable(id:"%s"){thing{id}}}' % self._id, keys=[
-                "floatVariable", "thing", "id"])
+            res = self._query('query($id:ID!){floatVariable(id:$id){thing{id}}}', variables={"id": self._id}, keys=[
+                "floatVariable", "thing"])
+
+            def wrapper(res):
+                from .thing import Thing
+                return Thing(self.client, res["id"])
 
-            from .thing import Thing
-            return Thing(self.client, id)
+            return wrapWith(res, wrapper)
 
     @property
     def user_permission(self):
         if self.client.asyncio:
             return self.loader.load("userPermission")
         else:
-            return self.client.query('{floatVariable(id:"%s"){userPermission}}' % self._id, keys=[
+            return self._query('query($id:ID!){floatVariable(id:$id){userPermission}}', variables={"id": self._id}, keys=[
                 "floatVariable", "userPermission"])
 
     @user_permission.setter
     def user_permission(self, newValue):
-        self.client.mutation(
-            'mutation{updateFloatVariable(id:"%s", userPermission:%s){id}}' % (self._id, newValue), asyncio=False)
+        self._mutation(
+            'mutation($id:ID!,$userPermission:Permission){updateFloatVariable(id:$id,userPermission:$userPermission){id}}', variables={"id": self._id, "userPermission": newValue}, asyncio=False)
 
     @property
     def developer_only(self):
         if self.client.asyncio:
             return self.loader.load("developerOnly")
         else:
-            return self.client.query('{floatVariable(id:"%s"){developerOnly}}' % self._id, keys=[
+            return self._query('query($id:ID!){floatVariable(id:$id){developerOnly}}', variables={"id": self._id}, keys=[
                 "floatVariable", "developerOnly"])
 
     @developer_only.setter
     def developer_only(self, newValue):
-        self.client.mutation(
-            'mutation{updateFloatVariable(id:"%s", developerOnly:%s){id}}' % (self._id, newValue), asyncio=False)
+        self._mutation(
+            'mutation($id:ID!,$developerOnly:Boolean){updateFloatVariable(id:$id,developerOnly:$developerOnly){id}}', variables={"id": self._id, "developerOnly": newValue}, asyncio=False)
 
     @property
     def value(self):
         if self.client.asyncio:
             return self.loader.load("value")
         else:
-            return self.client.query('{floatVariable(id:"%s"){value}}' % self._id, keys=[
+            return self._query('query($id:ID!){floatVariable(id:$id){value}}', variables={"id": self._id}, keys=[
                 "floatVariable", "value"])
 
     @value.setter
     def value(self, newValue):
-        self.client.mutation(
-            'mutation{updateFloatVariable(id:"%s", value:%s){id}}' % (self._id, newValue), asyncio=False)
+        self._mutation(
+            'mutation($id:ID!,$value:Float){updateFloatVariable(id:$id,value:$value){id}}', variables={"id": self._id, "value": newValue}, asyncio=False)
 
     @property
     def precision(self):
         if self.client.asyncio:
             return self.loader.load("precision")
         else:
-            return self.client.query('{floatVariable(id:"%s"){precision}}' % self._id, keys=[
+            return self._query('query($id:ID!){floatVariable(id:$id){precision}}', variables={"id": self._id}, keys=[
                 "floatVariable", "precision"])
 
     @precision.setter
     def precision(self, newValue):
-        self.client.mutation(
-            'mutation{updateFloatVariable(id:"%s", precision:%s){id}}' % (self._id, newValue), asyncio=False)
+        self._mutation(
+            'mutation($id:ID!,$precision:Int){updateFloatVariable(id:$id,precision:$precision){id}}', variables={"id": self._id, "precision": newValue}, asyncio=False)
 
     @property
     def min(self):
         if self.client.asyncio:
             return self.loader.load("min")
         else:
-            return self.client.query('{floatVariable(id:"%s"){min}}' % self._id, keys=[
+            return self._query('query($id:ID!){floatVariable(id:$id){min}}', variables={"id": self._id}, keys=[
                 "floatVariable", "min"])
 
     @min.setter
     def min(self, newValue):
-        self.client.mutation(
-            'mutation{updateFloatVariable(id:"%s", min:%s){id}}' % (self._id, newValue), asyncio=False)
+        self._mutation(
+            'mutation($id:ID!,$min:Float){updateFloatVariable(id:$id,min:$min){id}}', variables={"id": self._id, "min": newValue}, asyncio=False)
 
     @property
     def max(self):
         if self.client.asyncio:
             return self.loader.load("max")
         else:
-            return self.client.query('{floatVariable(id:"%s"){max}}' % self._id, keys=[
+            return self._query('query($id:ID!){floatVariable(id:$id){max}}', variables={"id": self._id}, keys=[
                 "floatVariable", "max"])
 
     @max.setter
     def max(self, newValue):
-        self.client.mutation(
-            'mutation{updateFloatVariable(id:"%s", max:%s){id}}' % (self._id, newValue), asyncio=False)
+        self._mutation(
+            'mutation($id:ID!,$max:Float){updateFloatVariable(id:$id,max:$max){id}}', variables={"id": self._id, "max": newValue}, asyncio=False)
 
     @property
     def allowed_values(self):
         if self.client.asyncio:
             return self.loader.load("allowedValues")
         else:
-            return self.client.query('{floatVariable(id:"%s"){allowedValues}}' % self._id, keys=[
+            return self._query('query($id:ID!){floatVariable(id:$id){allowedValues}}', variables={"id": self._id}, keys=[
                 "floatVariable", "allowedValues"])
 
     @allowed_values.setter
     def allowed_values(self, newValue):
-        self.client.mutation(
-            'mutation{updateFloatVariable(id:"%s", allowedValues:%s){id}}' % (self._id, newValue), asyncio=False)
+        self._mutation(
+            'mutation($id:ID!,$allowedValues:[Float!]){updateFloatVariable(id:$id,allowedValues:$allowedValues){id}}', variables={"id": self._id, "allowedValues": newValue}, asyncio=False)
 
     @property
     def unit_of_measurement(self):
         if self.client.asyncio:
             return self.loader.load("unitOfMeasurement")
         else:
-            return self.client.query('{floatVariable(id:"%s"){unitOfMeasurement}}' % self._id, keys=[
+            return self._query('query($id:ID!){floatVariable(id:$id){unitOfMeasurement}}', variables={"id": self._id}, keys=[
                 "floatVariable", "unitOfMeasurement"])
 
     @unit_of_measurement.setter
     def unit_of_measurement(self, newValue):
-        self.client.mutation(
-            'mutation{updateFloatVariable(id:"%s", unitOfMeasurement:"%s"){id}}' % (self._id, newValue), asyncio=False)
+        self._mutation(
+            'mutation($id:ID!,$unitOfMeasurement:String){updateFloatVariable(id:$id,unitOfMeasurement:$unitOfMeasurement){id}}', variables={"id": self._id, "unitOfMeasurement": newValue}, asyncio=False)
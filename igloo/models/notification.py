@@ -1,28 +1,32 @@
 from aiodataloader import DataLoader
-from igloo.models.utils import wrapWith
-from igloo.utils import get_representation
+from igloo.instrumentation import loader_batch_size
+from igloo.models.utils import Model, wrapWith, prefetch_fields, prefetch_selection, prefetched, prefetched_items, PAGE_SIZE
+from igloo.utils import get_variable_value
 
 
 class NotificationLoader(DataLoader):
     def __init__(self, client, id):
-        super().__init__()
+        super().__init__(loop=client.loader_loop)
         self.client = client
         self._id = id
 
     async def batch_load_fn(self, keys):
-        fields = " ".join(set(keys))
-        res = await self.client.query('{notification(id:"%s"){%s}}' % (self._id, fields), keys=["thing"])
+        loader_batch_size.set(len(keys))
+        res = await self.client.load_fields("notification", self._id, set(keys))
 
-        resolvedValues = [res[key] for key in keys]
+        resolvedValues = [res[key.split("{")[0]] for key in keys]
 
         return resolvedValues
 
 
-class Notification:
+class Notification(Model):
+    _root = "notification"
+    _loader_class = NotificationLoader
+    __slots__ = ()
+
     def __init__(self, client, id):
         self.client = client
         self._id = id
-        self.loader = NotificationLoader(client, id)
 
     @property
     def id(self):
@@ -33,7 +37,7 @@ class Notification:
         if self.client.asyncio:
             return self.loader.load("createdAt")
         else:
-            return self.client.query('{notification(id:"%s"){createdAt}}' % self._id, keys=[
+            return self._query('query($id:ID!){notification(id:$id){createdAt}}', variables={"id": self._id}, keys=[
                 "notification", "createdAt"])
 
     @property
@@ -41,7 +45,7 @@ class Notification:
         if self.client.asyncio:
             return self.loader.load("updatedAt")
         else:
-            return self.client.query('{notification(id:"%s"){updatedAt}}' % self._id, keys=[
+            return self._query('query($id:ID!){notification(id:$id){updatedAt}}', variables={"id": self._id}, keys=[
                 "notification", "updatedAt"])
 
     @property
@@ -49,7 +53,7 @@ class Notification:
         if self.client.asyncio:
             res = self.loader.load("thing{id}")
         else:
-            res = self.client.query('{notification(id:"%s"){thing{id}}}' % self._id, keys=[
+            res = self._query('query($id:ID!){notification(id:$id){thing{id}}}', variables={"id": self._id}, keys=[
                 "notification", "thing"])
 
         def wrapper(res):
@@ -63,64 +67,81 @@ class Notification:
         if self.client.asyncio:
             return self.loader.load("content")
         else:
-            return self.client.query('{notification(id:"%s"){content}}' %
-                                     self._id, keys=["notification", "content"])
+            return self._query('query($id:ID!){notification(id:$id){content}}', variables={"id": self._id}, keys=["notification", "content"])
 
     @content.setter
     def content(self, newContent):
-        self.client.mutation(
-            'mutation{updateNotification(id:"%s", content:"%s"){id}}' % (self._id, newContent), asyncio=False)
+        self._mutation(
+            'mutation($id:ID!,$content:String){updateNotification(id:$id,content:$content){id}}', variables={"id": self._id, "content": newContent}, asyncio=False)
 
     @property
     def timestamp(self):
         if self.client.asyncio:
             return self.loader.load("timestamp")
         else:
-            return self.client.query('{notification(id:"%s"){timestamp}}' %
-                                     self._id, keys=["notification", "timestamp"])
+            return self._query('query($id:ID!){notification(id:$id){timestamp}}', variables={"id": self._id}, keys=["notification", "timestamp"])
 
     @property
     def read(self):
         if self.client.asyncio:
             return self.loader.load("read")
         else:
-            return self.client.query('{notification(id:"%s"){read}}' %
-                                     self._id, keys=["notification", "read"])
+            return self._query('query($id:ID!){notification(id:$id){read}}', variables={"id": self._id}, keys=["notification", "read"])
 
     @read.setter
     def read(self, newContent):
-        self.client.mutation(
-            'mutation{updateNotification(id:"%s", read:"%s"){id}}' % (self._id, newContent), asyncio=False)
+        self._mutation(
+            'mutation($id:ID!,$read:Boolean){updateNotification(id:$id,read:$read){id}}', variables={"id": self._id, "read": newContent}, asyncio=False)
 
 
 class ThingNotificationList:
+    _field = "notifications"
+    _item_selection = "id"
+
     def __init__(self, client, thingId):
         self.client = client
         self.thingId = thingId
         self.current = 0
-        self._filter = "{}"
+        self._page = []
+        self._prefetch = ()
+        self._filter = {}
+
+    def prefetch(self, *fields):
+        self._prefetch = prefetch_fields(self.client, (Notification,), fields)
+        return self
 
     def filter(self, _filter):
-        self._filter = get_representation(_filter)
+        self._filter = get_variable_value(_filter)
         return self
 
     def __len__(self):
+        items = prefetched_items(self, "Thing", self.thingId)
+        if items is not None:
+            return len(items)
+
         res = self.client.query(
-            '{thing(id:"%s"){notificationCount(filter:%s)}}' % (self.thingId, self._filter))
+            'query($id:ID!,$filter:Json){thing(id:$id){notificationCount(filter:$filter)}}', variables={"id": self.thingId, "filter": self._filter})
         return res["thing"]["notificationCount"]
 
     def __getitem__(self, i):
+        items = prefetched_items(self, "Thing", self.thingId)
+        if items is not None:
+            # prefetched with the thing
+            if isinstance(i, slice):
+                return [prefetched(Notification(self.client, notification["id"]), notification) for notification in items[i]]
+            return prefetched(Notification(self.client, items[i]["id"]), items[i])
+
         if isinstance(i, int):
             res = self.client.query(
-                '{thing(id:"%s"){notifications(limit:1, offset:%d, filter:%s){id}}}' % (self.thingId, i, self._filter))
+                'query($id:ID!,$offset:Int!,$filter:Json){thing(id:$id){notifications(limit:1,offset:$offset,filter:$filter){id%s}}}' % prefetch_selection(self._prefetch), variables={"id": self.thingId, "offset": i, "filter": self._filter})
             if len(res["thing"]["notifications"]) != 1:
                 raise IndexError()
-            return Notification(self.client, res["thing"]["notifications"][0]["id"])
+            return prefetched(Notification(self.client, res["thing"]["notifications"][0]["id"]), res["thing"]["notifications"][0], self._prefetch)
         elif isinstance(i, slice):
             start, end, _ = i.indices(len(self))
             res = self.client.query(
-                '{thing(id:"%s"){notifications(offset:%d, limit:%d, filter:%s){id}}}' % (self.thingId, start, end-start, self._filter))
-            return [Notification(self.client, notification["id"]) for notification in res["thing"]["notifications"]]
+                'query($id:ID!,$offset:Int!,$limit:Int!,$filter:Json){thing(id:$id){notifications(offset:$offset,limit:$limit,filter:$filter){id%s}}}' % prefetch_selection(self._prefetch), variables={"id": self.thingId, "offset": start, "limit": end-start, "filter": self._filter})
+            return [prefetched(Notification(self.client, notification["id"]), notification, self._prefetch) for notification in res["thing"]["notifications"]]
         else:
             raise TypeError("Unexpected type {} passed as index".format(i))
 
@@ -128,14 +149,23 @@ class ThingNotificationList:
         return self
 
     def __next__(self):
-        res = self.client.query(
-            '{thing(id:"%s"){notifications(limit:1, offset:%d, filter:%s){id}}}' % (self.thingId, self.current, self._filter))
-
-        if len(res["thing", "notifications"]) != 1:
-            raise StopIteration
+        items = prefetched_items(self, "Thing", self.thingId)
+        if items is not None:
+            if self.current >= len(items):
+                raise StopIteration
+            self.current += 1
+            return prefetched(Notification(self.client, items[self.current - 1]["id"]), items[self.current - 1])
+
+        if not self._page:
+            res = self.client.query(
+                'query($id:ID!,$offset:Int!,$limit:Int!,$filter:Json){thing(id:$id){notifications(limit:$limit,offset:$offset,filter:$filter){id%s}}}' % prefetch_selection(self._prefetch), variables={"id": self.thingId, "offset": self.current, "limit": PAGE_SIZE, "filter": self._filter})
+            self._page = res["thing"]["notifications"]
+            if not self._page:
+                raise StopIteration
 
         self.current += 1
-        return Notification(self.client, res["thing"]["notifications"][0]["id"])
+        notification = self._page.pop(0)
+        return prefetched(Notification(self.client, notification["id"]), notification, self._prefetch)
 
     def next(self):
         return self.__next__()
@@ -1,17 +1,18 @@
 from aiodataloader import DataLoader
-from igloo.models.utils import wrapWith
-from igloo.utils import get_representation
+from igloo.instrumentation import loader_batch_size
+from igloo.models.utils import Model, wrapWith, prefetch_fields, prefetch_selection, prefetched, PAGE_SIZE
+from igloo.utils import get_variable_value
 
 
 class PendingShareLoader(DataLoader):
     def __init__(self, client, id):
-        super().__init__()
+        super().__init__(loop=client.loader_loop)
         self.client = client
         self._id = id
 
     async def batch_load_fn(self, keys):
-        fields = " ".join(set(keys))
-        res = await self.client.query('{pendingShare(id:"%s"){%s}}' % (self._id, fields), keys=["pendingShare"])
+        loader_batch_size.set(len(keys))
+        res = await self.client.load_fields("pendingShare", self._id, set(keys))
 
         # if fetching object the key will be the first part of the field
         # e.g. when fetching thing{id} the result is in the thing key
@@ -20,11 +21,14 @@ class PendingShareLoader(DataLoader):
         return resolvedValues
 
 
-class PendingShare:
+class PendingShare(Model):
+    _root = "pendingShare"
+    _loader_class = PendingShareLoader
+    __slots__ = ()
+
     def __init__(self, client, id):
         self.client = client
         self._id = id
-        self.loader = PendingShareLoader(client, id)
 
     @property
     def id(self):
@@ -35,20 +39,20 @@ class PendingShare:
         if self.client.asyncio:
             return self.loader.load("role")
         else:
-            return self.client.query('{pendingShare(id:"%s"){role}}' % self._id, keys=[
+            return self._query('query($id:ID!){pendingShare(id:$id){role}}', variables={"id": self._id}, keys=[
                 "pendingShare", "role"])
 
     @role.setter
     def role(self, newContent):
-        self.client.mutation(
-            'mutation{notification(id:"%s", role:"%s"){id}}' % (self._id, newContent), asyncio=False)
+        self._mutation(
+            'mutation($id:ID!,$role:Role){pendingShare(id:$id,role:$role){id}}', variables={"id": self._id, "role": newContent}, asyncio=False)
 
     @property
     def createdAt(self):
         if self.client.asyncio:
             return self.loader.load("createdAt")
         else:
-            return self.client.query('{pendingShare(id:"%s"){createdAt}}' % self._id, keys=[
+            return self._query('query($id:ID!){pendingShare(id:$id){createdAt}}', variables={"id": self._id}, keys=[
                 "pendingShare", "createdAt"])
 
     @property
@@ -56,7 +60,7 @@ class PendingShare:
         if self.client.asyncio:
             return self.loader.load("updatedAt")
         else:
-            return self.client.query('{pendingShare(id:"%s"){updatedAt}}' % self._id, keys=[
+            return self._query('query($id:ID!){pendingShare(id:$id){updatedAt}}', variables={"id": self._id}, keys=[
                 "pendingShare", "updatedAt"])
 
     @property
@@ -64,7 +68,7 @@ class PendingShare:
         if self.client.asyncio:
             res = self.loader.load("sender{id}")
         else:
-            res = self.client.query('{pendingShare(id:"%s"){sender{id}}}' % self._id, keys=[
+            res = self._query('query($id:ID!){pendingShare(id:$id){sender{id}}}', variables={"id": self._id}, keys=[
                 "pendingShare", "sender"])
 
         def wrapper(res):
@@ -78,7 +82,7 @@ class PendingShare:
         if self.client.asyncio:
             res = self.loader.load("recipient{id}")
         else:
-            res = self.client.query('{pendingShare(id:"%s"){recipient{id}}}' % self._id, keys=[
+            res = self._query('query($id:ID!){pendingShare(id:$id){recipient{id}}}', variables={"id": self._id}, keys=[
                 "pendingShare", "recipient"])
 
         def wrapper(res):
@@ -92,7 +96,7 @@ class PendingShare:
         if self.client.asyncio:
             res = self.loader.load("environment{id}")
         else:
-            res = self.client.query('{pendingShare(id:"%s"){environment{id}}}' % self._id, keys=[
+            res = self._query('query($id:ID!){pendingShare(id:$id){environment{id}}}', variables={"id": self._id}, keys=[
                 "pendingShare", "environment"])
 
         def wrapper(res):
@@ -106,25 +110,31 @@ class UserPendingShareList:
     def __init__(self, client, userId):
         self.client = client
         self.current = 0
+        self._page = []
+        self._prefetch = ()
         self.userId = userId
 
+    def prefetch(self, *fields):
+        self._prefetch = prefetch_fields(self.client, (PendingShare,), fields)
+        return self
+
     def __len__(self):
-        res = self.client.query('{user(id:%s){pendingShareCount}}' % self.userId, keys=[
+        res = self.client.query('query($id:ID!){user(id:$id){pendingShareCount}}', variables={"id": self.userId}, keys=[
                                 "user", "pendingShareCount"])
         return res
 
     def __getitem__(self, i):
         if isinstance(i, int):
             res = self.client.query(
-                '{user(id:%s){pendingShares(limit:1, offset:%d){id}}}' % (self.userId, i))
+                'query($id:ID!,$offset:Int!){user(id:$id){pendingShares(limit:1,offset:$offset){id%s}}}' % prefetch_selection(self._prefetch), variables={"id": self.userId, "offset": i})
             if len(res["user"]["pendingShares"]) != 1:
                 raise IndexError()
-            return PendingShare(self.client, res["user"]["pendingShares"][0]["id"])
+            return prefetched(PendingShare(self.client, res["user"]["pendingShares"][0]["id"]), res["user"]["pendingShares"][0], self._prefetch)
         elif isinstance(i, slice):
             start, end, _ = i.indices(len(self))
             res = self.client.query(
-                '{user(id:%s){pendingShares(offset:%d, limit:%d){id}}}' % (self.userId, start, end-start))
-            return [PendingShare(self.client, pendingShare["id"]) for pendingShare in res["user"]["pendingShares"]]
+                'query($id:ID!,$offset:Int!,$limit:Int!){user(id:$id){pendingShares(offset:$offset,limit:$limit){id%s}}}' % prefetch_selection(self._prefetch), variables={"id": self.userId, "offset": start, "limit": end-start})
+            return [prefetched(PendingShare(self.client, pendingShare["id"]), pendingShare, self._prefetch) for pendingShare in res["user"]["pendingShares"]]
         else:
             raise TypeError("Unexpected type {} passed as index".format(i))
 
@@ -132,14 +142,16 @@ class UserPendingShareList:
         return self
 
     def __next__(self):
-        res = self.client.query(
-            '{user(id:%s){pendingShares(limit:1, offset:%d){id}}}' % (self.userId, self.current))
-
-        if len(res["user"]["pendingShares"]) != 1:
-            raise StopIteration
+        if not self._page:
+            res = self.client.query(
+                'query($id:ID!,$offset:Int!,$limit:Int!){user(id:$id){pendingShares(limit:$limit,offset:$offset){id%s}}}' % prefetch_selection(self._prefetch), variables={"id": self.userId, "offset": self.current, "limit": PAGE_SIZE})
+            self._page = res["user"]["pendingShares"]
+            if not self._page:
+                raise StopIteration
 
         self.current += 1
-        return PendingShare(self.client, res["user"]["pendingShares"][0]["id"])
+        pendingShare = self._page.pop(0)
+        return prefetched(PendingShare(self.client, pendingShare["id"]), pendingShare, self._prefetch)
 
     def next(self):
         return self.__next__()
@@ -149,30 +161,36 @@ class EnvironmentPendingShareList:
     def __init__(self, client, environmentId):
         self.client = client
         self.current = 0
+        self._page = []
+        self._prefetch = ()
         self.environmentId = environmentId
-        self._filter = "{}"
+        self._filter = {}
+
+    def prefetch(self, *fields):
+        self._prefetch = prefetch_fields(self.client, (PendingShare,), fields)
+        return self
 
     def filter(self, _filter):
-        self._filter = get_representation(_filter)
+        self._filter = get_variable_value(_filter)
         return self
 
     def __len__(self):
-        res = self.client.query('{environment(id:"%s"){pendingShareCount(filter:%s)}}' % (self.environmentId, self._filter), keys=[
+        res = self.client.query('query($id:ID!,$filter:Json){environment(id:$id){pendingShareCount(filter:$filter)}}', variables={"id": self.environmentId, "filter": self._filter}, keys=[
                                 "environment", "pendingShareCount"])
         return res
 
     def __getitem__(self, i):
         if isinstance(i, int):
             res = self.client.query(
-                '{environment(id:"%s"){pendingShares(limit:1, offset:%d, filter:%s){id}}}' % (self.environmentId, i, self._filter))
+                'query($id:ID!,$offset:Int!,$filter:Json){environment(id:$id){pendingShares(limit:1,offset:$offset,filter:$filter){id%s}}}' % prefetch_selection(self._prefetch), variables={"id": self.environmentId, "offset": i, "filter": self._filter})
             if len(res["environment"]["pendingShares"]) != 1:
                 raise IndexError()
-            return PendingShare(self.client, res["environment"]["pendingShares"][0]["id"])
+            return prefetched(PendingShare(self.client, res["environment"]["pendingShares"][0]["id"]), res["environment"]["pendingShares"][0], self._prefetch)
         elif isinstance(i, slice):
             start, end, _ = i.indices(len(self))
             res = self.client.query(
-                '{environment(id:"%s"){pendingShares(offset:%d, limit:%d, filter:%s){id}}}' % (self.environmentId, start, end-start, self._filter))
-            return [PendingShare(self.client, pendingShare["id"]) for pendingShare in res["environment"]["pendingShares"]]
+                'query($id:ID!,$offset:Int!,$limit:Int!,$filter:Json){environment(id:$id){pendingShares(offset:$offset,limit:$limit,filter:$filter){id%s}}}' % prefetch_selection(self._prefetch), variables={"id": self.environmentId, "offset": start, "limit": end-start, "filter": self._filter})
+            return [prefetched(PendingShare(self.client, pendingShare["id"]), pendingShare, self._prefetch) for pendingShare in res["environment"]["pendingShares"]]
         else:
             raise TypeError("Unexpected type {} passed as index".format(i))
 
@@ -180,14 +198,16 @@ class EnvironmentPendingShareList:
         return self
 
     def __next__(self):
-        res = self.client.query(
-            '{environment(id:"%s"){pendingShares(limit:1, offset:%d, filter:%s){id}}}' % (self.environmentId, self.current, self._filter))
-
-        if len(res["environment"]["pendingShares"]) != 1:
-            raise StopIteration
+        if not self._page:
+            res = self.client.query(
+                'query($id:ID!,$offset:Int!,$limit:Int!,$filter:Json){environment(id:$id){pendingShares(limit:$limit,offset:$offset,filter:$filter){id%s}}}' % prefetch_selection(self._prefetch), variables={"id": self.environmentId, "offset": self.current, "limit": PAGE_SIZE, "filter": self._filter})
+            self._page = res["environment"]["pendingShares"]
+            if not self._page:
+                raise StopIteration
 
         self.current += 1
-        return PendingShare(self.client, res["environment"]["pendingShares"][0]["id"])
+        pendingShare = self._page.pop(0)
+        return prefetched(PendingShare(self.client, pendingShare["id"]), pendingShare, self._prefetch)
 
     def next(self):
         return self.__next__()
@@ -1,17 +1,18 @@
 
 from aiodataloader import DataLoader
-from igloo.models.utils import wrapWith
+from igloo.instrumentation import loader_batch_size
+from igloo.models.utils import Model, wrapWith, prefetch_fields, prefetch_selection, prefetched, PAGE_SIZE
 
 
 class PendingTransferLoader(DataLoader):
     def __init__(self, client, id):
-        super().__init__()
+        super().__init__(loop=client.loader_loop)
         self.client = client
         self._id = id
 
     async def batch_load_fn(self, keys):
-        fields = " ".join(set(keys))
-        res = await self.client.query('{pendingTransfer(id:"%s"){%s}}' % (self._id, fields), keys=["pendingTransfer"])
+        loader_batch_size.set(len(keys))
+        res = await self.client.load_fields("pendingTransfer", self._id, set(keys))
 
         # if fetching object the key will be the first part of the field
         # e.g. when fetching thing{id} the result is in the thing key
@@ -20,11 +21,14 @@ class PendingTransferLoader(DataLoader):
         return resolvedValues
 
 
-class PendingTransfer:
+class PendingTransfer(Model):
+    _root = "pendingTransfer"
+    _loader_class = PendingTransferLoader
+    __slots__ = ()
+
     def __init__(self, client, id):
         self.client = client
         self._id = id
-        self.loader = PendingTransferLoader(client, id)
 
     @property
     def id(self):
@@ -35,7 +39,7 @@ class PendingTransfer:
         if self.client.asyncio:
             res = self.loader.load("sender{id}")
         else:
-            res = self.client.query('{pendingTransfer(id:"%s"){sender{id}}}' % self._id, keys=[
+            res = self._query('query($id:ID!){pendingTransfer(id:$id){sender{id}}}', variables={"id": self._id}, keys=[
                 "pendingTransfer", "sender"])
 
         def wrapper(res):
@@ -49,7 +53,7 @@ class PendingTransfer:
         if self.client.asyncio:
             res = self.loader.load("recipient{id}")
         else:
-            res = self.client.query('{pendingTransfer(id:"%s"){recipient{id}}}' % self._id, keys=[
+            res = self._query('query($id:ID!){pendingTransfer(id:$id){recipient{id}}}', variables={"id": self._id}, keys=[
                 "pendingTransfer", "recipient"])
 
         def wrapper(res):
@@ -63,7 +67,7 @@ class PendingTransfer:
         if self.client.asyncio:
             res = self.loader.load("environment{id}")
         else:
-            res = self.client.query('{pendingTransfer(id:"%s"){environment{id}}}' % self._id, keys=[
+            res = self._query('query($id:ID!){pendingTransfer(id:$id){environment{id}}}', variables={"id": self._id}, keys=[
                 "pendingTransfer", "environment"])
 
         def wrapper(res):
@@ -77,25 +81,31 @@ class UserPendingTransferList:
     def __init__(self, client, userId):
         self.client = client
         self.current = 0
+        self._page = []
+        self._prefetch = ()
         self.userId = userId
 
+    def prefetch(self, *fields):
+        self._prefetch = prefetch_fields(self.client, (PendingTransfer,), fields)
+        return self
+
     def __len__(self):
-        res = self.client.query('{user(id:%s){pendingTransferCount}}' % (self.userId), keys=[
+        res = self.client.query('query($id:ID!){user(id:$id){pendingTransferCount}}', variables={"id": self.userId}, keys=[
                                 "user", "pendingTransferCount"])
         return res
 
     def __getitem__(self, i):
         if isinstance(i, int):
             res = self.client.query(
-                '{user(id:%s){pendingTransfers(limit:1, offset:%d){id}}}' % (self.userId, i))
+                'query($id:ID!,$offset:Int!){user(id:$id){pendingTransfers(limit:1,offset:$offset){id%s}}}' % prefetch_selection(self._prefetch), variables={"id": self.userId, "offset": i})
             if len(res["user"]["pendingTransfers"]) != 1:
                 raise IndexError()
-            return PendingTransfer(self.client, res["user"]["pendingTransfers"][0]["id"])
+            return prefetched(PendingTransfer(self.client, res["user"]["pendingTransfers"][0]["id"]), res["user"]["pendingTransfers"][0], self._prefetch)
         elif isinstance(i, slice):
             start, end, _ = i.indices(len(self))
             res = self.client.query(
-                '{user(id:%s){pendingTransfers(offset:%d, limit:%d){id}}}' % (self.userId, start, end-start))
-            return [PendingTransfer(self.client, ownerChange["id"]) for ownerChange in res["user"]["pendingTransfers"]]
+                'query($id:ID!,$offset:Int!,$limit:Int!){user(id:$id){pendingTransfers(offset:$offset,limit:$limit){id%s}}}' % prefetch_selection(self._prefetch), variables={"id": self.userId, "offset": start, "limit": end-start})
+            return [prefetched(PendingTransfer(self.client, ownerChange["id"]), ownerChange, self._prefetch) for ownerChange in res["user"]["pendingTransfers"]]
         else:
             raise TypeError("Unexpected type {} passed as index".format(i))
 
@@ -103,14 +113,16 @@ class UserPendingTransferList:
         return self
 
     def __next__(self):
-        res = self.client.query(
-            '{user(id:%s){pendingTransfers(limit:1, offset:%d){id}}}' % (self.userId, self.current))
-
-        if len(res["user"]["pendingTransfers"]) != 1:
-            raise StopIteration
+        if not self._page:
+            res = self.client.query(
+                'query($id:ID!,$offset:Int!,$limit:Int!){user(id:$id){pendingTransfers(limit:$limit,offset:$offset){id%s}}}' % prefetch_selection(self._prefetch), variables={"id": self.userId, "offset": self.current, "limit": PAGE_SIZE})
+            self._page = res["user"]["pendingTransfers"]
+            if not self._page:
+                raise StopIteration
 
         self.current += 1
-        return PendingTransfer(self.client, res["user"]["pendingTransfers"][0]["id"])
+        ownerChange = self._page.pop(0)
+        return prefetched(PendingTransfer(self.client, ownerChange["id"]), ownerChange, self._prefetch)
 
     def next(self):
         return self.__next__()
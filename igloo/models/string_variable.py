@@ -1,16 +1,18 @@
 
 from aiodataloader import DataLoader
+from igloo.instrumentation import loader_batch_size
+from igloo.models.utils import Model, wrapWith
 
 
 class StringVariableLoader(DataLoader):
     def __init__(self, client, id):
-        super().__init__()
+        super().__init__(loop=client.loader_loop)
         self.client = client
         self._id = id
 
     async def batch_load_fn(self, keys):
-        fields = " ".join(set(keys))
-        res = await self.client.query('{stringVariable(id:"%s"){%s}}' % (self._id, fields), keys=["stringVariable"])
+        loader_batch_size.set(len(keys))
+        res = await self.client.load_fields("stringVariable", self._id, set(keys))
 
         # if fetching object the key will be the first part of the field
         # e.g. when fetching thing{id} the result is in the thing key
@@ -19,11 +21,14 @@ class StringVariableLoader(DataLoader):
         return resolvedValues
 
 
-class StringVariable:
+class StringVariable(Model):
+    _root = "stringVariable"
+    _loader_class = StringVariableLoader
+    __slots__ = ()
+
     def __init__(self, client, id):
         self.client = client
         self._id = id
-        self.loader = StringVariableLoader(client, id)
 
     @property
     def id(self):
@@ -34,59 +39,59 @@ class StringVariable:
         if self.client.asyncio:
             return self.loader.load("name")
         else:
-            return self.client.query('{stringVariable(id:"%s"){name}}' % self._id, keys=[
+            return self._query('query($id:ID!){stringVariable(id:$id){name}}', variables={"id": self._id}, keys=[
                 "stringVariable", "name"])
 
     @name.setter
     def name(self, newName):
-        self.client.mutation(
-            'mutation{updateStringVariable(id:"%s", name:"%s"){id}}' % (self._id, newName), asyncio=False)
+        self._mutation(
+            'mutation($id:ID!,$name:String){updateStringVariable(id:$id,name:$name){id}}', variables={"id": self._id, "name": newName}, asyncio=False)
 
     @property
     def developer_only(self):
         if self.client.asyncio:
             return self.loader.load("developerOnly")
         else:
-            return self.client.query('{stringVariable(id:"%s"){developerOnly}}' % self._id, keys=[
+            return self._query('query($id:ID!){stringVariable(id:$id){developerOnly}}', variables={"id": self._id}, keys=[
                 "stringVariable", "developerOnly"])
 
     @developer_only.setter
     def developer_only(self, newValue):
-        self.client.mutation(
-            'mutation{updateStringVariable(id:"%s", developerOnly:%s){id}}' % (self._id, newValue), asyncio=False)
+        self._mutation(
+            'mutation($id:ID!,$developerOnly:Boolean){updateStringVariable(id:$id,developerOnly:$developerOnly){id}}', variables={"id": self._id, "developerOnly": newValue}, asyncio=False)
 
     @property
     def hidden(self):
         if self.client.asyncio:
             return self.loader.load("hidden")
         else:
-            return self.client.query('{stringVariable(id:"%s"){hidden}}' % self._id, keys=[
+            return self._query('query($id:ID!){stringVariable(id:$id){hidden}}', variables={"id": self._id}, keys=[
                 "stringVariable", "hidden"])
 
     @hidden.setter
     def hidden(self, newValue):
-        self.client.mutation(
-            'mutation{updateStringVariable(id:"%s", hidden:%s){id}}' % (self._id, newValue), asyncio=False)
+        self._mutation(
+            'mutation($id:ID!,$hidden:Boolean){updateStringVariable(id:$id,hidden:$hidden){id}}', variables={"id": self._id, "hidden": newValue}, asyncio=False)
 
     @property
     def index(self):
         if self.client.asyncio:
             return self.loader.load("index")
         else:
-            return self.client.query('{stringVariable(id:"%s"){index}}' % self._id, keys=[
+            return self._query('query($id:ID!){stringVariable(id:$id){index}}', variables={"id": self._id}, keys=[
                 "stringVariable", "index"])
 
     @index.setter
     def index(self, newValue):
-        self.client.mutation(
-            'mutation{updateStringVariable(id:"%s", index:%s){id}}' % (self._id, newValue), asyncio=False)
+        self._mutation(
+            'mutation($id:ID!,$index:Int){updateStringVariable(id:$id,index:$index){id}}', variables={"id": self._id, "index": newValue}, asyncio=False)
 
     @property
     def my_role(self):
         if self.client.asyncio:
             return self.loader.load("myRole")
         else:
-            return self.client.query('{stringVariable(id:"%s"){myRole}}' % self._id, keys=[
+            return self._query('query($id:ID!){stringVariable(id:$id){myRole}}', variables={"id": self._id}, keys=[
                 "stringVariable", "myRole"])
 
     @property
@@ -94,7 +99,7 @@ class StringVariable:
         if self.client.asyncio:
             return self.loader.load("createdAt")
         else:
-            return self.client.query('{stringVariable(id:"%s"){createdAt}}' % self._id, keys=[
+            return self._query('query($id:ID!){stringVariable(id:$id){createdAt}}', variables={"id": self._id}, keys=[
                 "stringVariable", "createdAt"])
 
     @property
@@ -102,7 +107,7 @@ class StringVariable:
         if self.client.asyncio:
             return self.loader.load("updatedAt")
         else:
-            return self.client.query('{stringVariable(id:"%s"){updatedAt}}' % self._id, keys=[
+            return self._query('query($id:ID!){stringVariable(id:$id){updatedAt}}', variables={"id": self._id}, keys=[
                 "stringVariable", "updatedAt"])
 
     async def _async_load_thing(self):
@@ -116,60 +121,63 @@ class StringVariable:
         if self.client.asyncio:
             return self._async_load_thing()
         else:
-            id = self.client.query('{stringVariable(id:"%s"){thing{id}}}' % self._id, keys=[
-                "stringVariable", "thing", "id"])
+            res = self._query('query($id:ID!){stringVariable(id:$id){thing{id}}}', variables={"id": self._id}, keys=[
+                "stringVariable", "thing"])
+
+            def wrapper(res):
+                from .thing import Thing
+                return Thing(self.client, res["id"])
 
-            from .thing import Thing
-            return Thing(self.client, id)
+            return wrapWith(res, wrapper)
 
     @property
     def user_permission(self):
         if self.client.asyncio:
             return self.loader.load("userPermission")
         else:
-            return self.client.query('{stringVariable(id:"%s"){userPermission}}' % self._id, keys=[
+            return self._query('query($id:ID!){stringVariable(id:$id){userPermission}}', variables={"id": self._id}, keys=[
                 "stringVariable", "userPermission"])
 
     @user_permission.setter
     def user_permission(self, newValue):
-        self.client.mutation(
-            'mutation{updateStringVariable(id:"%s", userPermission:%s){id}}' % (self._id, newValue), asyncio=False)
+        self._mutation(
+            'mutation($id:ID!,$userPermission:Permission){updateStringVariable(id:$id,userPermission:$userPermission){id}}', variables={"id": self._id, "userPermission": newValue}, asyncio=False)
 
     @property
     def value(self):
         if self.client.asyncio:
             return self.loader.load("value")
         else:
-            return self.client.query('{stringVariable(id:"%s"){value}}' % self._id, keys=[
+            return self._query('query($id:ID!){stringVariable(id:$id){value}}', variables={"id": self._id}, keys=[
                 "stringVariable", "value"])
 
     @value.setter
     def value(self, newValue):
-        self.client.mutation(
-            'mutation{updateStringVariable(id:"%s", value:"%s"){id}}' % (self._id, newValue), asyncio=False)
+        self._mutation(
+            'mutation($id:ID!,$value:String){updateStringVariable(id:$id,value:$value){id}}', variables={"id": self._id, "value": newValue}, asyncio=False)
 
     @property
     def max_characters(self):
         if self.client.asyncio:
             return self.loader.load("maxCharacters")
         else:
-            return self.client.query('{stringVariable(id:"%s"){maxCharacters}}' % self._id, keys=[
+            return self._query('query($id:ID!){stringVariable(id:$id){maxCharacters}}', variables={"id": self._id}, keys=[
                 "stringVariable", "maxCharacters"])
 
     @max_characters.setter
     def max_characters(self, newValue):
-        self.client.mutation(
-            'mutation{updateStringVariable(id:"%s", maxCharacters:%s){id}}' % (self._id, newValue), asyncio=False)
+        self._mutation(
+            'mutation($id:ID!,$maxCharacters:Int){updateStringVariable(id:$id,maxCharacters:$maxCharacters){id}}', variables={"id": self._id, "maxCharacters": newValue}, asyncio=False)
 
     @property
     def allowedValues(self):
         if self.client.asyncio:
             return self.loader.load("allowedValues")
         else:
-            return self.client.query('{stringVariable(id:"%s"){allowedValues}}' % self._id, keys=[
+            return self._query('query($id:ID!){stringVariable(id:$id){allowedValues}}', variables={"id": self._id}, keys=[
                 "stringVariable", "allowedValues"])
 
     @allowedValues.setter
     def allowedValues(self, newValue):
-        self.client.mutation(
-            'mutation{updateStringVariable(id:"%s", allowedValues:%s){id}}' % (self._id, str(newValue)), asyncio=False)
+        self._mutation(
+            'mutation($id:ID!,$allowedValues:[String!]){updateStringVariable(id:$id,allowedValues:$allowedValues){id}}', variables={"id": self._id, "allowedValues": newValue}, asyncio=False)
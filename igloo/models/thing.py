@@ -1,25 +1,30 @@
 
 from aiodataloader import DataLoader
-from igloo.models.utils import wrapWith
-from igloo.utils import get_representation
+from igloo.instrumentation import loader_batch_size
+from igloo.models.utils import Model, wrapWith, prefetch_fields, prefetch_selection, prefetched, prefetched_items, PAGE_SIZE
+from igloo.utils import get_variable_value
 
 
 class ThingLoader(DataLoader):
     def __init__(self, client, id):
-        super().__init__()
+        super().__init__(loop=client.loader_loop)
         self.client = client
         self._id = id
 
     async def batch_load_fn(self, keys):
-        fields = " ".join(set(keys))
-        res = await self.client.query('{thing(id:"%s"){%s}}' % (self._id, fields), keys=["thing"])
+        loader_batch_size.set(len(keys))
+        res = await self.client.load_fields("thing", self._id, set(keys))
 
         resolvedValues = [res[key.split("{")[0]] for key in keys]
 
         return resolvedValues
 
 
-class Thing:
+class Thing(Model):
+    _root = "thing"
+    _loader_class = ThingLoader
+    __slots__ = ()
+
     def __init__(self, client, id=None):
         self.client = client
 
@@ -29,8 +34,6 @@ class Thing:
         else:
             self._id = id
 
-        self.loader = ThingLoader(client, self._id)
-
     @property
     def id(self):
         return self._id
@@ -40,7 +43,7 @@ class Thing:
         if self.client.asyncio:
             return self.loader.load("createdAt")
         else:
-            return self.client.query('{thing(id:"%s"){createdAt}}' % self._id, keys=[
+            return self._query('query($id:ID!){thing(id:$id){createdAt}}', variables={"id": self._id}, keys=[
                 "thing", "createdAt"])
 
     @property
@@ -48,7 +51,7 @@ class Thing:
         if self.client.asyncio:
             return self.loader.load("updatedAt")
         else:
-            return self.client.query('{thing(id:"%s"){updatedAt}}' % self._id, keys=[
+            return self._query('query($id:ID!){thing(id:$id){updatedAt}}', variables={"id": self._id}, keys=[
                 "thing", "updatedAt"])
 
     @property
@@ -56,68 +59,62 @@ class Thing:
         if self.client.asyncio:
             return self.loader.load("type")
         else:
-            return self.client.query('{thing(id:"%s"){type}}' %
-                                     self._id, keys=["thing", "type"])
+            return self._query('query($id:ID!){thing(id:$id){type}}', variables={"id": self._id}, keys=["thing", "type"])
 
     @type.setter
     def type(self, newThingType):
-        self.client.mutation(
-            'mutation{updateThing(id:"%s", type:"%s"){id}}' % (self._id, newThingType), asyncio=False)
+        self._mutation(
+            'mutation($id:ID!,$type:String){updateThing(id:$id,type:$type){id}}', variables={"id": self._id, "type": newThingType}, asyncio=False)
 
     @property
     def my_role(self):
         if self.client.asyncio:
             return self.loader.load("myRole")
         else:
-            return self.client.query('{thing(id:"%s"){myRole}}' %
-                                     self._id, keys=["thing", "myRole"])
+            return self._query('query($id:ID!){thing(id:$id){myRole}}', variables={"id": self._id}, keys=["thing", "myRole"])
 
     @property
     def starred(self):
         if self.client.asyncio:
             return self.loader.load("starred")
         else:
-            return self.client.query('{thing(id:"%s"){starred}}' %
-                                     self._id, keys=["thing", "starred"])
+            return self._query('query($id:ID!){thing(id:$id){starred}}', variables={"id": self._id}, keys=["thing", "starred"])
 
     @starred.setter
     def starred(self, newValue):
-        self.client.mutation(
-            'mutation{updateThing(id:"%s", starred:%s){id}}' % (self._id, "true" if newValue else "false"), asyncio=False)
+        self._mutation(
+            'mutation($id:ID!,$starred:Boolean){updateThing(id:$id,starred:$starred){id}}', variables={"id": self._id, "starred": newValue}, asyncio=False)
 
     @property
     def name(self):
         if self.client.asyncio:
             return self.loader.load("name")
         else:
-            return self.client.query('{thing(id:"%s"){name}}' %
-                                     self._id, keys=["thing", "name"])
+            return self._query('query($id:ID!){thing(id:$id){name}}', variables={"id": self._id}, keys=["thing", "name"])
 
     @name.setter
     def name(self, newName):
-        self.client.mutation(
-            'mutation{updateThing(id:"%s", name:"%s"){id}}' % (self._id, newName), asyncio=False)
+        self._mutation(
+            'mutation($id:ID!,$name:String){updateThing(id:$id,name:$name){id}}', variables={"id": self._id, "name": newName}, asyncio=False)
 
     @property
     def index(self):
         if self.client.asyncio:
             return self.loader.load("index")
         else:
-            return self.client.query('{thing(id:"%s"){index}}' %
-                                     self._id, keys=["thing", "index"])
+            return self._query('query($id:ID!){thing(id:$id){index}}', variables={"id": self._id}, keys=["thing", "index"])
 
     @index.setter
     def index(self, newValue):
-        self.client.mutation(
-            'mutation{updateThing(id:"%s", index:%s){id}}' % (self._id, newValue), asyncio=False)
+        self._mutation(
+            'mutation($id:ID!,$index:Int){updateThing(id:$id,index:$index){id}}', variables={"id": self._id, "index": newValue}, asyncio=False)
 
     @property
     def online(self):
         if self.client.asyncio:
             return self.loader.load("online")
         else:
-            return self.client.query('{thing(id:"%s"){online}}' %
-                                     self._id, keys=["thing", "online"])
+            return self._query('query($id:ID!){thing(id:$id){online}}', variables={"id": self._id}, keys=["thing", "online"])
 
     @online.setter
     def online(self, newValue):
@@ -129,118 +126,107 @@ class Thing:
         if self.client.asyncio:
             return self.loader.load("token")
         else:
-            return self.client.query('{thing(id:"%s"){token}}' %
-                                     self._id, keys=["thing", "token"])
+            return self._query('query($id:ID!){thing(id:$id){token}}', variables={"id": self._id}, keys=["thing", "token"])
 
     @property
     def used_storage(self):
         if self.client.asyncio:
             return self.loader.load("usedStorage")
         else:
-            return self.client.query('{thing(id:"%s"){usedStorage}}' %
-                                     self._id, keys=["thing", "usedStorage"])
+            return self._query('query($id:ID!){thing(id:$id){usedStorage}}', variables={"id": self._id}, keys=["thing", "usedStorage"])
 
     @property
     def stored_notifications(self):
         if self.client.asyncio:
             return self.loader.load("storedNotifications")
         else:
-            return self.client.query('{thing(id:"%s"){storedNotifications}}' %
-                                     self._id, keys=["thing", "storedNotifications"])
+            return self._query('query($id:ID!){thing(id:$id){storedNotifications}}', variables={"id": self._id}, keys=["thing", "storedNotifications"])
 
     @stored_notifications.setter
     def stored_notifications(self, newValue):
-        self.client.mutation(
-            'mutation{updateThing(id:"%s", storedNotifications:%s){id}}' % (self._id, newValue), asyncio=False)
+        self._mutation(
+            'mutation($id:ID!,$storedNotifications:Int){updateThing(id:$id,storedNotifications:$storedNotifications){id}}', variables={"id": self._id, "storedNotifications": newValue}, asyncio=False)
 
     @property
     def signal(self):
         if self.client.asyncio:
             return self.loader.load("signal")
         else:
-            return self.client.query('{thing(id:"%s"){signal}}' %
-                                     self._id, keys=["thing", "signal"])
+            return self._query('query($id:ID!){thing(id:$id){signal}}', variables={"id": self._id}, keys=["thing", "signal"])
 
     @signal.setter
     def signal(self, newValue):
-        self.client.mutation(
-            'mutation{updateThing(id:"%s", signal:%s){id}}' % (self._id, newValue), asyncio=False)
+        self._mutation(
+            'mutation($id:ID!,$signal:Int){updateThing(id:$id,signal:$signal){id}}', variables={"id": self._id, "signal": newValue}, asyncio=False)
 
     @property
     def battery(self):
         if self.client.asyncio:
             return self.loader.load("battery")
         else:
-            return self.client.query('{thing(id:"%s"){battery}}' %
-                                     self._id, keys=["thing", "battery"])
+            return self._query('query($id:ID!){thing(id:$id){battery}}', variables={"id": self._id}, keys=["thing", "battery"])
 
     @battery.setter
     def battery(self, newValue):
-        self.client.mutation(
-            'mutation{updateThing(id:"%s", battery:%s){id}}' % (self._id, newValue), asyncio=False)
+        self._mutation(
+            'mutation($id:ID!,$battery:Float){updateThing(id:$id,battery:$battery){id}}', variables={"id": self._id, "battery": newValue}, asyncio=False)
 
     @property
     def battery_charging(self):
         if self.client.asyncio:
             return self.loader.load("batteryCharging")
         else:
-            return self.client.query('{thing(id:"%s"){batteryCharging}}' %
-                                     self._id, keys=["thing", "batteryCharging"])
+            return self._query('query($id:ID!){thing(id:$id){batteryCharging}}', variables={"id": self._id}, keys=["thing", "batteryCharging"])
 
     @battery_charging.setter
     def battery_charging(self, newValue):
-        self.client.mutation(
-            'mutation{updateThing(id:"%s", batteryCharging:%s){id}}' % (self._id, "true" if newValue else "false"), asyncio=False)
+        self._mutation(
+            'mutation($id:ID!,$batteryCharging:Boolean){updateThing(id:$id,batteryCharging:$batteryCharging){id}}', variables={"id": self._id, "batteryCharging": newValue}, asyncio=False)
 
     @property
     def firmware(self):
         if self.client.asyncio:
             return self.loader.load("firmware")
         else:
-            return self.client.query('{thing(id:"%s"){firmware}}' %
-                                     self._id, keys=["thing", "firmware"])
+            return self._query('query($id:ID!){thing(id:$id){firmware}}', variables={"id": self._id}, keys=["thing", "firmware"])
 
     @firmware.setter
     def firmware(self, newValue):
-        self.client.mutation(
-            'mutation{updateThing(id:"%s", firmware:"%s"){id}}' % (self._id, newValue), asyncio=False)
+        self._mutation(
+            'mutation($id:ID!,$firmware:String){updateThing(id:$id,firmware:$firmware){id}}', variables={"id": self._id, "firmware": newValue}, asyncio=False)
 
     @property
     def muted(self):
         if self.client.asyncio:
             return self.loader.load("muted")
         else:
-            return self.client.query('{thing(id:"%s"){muted}}' %
-                                     self._id, keys=["thing", "muted"])
+            return self._query('query($id:ID!){thing(id:$id){muted}}', variables={"id": self._id}, keys=["thing", "muted"])
 
     @muted.setter
     def muted(self, newValue):
-        self.client.mutation(
-            'mutation{updateThing(id:"%s", muted:%s){id}}' % (self._id, "true" if newValue else "false"), asyncio=False)
+        self._mutation(
+            'mutation($id:ID!,$muted:Boolean){updateThing(id:$id,muted:$muted){id}}', variables={"id": self._id, "muted": newValue}, asyncio=False)
 
     @property
     def qr_code(self):
         if self.client.asyncio:
             return self.loader.load("qrCode")
         else:
-            return self.client.query('{thing(id:"%s"){qrCode}}' %
-                                     self._id, keys=["thing", "qrCode"])
+            return self._query('query($id:ID!){thing(id:$id){qrCode}}', variables={"id": self._id}, keys=["thing", "qrCode"])
 
     @property
     def pair_code(self):
         if self.client.asyncio:
             return self.loader.load("pairCode")
         else:
-            return self.client.query('{thing(id:"%s"){pairCode}}' %
-                                     self._id, keys=["thing", "pairCode"])
+            return self._query('query($id:ID!){thing(id:$id){pairCode}}', variables={"id": self._id}, keys=["thing", "pairCode"])
 
     @property
     def paired(self):
         if self.client.asyncio:
             return self.loader.load("paired")
         else:
-            return self.client.query('{thing(id:"%s"){paired}}' %
-                                     self._id, keys=["thing", "paired"])
+            return self._query('query($id:ID!){thing(id:$id){paired}}', variables={"id": self._id}, keys=["thing", "paired"])
 
     @property
     def environment(self):
@@ -249,8 +235,7 @@ class Thing:
         if self.client.asyncio:
             res = self.loader.load("environment{id}")
         else:
-            res = self.client.query('{thing(id:"%s"){environment{id}}}' %
-                                    self._id, keys=["thing", "environment"])
+            res = self._query('query($id:ID!){thing(id:$id){environment{id}}}', variables={"id": self._id}, keys=["thing", "environment"])
 
         def wrapper(res):
             return Environment(self.client, res["id"])
@@ -264,8 +249,7 @@ class Thing:
         if self.client.asyncio:
             res = self.loader.load("producer{id}")
         else:
-            res = self.client.query('{thing(id:"%s"){producer{id}}}' %
-                                    self._id, keys=["thing", "producer"])
+            res = self._query('query($id:ID!){thing(id:$id){producer{id}}}', variables={"id": self._id}, keys=["thing", "producer"])
 
         def wrapper(res):
             return User(self.client, res["id"])
@@ -284,8 +268,7 @@ class Thing:
         if self.client.asyncio:
             res = self.loader.load("lastNotification{id}")
         else:
-            res = self.client.query('{thing(id:"%s"){lastNotification{id}}}' %
-                                    self._id, keys=["thing", "lastNotification"])
+            res = self._query('query($id:ID!){thing(id:$id){lastNotification{id}}}', variables={"id": self._id}, keys=["thing", "lastNotification"])
 
         def wrapper(res):
             return Notification(self.client, res["id"])
@@ -303,33 +286,53 @@ class Thing:
 
 
 class EnvironmentThingList:
+    _field = "things"
+    _item_selection = "id"
+
     def __init__(self, client, environmentId):
         self.client = client
         self.environmentId = environmentId
         self.current = 0
-        self._filter = "{}"
+        self._page = []
+        self._prefetch = ()
+        self._filter = {}
+
+    def prefetch(self, *fields):
+        self._prefetch = prefetch_fields(self.client, (Thing,), fields)
+        return self
 
     def filter(self, _filter):
-        self._filter = get_representation(_filter)
+        self._filter = get_variable_value(_filter)
         return self
 
     def __len__(self):
+        items = prefetched_items(self, "Environment", self.environmentId)
+        if items is not None:
+            return len(items)
+
         res = self.client.query(
-            '{environment(id:"%s"){thingCount(filter:%s)}}' % (self.environmentId, self._filter))
+            'query($id:ID!,$filter:Json){environment(id:$id){thingCount(filter:$filter)}}', variables={"id": self.environmentId, "filter": self._filter})
         return res["environment"]["thingCount"]
 
     def __getitem__(self, i):
+        items = prefetched_items(self, "Environment", self.environmentId)
+        if items is not None:
+            # prefetched with the environment
+            if isinstance(i, slice):
+                return [prefetched(Thing(self.client, thing["id"]), thing) for thing in items[i]]
+            return prefetched(Thing(self.client, items[i]["id"]), items[i])
+
         if isinstance(i, int):
             res = self.client.query(
-                '{environment(id:"%s"){things(limit:1, offset:%d, filter:%s){id}}}' % (self.environmentId, i, self._filter))
+                'query($id:ID!,$offset:Int!,$filter:Json){environment(id:$id){things(limit:1,offset:$offset,filter:$filter){id%s}}}' % prefetch_selection(self._prefetch), variables={"id": self.environmentId, "offset": i, "filter": self._filter})
             if len(res["environment"]["things"]) != 1:
                 raise IndexError()
-            return Thing(self.client, res["environment"]["things"][0]["id"])
+            return prefetched(Thing(self.client, res["environment"]["things"][0]["id"]), res["environment"]["things"][0], self._prefetch)
         elif isinstance(i, slice):
             start, end, _ = i.indices(len(self))
             res = self.client.query(
-                '{environment(id:"%s"){things(offset:%d, limit:%d, filter:%s){id}}}' % (self.environmentId, start, end-start, self._filter))
-            return [Thing(self.client, thing["id"]) for thing in res["environment"]["things"]]
+                'query($id:ID!,$offset:Int!,$limit:Int!,$filter:Json){environment(id:$id){things(offset:$offset,limit:$limit,filter:$filter){id%s}}}' % prefetch_selection(self._prefetch), variables={"id": self.environmentId, "offset": start, "limit": end-start, "filter": self._filter})
+            return [prefetched(Thing(self.client, thing["id"]), thing, self._prefetch) for thing in res["environment"]["things"]]
         else:
             raise TypeError("Unexpected type {} passed as index".format(i))
 
@@ -337,14 +340,23 @@ class EnvironmentThingList:
         return self
 
     def __next__(self):
-        res = self.client.query(
-            '{environment(id:"%s"){things(limit:1, offset:%d, filter:%s){id}}}' % (self.environmentId, self.current, self._filter))
-
-        if len(res["environment", "things"]) != 1:
-            raise StopIteration
+        items = prefetched_items(self, "Environment", self.environmentId)
+        if items is not None:
+            if self.current >= len(items):
+                raise StopIteration
+            self.current += 1
+            return prefetched(Thing(self.client, items[self.current - 1]["id"]), items[self.current - 1])
+
+        if not self._page:
+            res = self.client.query(
+                'query($id:ID!,$offset:Int!,$limit:Int!,$filter:Json){environment(id:$id){things(limit:$limit,offset:$offset,filter:$filter){id%s}}}' % prefetch_selection(self._prefetch), variables={"id": self.environmentId, "offset": self.current, "limit": PAGE_SIZE, "filter": self._filter})
+            self._page = res["environment"]["things"]
+            if not self._page:
+                raise StopIteration
 
         self.current += 1
-        return Thing(self.client, res["environment"]["things"][0]["id"])
+        thing = self._page.pop(0)
+        return prefetched(Thing(self.client, thing["id"]), thing, self._prefetch)
 
     def next(self):
         return self.__next__()
@@ -354,30 +366,36 @@ class DeveloperThingList:
     def __init__(self, client, userId):
         self.client = client
         self.current = 0
-        self._filter = "{}"
+        self._page = []
+        self._prefetch = ()
+        self._filter = {}
         self.userId = userId
 
+    def prefetch(self, *fields):
+        self._prefetch = prefetch_fields(self.client, (Thing,), fields)
+        return self
+
     def filter(self, _filter):
-        self._filter = get_representation(_filter)
+        self._filter = get_variable_value(_filter)
         return self
 
     def __len__(self):
         res = self.client.query(
-            '{user(id:%s){developerThingCount(filter:%s)}}' % (self.userId, self._filter))
+            'query($id:ID!,$filter:Json){user(id:$id){developerThingCount(filter:$filter)}}', variables={"id": self.userId, "filter": self._filter})
         return res["user"]["developerThingCount"]
 
     def __getitem__(self, i):
         if isinstance(i, int):
             res = self.client.query(
-                '{user(id:%s){developerThings(limit:1, offset:%d, filter:%s){id}}}' % (self.userId, i, self._filter))
+                'query($id:ID!,$offset:Int!,$filter:Json){user(id:$id){developerThings(limit:1,offset:$offset,filter:$filter){id%s}}}' % prefetch_selection(self._prefetch), variables={"id": self.userId, "offset": i, "filter": self._filter})
             if len(res["user"]["developerThings"]) != 1:
                 raise IndexError()
-            return Thing(self.client, res["user"]["developerThings"][0]["id"])
+            return prefetched(Thing(self.client, res["user"]["developerThings"][0]["id"]), res["user"]["developerThings"][0], self._prefetch)
         elif isinstance(i, slice):
             start, end, _ = i.indices(len(self))
             res = self.client.query(
-                '{user(id:%s){developerThings(offset:%d, limit:%d, filter:%s){id}}}' % (self.userId, start, end-start, self._filter))
-            return [Thing(self.client, thing["id"]) for thing in res["user"]["developerThings"]]
+                'query($id:ID!,$offset:Int!,$limit:Int!,$filter:Json){user(id:$id){developerThings(offset:$offset,limit:$limit,filter:$filter){id%s}}}' % prefetch_selection(self._prefetch), variables={"id": self.userId, "offset": start, "limit": end-start, "filter": self._filter})
+            return [prefetched(Thing(self.client, thing["id"]), thing, self._prefetch) for thing in res["user"]["developerThings"]]
         else:
             raise TypeError("Unexpected type {} passed as index".format(i))
 
@@ -385,14 +403,16 @@ class DeveloperThingList:
         return self
 
     def __next__(self):
-        res = self.client.query(
-            '{user(id:%s){developerThings(limit:1, offset:%d, filter:%s){id}}}' % (self.userId, self.current, self._filter))
-
-        if len(res["user", "developerThings"]) != 1:
-            raise StopIteration
+        if not self._page:
+            res = self.client.query(
+                'query($id:ID!,$offset:Int!,$limit:Int!,$filter:Json){user(id:$id){developerThings(limit:$limit,offset:$offset,filter:$filter){id%s}}}' % prefetch_selection(self._prefetch), variables={"id": self.userId, "offset": self.current, "limit": PAGE_SIZE, "filter": self._filter})
+            self._page = res["user"]["developerThings"]
+            if not self._page:
+                raise StopIteration
 
         self.current += 1
-        return Thing(self.client, res["user"]["developerThings"][0]["id"])
+        thing = self._page.pop(0)
+        return prefetched(Thing(self.client, thing["id"]), thing, self._prefetch)
 
     def next(self):
         return self.__next__()
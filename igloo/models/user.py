@@ -1,22 +1,28 @@
 from aiodataloader import DataLoader
+from igloo.instrumentation import loader_batch_size
+from igloo.models.utils import Model, prefetch_fields, prefetch_selection, prefetched, PAGE_SIZE
 
 
 class UserLoader(DataLoader):
     def __init__(self, client, id):
-        super().__init__()
+        super().__init__(loop=client.loader_loop)
         self.client = client
         self._id = id
 
     async def batch_load_fn(self, keys):
-        fields = " ".join(set(keys))
-        res = await self.client.query('{user(id:"%s"){%s}}' % (self._id, fields), keys=["user"])
+        loader_batch_size.set(len(keys))
+        res = await self.client.load_fields("user", self._id, set(keys))
 
-        resolvedValues = [res[key] for key in keys]
+        resolvedValues = [res[key.split("{")[0]] for key in keys]
 
         return resolvedValues
 
 
-class User:
+class User(Model):
+    _root = "user"
+    _loader_class = UserLoader
+    __slots__ = ()
+
     def __init__(self, client, id=None, email=None):
         self.client = client
 
@@ -25,12 +31,10 @@ class User:
                 '{user{id}}', keys=["user", "id"], asyncio=False)
         elif id is None:
             self._id = self.client.query(
-                '{user(email:"%s"){id}}' % email, keys=["user", "id"], asyncio=False)
+                'query($email:String!){user(email:$email){id}}', variables={"email": email}, keys=["user", "id"], asyncio=False)
         else:
             self._id = id
 
-        self.loader = UserLoader(client, self._id)
-
     @property
     def id(self):
         return self._id
@@ -40,38 +44,38 @@ class User:
         if self.client.asyncio:
             return self.loader.load("email")
         else:
-            return self.client.query('{user(id:"%s"){email}}' % self._id, keys=["user", "email"])
+            return self._query('query($id:ID!){user(id:$id){email}}', variables={"id": self._id}, keys=["user", "email"])
 
     @property
     def name(self):
         if self.client.asyncio:
             return self.loader.load("name")
         else:
-            return self.client.query('{user(id:"%s"){name}}' % self._id, keys=["user", "name"])
+            return self._query('query($id:ID!){user(id:$id){name}}', variables={"id": self._id}, keys=["user", "name"])
 
     @name.setter
     def name(self, newName):
-        self.client.mutation(
-            'mutation{updateUser(id:"%s", name:"%s"){id}}' % (self._id, newName), asyncio=False)
+        self._mutation(
+            'mutation($id:ID!,$name:String){updateUser(id:$id,name:$name){id}}', variables={"id": self._id, "name": newName}, asyncio=False)
 
     @property
     def company_name(self):
         if self.client.asyncio:
             return self.loader.load("companyName")
         else:
-            return self.client.query('{user(id:"%s"){companyName}}' % self._id, keys=["user", "companyName"])
+            return self._query('query($id:ID!){user(id:$id){companyName}}', variables={"id": self._id}, keys=["user", "companyName"])
 
     @company_name.setter
     def company_name(self, newName):
-        self.client.mutation(
-            'mutation{updateUser(id:"%s", companyName:"%s"){id}}' % (self._id, newName), asyncio=False)
+        self._mutation(
+            'mutation($id:ID!,$companyName:String){updateUser(id:$id,companyName:$companyName){id}}', variables={"id": self._id, "companyName": newName}, asyncio=False)
 
     @property
     def profile_icon_color(self):
         if self.client.asyncio:
             return self.loader.load("profileIconColor")
         else:
-            return self.client.query('{user(id:"%s"){profileIconColor}}' % self._id,
+            return self._query('query($id:ID!){user(id:$id){profileIconColor}}', variables={"id": self._id},
                                      keys=["user", "profileIconColor"])
 
     @property
@@ -79,98 +83,98 @@ class User:
         if self.client.asyncio:
             return self.loader.load("quietMode")
         else:
-            return self.client.query('{user(id:"%s"){quietMode}}' % self._id, keys=[
+            return self._query('query($id:ID!){user(id:$id){quietMode}}', variables={"id": self._id}, keys=[
                 "user", "quietMode"])
 
     @quiet_mode.setter
     def quiet_mode(self, newMode):
-        self.client.mutation(
-            'mutation{updateUser(id:"%s",quietMode:%s){id}}' % (self._id, "true" if newMode else "false"), asyncio=False)
+        self._mutation(
+            'mutation($id:ID!,$quietMode:Boolean){updateUser(id:$id,quietMode:$quietMode){id}}', variables={"id": self._id, "quietMode": newMode}, asyncio=False)
 
     @property
     def address_line1(self):
         if self.client.asyncio:
             return self.loader.load("addressLine1")
         else:
-            return self.client.query('{user(id:"%s"){addressLine1}}' % self._id, keys=[
+            return self._query('query($id:ID!){user(id:$id){addressLine1}}', variables={"id": self._id}, keys=[
                 "user", "addressLine1"])
 
     @address_line1.setter
     def address_line1(self, newValue):
-        self.client.mutation(
-            'mutation{updateUser(id:"%s", addressLine1:"%s"){id}}' % (self._id, newValue), asyncio=False)
+        self._mutation(
+            'mutation($id:ID!,$addressLine1:String){updateUser(id:$id,addressLine1:$addressLine1){id}}', variables={"id": self._id, "addressLine1": newValue}, asyncio=False)
 
     @property
     def address_line2(self):
         if self.client.asyncio:
             return self.loader.load("addressLine2")
         else:
-            return self.client.query('{user(id:"%s"){addressLine2}}' % self._id, keys=[
+            return self._query('query($id:ID!){user(id:$id){addressLine2}}', variables={"id": self._id}, keys=[
                 "user", "addressLine2"])
 
     @address_line2.setter
     def address_line2(self, newValue):
-        self.client.mutation(
-            'mutation{updateUser(id:"%s", addressLine2:"%s"){id}}' % (self._id, newValue), asyncio=False)
+        self._mutation(
+            'mutation($id:ID!,$addressLine2:String){updateUser(id:$id,addressLine2:$addressLine2){id}}', variables={"id": self._id, "addressLine2": newValue}, asyncio=False)
 
     @property
     def address_postal_code(self):
         if self.client.asyncio:
             return self.loader.load("addressPostalCode")
         else:
-            return self.client.query('{user(id:"%s"){addressPostalCode}}' % self._id, keys=[
+            return self._query('query($id:ID!){user(id:$id){addressPostalCode}}', variables={"id": self._id}, keys=[
                 "user", "addressPostalCode"])
 
     @address_postal_code.setter
     def address_postal_code(self, newValue):
-        self.client.mutation(
-            'mutation{updateUser(id:"%s", addressPostalCode:"%s"){id}}' % (self._id, newValue), asyncio=False)
+        self._mutation(
+            'mutation($id:ID!,$addressPostalCode:String){updateUser(id:$id,addressPostalCode:$addressPostalCode){id}}', variables={"id": self._id, "addressPostalCode": newValue}, asyncio=False)
 
     @property
     def address_city(self):
         if self.client.asyncio:
             return self.loader.load("addressCity")
         else:
-            return self.client.query('{user(id:"%s"){addressCity}}' % self._id, keys=[
+            return self._query('query($id:ID!){user(id:$id){addressCity}}', variables={"id": self._id}, keys=[
                 "user", "addressCity"])
 
     @address_city.setter
     def address_city(self, newValue):
-        self.client.mutation(
-            'mutation{updateUser(id:"%s", addressCity:"%s"){id}}' % (self._id, newValue), asyncio=False)
+        self._mutation(
+            'mutation($id:ID!,$addressCity:String){updateUser(id:$id,addressCity:$addressCity){id}}', variables={"id": self._id, "addressCity": newValue}, asyncio=False)
 
     @property
     def address_state(self):
         if self.client.asyncio:
             return self.loader.load("addressState")
         else:
-            return self.client.query('{user(id:"%s"){addressState}}' % self._id, keys=[
+            return self._query('query($id:ID!){user(id:$id){addressState}}', variables={"id": self._id}, keys=[
                 "user", "addressState"])
 
     @address_state.setter
     def address_state(self, newValue):
-        self.client.mutation(
-            'mutation{updateUser(id:"%s", addressState:"%s"){id}}' % (self._id, newValue), asyncio=False)
+        self._mutation(
+            'mutation($id:ID!,$addressState:String){updateUser(id:$id,addressState:$addressState){id}}', variables={"id": self._id, "addressState": newValue}, asyncio=False)
 
     @property
     def address_country_or_territory(self):
         if self.client.asyncio:
             return self.loader.load("addressCountryOrTerritory")
         else:
-            return self.client.query('{user(id:"%s"){addressCountryOrTerritory}}' % self._id, keys=[
+            return self._query('query($id:ID!){user(id:$id){addressCountryOrTerritory}}', variables={"id": self._id}, keys=[
                 "user", "addressCountryOrTerritory"])
 
     @address_country_or_territory.setter
     def address_country_or_territory(self, newValue):
-        self.client.mutation(
-            'mutation{updateUser(id:"%s", addressCountryOrTerritory:"%s"){id}}' % (self._id, newValue), asyncio=False)
+        self._mutation(
+            'mutation($id:ID!,$addressCountryOrTerritory:String){updateUser(id:$id,addressCountryOrTerritory:$addressCountryOrTerritory){id}}', variables={"id": self._id, "addressCountryOrTerritory": newValue}, asyncio=False)
 
     @property
     def billing_plan(self):
         if self.client.asyncio:
             return self.loader.load("billingPlan")
         else:
-            return self.client.query('{user(id:"%s"){billingPlan}}' % self._id, keys=[
+            return self._query('query($id:ID!){user(id:$id){billingPlan}}', variables={"id": self._id}, keys=[
                 "user", "billingPlan"])
 
     @property
@@ -178,7 +182,7 @@ class User:
         if self.client.asyncio:
             return self.loader.load("billingCycle")
         else:
-            return self.client.query('{user(id:"%s"){billingCycle}}' % self._id, keys=[
+            return self._query('query($id:ID!){user(id:$id){billingCycle}}', variables={"id": self._id}, keys=[
                 "user", "billingCycle"])
 
     @property
@@ -186,7 +190,7 @@ class User:
         if self.client.asyncio:
             return self.loader.load("billingStatus")
         else:
-            return self.client.query('{user(id:"%s"){billingStatus}}' % self._id, keys=[
+            return self._query('query($id:ID!){user(id:$id){billingStatus}}', variables={"id": self._id}, keys=[
                 "user", "billingStatus"])
 
     @property
@@ -194,7 +198,7 @@ class User:
         if self.client.asyncio:
             return self.loader.load("paymentIntentSecret")
         else:
-            return self.client.query('{user(id:"%s"){paymentIntentSecret}}' % self._id, keys=[
+            return self._query('query($id:ID!){user(id:$id){paymentIntentSecret}}', variables={"id": self._id}, keys=[
                 "user", "paymentIntentSecret"])
 
     @property
@@ -202,7 +206,7 @@ class User:
         if self.client.asyncio:
             return self.loader.load("cardLast4Digits")
         else:
-            return self.client.query('{user(id:"%s"){cardLast4Digits}}' % self._id, keys=[
+            return self._query('query($id:ID!){user(id:$id){cardLast4Digits}}', variables={"id": self._id}, keys=[
                 "user", "cardLast4Digits"])
 
     @property
@@ -210,7 +214,7 @@ class User:
         if self.client.asyncio:
             return self.loader.load("cardExpiryMonth")
         else:
-            return self.client.query('{user(id:"%s"){cardExpiryMonth}}' % self._id, keys=[
+            return self._query('query($id:ID!){user(id:$id){cardExpiryMonth}}', variables={"id": self._id}, keys=[
                 "user", "cardExpiryMonth"])
 
     @property
@@ -218,7 +222,7 @@ class User:
         if self.client.asyncio:
             return self.loader.load("cardExpiryYear")
         else:
-            return self.client.query('{user(id:"%s"){cardExpiryYear}}' % self._id, keys=[
+            return self._query('query($id:ID!){user(id:$id){cardExpiryYear}}', variables={"id": self._id}, keys=[
                 "user", "cardExpiryYear"])
 
     @property
@@ -226,20 +230,20 @@ class User:
         if self.client.asyncio:
             return self.loader.load("vatNumber")
         else:
-            return self.client.query('{user(id:"%s"){vatNumber}}' % self._id, keys=[
+            return self._query('query($id:ID!){user(id:$id){vatNumber}}', variables={"id": self._id}, keys=[
                 "user", "vatNumber"])
 
     @vat_number.setter
     def vat_number(self, newValue):
-        self.client.mutation(
-            'mutation{updateUser(id:"%s", vatNumber:"%s"){id}}' % (self._id, newValue), asyncio=False)
+        self._mutation(
+            'mutation($id:ID!,$vatNumber:String){updateUser(id:$id,vatNumber:$vatNumber){id}}', variables={"id": self._id, "vatNumber": newValue}, asyncio=False)
 
     @property
     def vat_rate(self):
         if self.client.asyncio:
             return self.loader.load("vatRate")
         else:
-            return self.client.query('{user(id:"%s"){vatRate}}' % self._id, keys=[
+            return self._query('query($id:ID!){user(id:$id){vatRate}}', variables={"id": self._id}, keys=[
                 "user", "vatRate"])
 
     @property
@@ -247,7 +251,7 @@ class User:
         if self.client.asyncio:
             return self.loader.load("nextBillingDate")
         else:
-            return self.client.query('{user(id:"%s"){nextBillingDate}}' % self._id, keys=[
+            return self._query('query($id:ID!){user(id:$id){nextBillingDate}}', variables={"id": self._id}, keys=[
                 "user", "nextBillingDate"])
 
     @property
@@ -255,7 +259,7 @@ class User:
         if self.client.asyncio:
             return self.loader.load("billingCredit")
         else:
-            return self.client.query('{user(id:"%s"){billingCredit}}' % self._id, keys=[
+            return self._query('query($id:ID!){user(id:$id){billingCredit}}', variables={"id": self._id}, keys=[
                 "user", "billingCredit"])
 
     # @property
@@ -263,7 +267,7 @@ class User:
     #     if self.client.asyncio:
     #         return self.loader.load("extraStorage")
     #     else:
-    #         return self.client.query('{user(id:"%s"){extraStorage}}' % self._id, keys=[
+    #         return self._query('query($id:ID!){user(id:$id){extraStorage}}', variables={"id": self._id}, keys=[
     #             "user", "extraStorage"])
 
     # @property
@@ -271,7 +275,7 @@ class User:
     #     if self.client.asyncio:
     #         return self.loader.load("extraThroughput")
     #     else:
-    #         return self.client.query('{user(id:"%s"){extraThroughput}}' % self._id, keys=[
+    #         return self._query('query($id:ID!){user(id:$id){extraThroughput}}', variables={"id": self._id}, keys=[
     #             "user", "extraThroughput"])
 
     @property
@@ -279,7 +283,7 @@ class User:
         if self.client.asyncio:
             return self.loader.load("maxStorage")
         else:
-            return self.client.query('{user(id:"%s"){maxStorage}}' % self._id, keys=[
+            return self._query('query($id:ID!){user(id:$id){maxStorage}}', variables={"id": self._id}, keys=[
                 "user", "maxStorage"])
 
     @property
@@ -287,7 +291,7 @@ class User:
         if self.client.asyncio:
             return self.loader.load("maxThroughput")
         else:
-            return self.client.query('{user(id:"%s"){maxThroughput}}' % self._id, keys=[
+            return self._query('query($id:ID!){user(id:$id){maxThroughput}}', variables={"id": self._id}, keys=[
                 "user", "maxThroughput"])
 
     @property
@@ -295,7 +299,7 @@ class User:
         if self.client.asyncio:
             return self.loader.load("usedStorage")
         else:
-            return self.client.query('{user(id:"%s"){usedStorage}}' % self._id, keys=[
+            return self._query('query($id:ID!){user(id:$id){usedStorage}}', variables={"id": self._id}, keys=[
                 "user", "usedStorage"])
 
     @property
@@ -303,7 +307,7 @@ class User:
         if self.client.asyncio:
             return self.loader.load("usedThroughput")
         else:
-            return self.client.query('{user(id:"%s"){usedThroughput}}' % self._id, keys=[
+            return self._query('query($id:ID!){user(id:$id){usedThroughput}}', variables={"id": self._id}, keys=[
                 "user", "usedThroughput"])
 
     # @property
@@ -311,7 +315,7 @@ class User:
     #     if self.client.asyncio:
     #         return self.loader.load("customApps")
     #     else:
-    #         return self.client.query('{user(id:"%s"){customApps}}' % self._id, keys=[
+    #         return self._query('query($id:ID!){user(id:$id){customApps}}', variables={"id": self._id}, keys=[
     #             "user", "customApps"])
 
     @property
@@ -319,7 +323,7 @@ class User:
         if self.client.asyncio:
             return self.loader.load("emailIsVerified")
         else:
-            return self.client.query('{user(id:"%s"){emailIsVerified}}' % self._id, keys=[
+            return self._query('query($id:ID!){user(id:$id){emailIsVerified}}', variables={"id": self._id}, keys=[
                 "user", "emailIsVerified"])
 
     @property
@@ -327,7 +331,7 @@ class User:
         if self.client.asyncio:
             return self.loader.load("uniqueDeveloperFirmwares")
         else:
-            return self.client.query('{user(id:"%s"){uniqueDeveloperFirmwares}}' % self._id, keys=[
+            return self._query('query($id:ID!){user(id:$id){uniqueDeveloperFirmwares}}', variables={"id": self._id}, keys=[
                 "user", "uniqueDeveloperFirmwares"])
 
     @property
@@ -360,7 +364,7 @@ class User:
         if self.client.asyncio:
             return self.loader.load("totpEnabled")
         else:
-            return self.client.query('{user(id:"%s"){totpEnabled}}' % self._id, keys=[
+            return self._query('query($id:ID!){user(id:$id){totpEnabled}}', variables={"id": self._id}, keys=[
                 "user", "totpEnabled"])
 
     @property
@@ -368,87 +372,87 @@ class User:
         if self.client.asyncio:
             return self.loader.load("lengthAndMass")
         else:
-            return self.client.query('{user(id:"%s"){lengthAndMass}}' % self._id, keys=[
+            return self._query('query($id:ID!){user(id:$id){lengthAndMass}}', variables={"id": self._id}, keys=[
                 "user", "lengthAndMass"])
 
     @length_and_mass.setter
     def length_and_mass(self, newValue):
-        self.client.mutation(
-            'mutation{updateUser(id:"%s", lengthAndMass:%s){id}}' % (self._id, newValue), asyncio=False)
+        self._mutation(
+            'mutation($id:ID!,$lengthAndMass:LengthAndMass){updateUser(id:$id,lengthAndMass:$lengthAndMass){id}}', variables={"id": self._id, "lengthAndMass": newValue}, asyncio=False)
 
     @property
     def temperature(self):
         if self.client.asyncio:
             return self.loader.load("temperature")
         else:
-            return self.client.query('{user(id:"%s"){temperature}}' % self._id, keys=[
+            return self._query('query($id:ID!){user(id:$id){temperature}}', variables={"id": self._id}, keys=[
                 "user", "temperature"])
 
     @temperature.setter
     def temperature(self, newValue):
-        self.client.mutation(
-            'mutation{updateUser(id:"%s", temperature:%s){id}}' % (self._id, newValue), asyncio=False)
+        self._mutation(
+            'mutation($id:ID!,$temperature:Temperature){updateUser(id:$id,temperature:$temperature){id}}', variables={"id": self._id, "temperature": newValue}, asyncio=False)
 
     @property
     def time_format(self):
         if self.client.asyncio:
             return self.loader.load("timeFormat")
         else:
-            return self.client.query('{user(id:"%s"){timeFormat}}' % self._id, keys=[
+            return self._query('query($id:ID!){user(id:$id){timeFormat}}', variables={"id": self._id}, keys=[
                 "user", "timeFormat"])
 
     @time_format.setter
     def time_format(self, newValue):
-        self.client.mutation(
-            'mutation{updateUser(id:"%s", timeFormat:%s){id}}' % (self._id, newValue), asyncio=False)
+        self._mutation(
+            'mutation($id:ID!,$timeFormat:TimeFormat){updateUser(id:$id,timeFormat:$timeFormat){id}}', variables={"id": self._id, "timeFormat": newValue}, asyncio=False)
 
     @property
     def date_format(self):
         if self.client.asyncio:
             return self.loader.load("dateFormat")
         else:
-            return self.client.query('{user(id:"%s"){dateFormat}}' % self._id, keys=[
+            return self._query('query($id:ID!){user(id:$id){dateFormat}}', variables={"id": self._id}, keys=[
                 "user", "dateFormat"])
 
     @date_format.setter
     def date_format(self, newValue):
-        self.client.mutation(
-            'mutation{updateUser(id:"%s", dateFormat:%s){id}}' % (self._id, newValue), asyncio=False)
+        self._mutation(
+            'mutation($id:ID!,$dateFormat:DateFormat){updateUser(id:$id,dateFormat:$dateFormat){id}}', variables={"id": self._id, "dateFormat": newValue}, asyncio=False)
 
     @property
     def password_change_email(self):
         if self.client.asyncio:
             return self.loader.load("passwordChangeEmail")
         else:
-            return self.client.query('{user(id:"%s"){passwordChangeEmail}}' % self._id, keys=[
+            return self._query('query($id:ID!){user(id:$id){passwordChangeEmail}}', variables={"id": self._id}, keys=[
                 "user", "passwordChangeEmail"])
 
     @password_change_email.setter
     def password_change_email(self, newValue):
-        self.client.mutation(
-            'mutation{updateUser(id:"%s", passwordChangeEmail:%s){id}}' % (self._id, "true" if newValue == True else "false"), asyncio=False)
+        self._mutation(
+            'mutation($id:ID!,$passwordChangeEmail:Boolean){updateUser(id:$id,passwordChangeEmail:$passwordChangeEmail){id}}', variables={"id": self._id, "passwordChangeEmail": newValue}, asyncio=False)
 
     @property
     def access_token_created_email(self):
         if self.client.asyncio:
             return self.loader.load("accessTokenCreatedEmail")
         else:
-            return self.client.query('{user(id:"%s"){accessTokenCreatedEmail}}' % self._id, keys=[
+            return self._query('query($id:ID!){user(id:$id){accessTokenCreatedEmail}}', variables={"id": self._id}, keys=[
                 "user", "accessTokenCreatedEmail"])
 
     @access_token_created_email.setter
     def access_token_created_email(self, newValue):
-        self.client.mutation(
-            'mutation{updateUser(id:"%s", accessTokenCreatedEmail:%s){id}}' % (self._id, "true" if newValue == True else "false"), asyncio=False)
+        self._mutation(
+            'mutation($id:ID!,$accessTokenCreatedEmail:Boolean){updateUser(id:$id,accessTokenCreatedEmail:$accessTokenCreatedEmail){id}}', variables={"id": self._id, "accessTokenCreatedEmail": newValue}, asyncio=False)
 
     @property
     def business_pricing(self):
-        return self.client.query('{user(id:"%s"){businessPricing{id maxStorage maxThroughput price}}}' % self._id, keys=[
+        return self._query('query($id:ID!){user(id:$id){businessPricing{id maxStorage maxThroughput price}}}', variables={"id": self._id}, keys=[
             "user", "businessPricing"])
 
     @property
     def privacy_policy_accepted(self):
-        return self.client.query('{user(id:"%s"){privacyPolicyAccepted}}' % self._id, keys=[
+        return self._query('query($id:ID!){user(id:$id){privacyPolicyAccepted}}', variables={"id": self._id}, keys=[
             "user", "privacyPolicyAccepted"])
 
 
@@ -457,24 +461,30 @@ class EnvironmentEditorList:
         self.client = client
         self.environmentId = environmentId
         self.current = 0
+        self._page = []
+        self._prefetch = ()
+
+    def prefetch(self, *fields):
+        self._prefetch = prefetch_fields(self.client, (User,), fields)
+        return self
 
     def __len__(self):
         res = self.client.query(
-            '{environment(id:"%s"){editorCount}}' % self.environmentId)
+            'query($id:ID!){environment(id:$id){editorCount}}', variables={"id": self.environmentId})
         return res["environment"]["editorCount"]
 
     def __getitem__(self, i):
         if isinstance(i, int):
             res = self.client.query(
-                '{environment(id:"%s"){editors(limit:1, offset:%d){id}}}' % (self.environmentId, i))
+                'query($id:ID!,$offset:Int!){environment(id:$id){editors(limit:1,offset:$offset){id%s}}}' % prefetch_selection(self._prefetch), variables={"id": self.environmentId, "offset": i})
             if len(res["environment"]["editors"]) != 1:
                 raise IndexError()
-            return User(self.client, res["environment"]["editors"][0]["id"])
+            return prefetched(User(self.client, res["environment"]["editors"][0]["id"]), res["environment"]["editors"][0], self._prefetch)
         elif isinstance(i, slice):
             start, end, _ = i.indices(len(self))
             res = self.client.query(
-                '{environment(id:"%s"){editors(offset:%d, limit:%d){id}}}' % (self.environmentId, start, end-start))
-            return [User(self.client, user["id"]) for user in res["environment"]["editors"]]
+                'query($id:ID!,$offset:Int!,$limit:Int!){environment(id:$id){editors(offset:$offset,limit:$limit){id%s}}}' % prefetch_selection(self._prefetch), variables={"id": self.environmentId, "offset": start, "limit": end-start})
+            return [prefetched(User(self.client, user["id"]), user, self._prefetch) for user in res["environment"]["editors"]]
         else:
             raise TypeError("Unexpected type {} passed as index".format(i))
 
@@ -482,14 +492,16 @@ class EnvironmentEditorList:
         return self
 
     def __next__(self):
-        res = self.client.query(
-            '{environment(id:"%s"){editors(limit:1, offset:%d){id}}}' % (self.environmentId, self.current))
-
-        if len(res["environment", "editors"]) != 1:
-            raise StopIteration
+        if not self._page:
+            res = self.client.query(
+                'query($id:ID!,$offset:Int!,$limit:Int!){environment(id:$id){editors(limit:$limit,offset:$offset){id%s}}}' % prefetch_selection(self._prefetch), variables={"id": self.environmentId, "offset": self.current, "limit": PAGE_SIZE})
+            self._page = res["environment"]["editors"]
+            if not self._page:
+                raise StopIteration
 
         self.current += 1
-        return User(self.client, res["environment"]["editors"][0]["id"])
+        user = self._page.pop(0)
+        return prefetched(User(self.client, user["id"]), user, self._prefetch)
 
     def next(self):
         return self.__next__()
@@ -500,24 +512,30 @@ class EnvironmentViewerList:
         self.client = client
         self.environmentId = environmentId
         self.current = 0
+        self._page = []
+        self._prefetch = ()
+
+    def prefetch(self, *fields):
+        self._prefetch = prefetch_fields(self.client, (User,), fields)
+        return self
 
     def __len__(self):
         res = self.client.query(
-            '{environment(id:"%s"){viewerCount}}' % self.environmentId)
+            'query($id:ID!){environment(id:$id){viewerCount}}', variables={"id": self.environmentId})
         return res["environment"]["viewerCount"]
 
     def __getitem__(self, i):
         if isinstance(i, int):
             res = self.client.query(
-                '{environment(id:"%s"){viewers(limit:1, offset:%d){id}}}' % (self.environmentId, i))
+                'query($id:ID!,$offset:Int!){environment(id:$id){viewers(limit:1,offset:$offset){id%s}}}' % prefetch_selection(self._prefetch), variables={"id": self.environmentId, "offset": i})
             if len(res["environment"]["viewers"]) != 1:
                 raise IndexError()
-            return User(self.client, res["environment"]["viewers"][0]["id"])
+            return prefetched(User(self.client, res["environment"]["viewers"][0]["id"]), res["environment"]["viewers"][0], self._prefetch)
         elif isinstance(i, slice):
             start, end, _ = i.indices(len(self))
             res = self.client.query(
-                '{environment(id:"%s"){viewers(offset:%d, limit:%d){id}}}' % (self.environmentId, start, end-start))
-            return [User(self.client, user["id"]) for user in res["environment"]["viewers"]]
+                'query($id:ID!,$offset:Int!,$limit:Int!){environment(id:$id){viewers(offset:$offset,limit:$limit){id%s}}}' % prefetch_selection(self._prefetch), variables={"id": self.environmentId, "offset": start, "limit": end-start})
+            return [prefetched(User(self.client, user["id"]), user, self._prefetch) for user in res["environment"]["viewers"]]
         else:
             raise TypeError("Unexpected type {} passed as index".format(i))
 
@@ -525,14 +543,16 @@ class EnvironmentViewerList:
         return self
 
     def __next__(self):
-        res = self.client.query(
-            '{environment(id:"%s"){viewers(limit:1, offset:%d){id}}}' % (self.environmentId, self.current))
-
-        if len(res["environment", "viewers"]) != 1:
-            raise StopIteration
+        if not self._page:
+            res = self.client.query(
+                'query($id:ID!,$offset:Int!,$limit:Int!){environment(id:$id){viewers(limit:$limit,offset:$offset){id%s}}}' % prefetch_selection(self._prefetch), variables={"id": self.environmentId, "offset": self.current, "limit": PAGE_SIZE})
+            self._page = res["environment"]["viewers"]
+            if not self._page:
+                raise StopIteration
 
         self.current += 1
-        return User(self.client, res["environment"]["viewers"][0]["id"])
+        user = self._page.pop(0)
+        return prefetched(User(self.client, user["id"]), user, self._prefetch)
 
     def next(self):
         return self.__next__()
@@ -1,10 +1,341 @@
+import asyncio
+import contextvars
+import re
+from igloo.batching import BatchedResult
+from igloo.diagnostics import call_site
+from igloo.instrumentation import load_site
+from igloo.utils import get_from_dict
+from igloo.field_cache import field_name
+
+# set while fetch() reads a property only to learn what it selects
+_recording = contextvars.ContextVar("igloo_recording_selection", default=False)
+_own_field = re.compile(r'\(id:\$id\)\{(.*)\}\}$', re.S)
+_selections = {}
+_graphql_fields = {}
+# how many items iterating a list asks for at a time
+PAGE_SIZE = 100
+
+
+class _Selection(Exception):
+    def __init__(self, query):
+        super().__init__(query)
+        self.query = query
+
+
 async def _asyncWrapWith(res, wrapper_fn):
     result = await res
-    return wrapper_fn(result["id"])
+    return wrapper_fn(result)
 
 
 def wrapWith(res, wrapper_fn):
-    if isinstance(res, dict):
+    if isinstance(res, BatchedResult):
+        # inside client.batch() the object is built once the batch is sent
+        return res.then(wrapper_fn)
+    elif isinstance(res, dict):
         return wrapper_fn(res)
     else:
         return _asyncWrapWith(res, wrapper_fn)
+
+
+class _RecordingClient:
+    # what a property sees as its client while its selection is recorded
+    asyncio = False
+
+
+def _seed_nested(cache, value):
+    # objects selected with their id, e.g. variables{id __typename name},
+    # have their scalar fields and {id} relations cached too
+    if isinstance(value, list):
+        for item in value:
+            _seed_nested(cache, item)
+    elif isinstance(value, dict):
+        fields = {}
+        for key, field in value.items():
+            if isinstance(field, (dict, list)):
+                _seed_nested(cache, field)
+                if isinstance(field, dict) and "id" in field:
+                    fields[key + "{id}"] = {"id": field["id"]}
+            elif key not in ("id", "__typename"):
+                fields[key] = field
+
+        if value.get("id") is not None:
+            cache.update(value.get("__typename", ""), value["id"], fields)
+
+
+def prefetch_fields(client, models, fields):
+    # the selections list.prefetch(*fields) adds to the page query of a list
+    # of models; with several, like the variables of a thing, a field must
+    # select the same on those that have it
+    selections = []
+    for field in fields:
+        resolved = set()
+        error = None
+        for model in models:
+            try:
+                resolved.add(model._prefetch_selection(field))
+            except ValueError as e:
+                error = error or e
+        if not resolved:
+            raise error
+        elif len(resolved) != 1:
+            raise ValueError("{} selects different fields on {}".format(
+                field, ", ".join(model.__name__ for model in models)))
+        selections.append(resolved.pop())
+    return tuple(selections)
+
+
+def prefetch_selection(selections):
+    return "".join(" " + selection for selection in selections)
+
+
+def prefetched(obj, data, selections=None):
+    # the fields prefetched with an item of a list are read like fetched
+    # ones, until the item is looked up again. Without selections data is an
+    # item of a list prefetched with its parent, which cached it already
+    if obj is not None:
+        if selections is None:
+            fields = [key for key in data if key not in ("id", "__typename")]
+            if fields:
+                obj._snapshot = {key: data[key] for key in fields}
+        elif selections:
+            obj._seed(selections, data)
+    return obj
+
+
+def prefetched_items(items, typename, id):
+    # the items of a list that were prefetched with its parent, e.g. the
+    # values of a thing listed with prefetch("variables{name}"), or None;
+    # filtered lists and those prefetching fields of their own ask for theirs
+    if getattr(items, "_filter", None) or items._prefetch:
+        return None
+
+    identity_map = getattr(items.client, "identity_map", None)
+    for parent in identity_map.find(id) if identity_map is not None else ():
+        if type(parent).__name__ == typename and items._field in (parent._snapshot or {}):
+            return parent._snapshot[items._field]
+
+    cache = getattr(items.client, "field_cache", None)
+    if cache is None:
+        return None
+    hit, value = cache.find(typename, id, items._field)
+    return value if hit else None
+
+
+class _ModelType(type):
+    def __call__(cls, client, *args, **kwargs):
+        # Thing(client, id) returns the instance the client already has for
+        # that id, if any, so state like fetched fields is shared
+        identity_map = getattr(client, "identity_map", None)
+        if identity_map is None:
+            return super().__call__(client, *args, **kwargs)
+
+        id = args[0] if args else kwargs.get("id")
+        if id is not None:
+            obj = identity_map.get(cls.__name__, id)
+            if obj is not None:
+                # the snapshot and the DataLoader keep fields for the
+                # object's whole life, a new Thing(client, id) has to read
+                # them again
+                obj._forget()
+                return obj
+
+        obj = super().__call__(client, *args, **kwargs)
+        return identity_map.add(cls.__name__, obj._id, obj)
+
+
+class Model(metaclass=_ModelType):
+    # models read their own fields through _query and change them through
+    # _mutation, so fetch() can serve several properties from one query.
+    # Slotted (subclasses add empty __slots__), exports hold many of them
+    __slots__ = ("client", "_id", "_snapshot", "_loader", "__weakref__")
+    _root = None
+    _loader_class = None
+
+    def __new__(cls, *args, **kwargs):
+        # the subclasses' __init__ only set client and _id
+        obj = super().__new__(cls)
+        obj._snapshot = None
+        obj._loader = None
+        return obj
+
+    @property
+    def loader(self):
+        # only async reads use the DataLoader, so it is created on first use
+        # and again when the object outlives the loop it was bound to
+        loader = self._loader
+        loop = self.client.loader_loop
+        if loop is None:
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                pass
+
+        if loader is None or (loop is not None and loader.loop is not loop):
+            loader = self._loader = self._loader_class(self.client, self._id)
+
+        # the loader sends its query from the event loop, away from the
+        # code reading the field
+        if self.client.instrumentation:
+            load_site.set(call_site())
+        return loader
+
+    def _query(self, query, variables=None, keys=[], **kwargs):
+        if _recording.get():
+            raise _Selection(query)
+
+        snapshot = self._snapshot
+        if snapshot is not None and len(keys) > 1 and keys[1] in snapshot and not self.client.asyncio:
+            return get_from_dict(snapshot, keys[1:])
+
+        cache = getattr(self.client, "field_cache", None)
+        if cache is not None and len(keys) > 1 and variables is not None and list(variables) == ["id"] \
+                and self.client._reads_directly(kwargs.get("asyncio")):
+            match = _own_field.search(query)
+            if match is not None:
+                return self._cached_query(cache, match.group(1), query, variables, keys, kwargs)
+
+        return self.client.query(query, variables=variables, keys=keys, **kwargs)
+
+    def _cached_query(self, cache, selection, query, variables, keys, kwargs):
+        typename = type(self).__name__
+        hit, value = cache.get(typename, self._id, selection)
+        if not hit:
+            value = self.client.query(query, variables=variables, keys=keys[:2], **kwargs)
+            cache.set(typename, self._id, selection, value)
+
+        return get_from_dict({keys[1]: value}, keys[1:])
+
+    def _forget(self):
+        # the snapshot and the DataLoader can't tell which fields changed,
+        # the client's field cache can
+        self._snapshot = None
+        if self._loader is not None:
+            self._loader.clear_all()
+
+    def _mutation(self, query, variables=None, keys=[], **kwargs):
+        self._forget()
+        return self.client.mutation(query, variables=variables, keys=keys, **kwargs)
+
+    @classmethod
+    def _recorded(cls, field):
+        # what reading the property does: the selection it queries or, for
+        # Thing.variables and the like, the class of the list it returns;
+        # None if field isn't a property
+        key = (cls, field)
+        if key in _selections:
+            return _selections[key]
+
+        prop = getattr(cls, field, None)
+        if not isinstance(prop, property):
+            return None
+
+        recorder = cls.__new__(cls)
+        recorder.client = _RecordingClient
+        recorder._id = None
+        token = _recording.set(True)
+        try:
+            value = prop.fget(recorder)
+        except _Selection as e:
+            match = _own_field.search(e.query)
+            if match is None:
+                raise ValueError("{} can't be fetched with the other fields".format(field))
+            recorded = match.group(1)
+        else:
+            if getattr(value, "_field", None) is None:
+                raise ValueError("{} is not a field of {}".format(field, cls.__name__))
+            recorded = type(value)
+        finally:
+            _recording.reset(token)
+
+        _selections[key] = recorded
+        return recorded
+
+    @classmethod
+    def _selection(cls, field):
+        # the GraphQL selection behind a property, e.g. "environment{id}" for
+        # Thing.environment; anything that isn't a property is used as is
+        recorded = cls._recorded(field)
+        if recorded is None:
+            return field
+        if not isinstance(recorded, str):
+            raise ValueError("{} is a list, it can only be prefetched with its parent".format(field))
+        return recorded
+
+    @classmethod
+    def _property_of(cls, name):
+        # the property reading the GraphQL field name, e.g. developer_only
+        # for developerOnly
+        properties = _graphql_fields.get(cls)
+        if properties is None:
+            properties = {}
+            for attribute in dir(cls):
+                try:
+                    recorded = cls._recorded(attribute)
+                except Exception:
+                    continue
+                if isinstance(recorded, str):
+                    properties[field_name(recorded)] = attribute
+                elif recorded is not None:
+                    properties[recorded._field] = attribute
+            _graphql_fields[cls] = properties
+
+        return properties.get(name)
+
+    @classmethod
+    def _prefetch_selection(cls, field):
+        # field is a property, the GraphQL field of one or a nested path like
+        # variables{name} whose outer name is either
+        name, brace, rest = field.partition("{")
+        name = name.strip()
+        if not isinstance(getattr(cls, name, None), property):
+            name = cls._property_of(name) or name
+
+        recorded = cls._recorded(name)
+        if recorded is None:
+            raise ValueError("{} is not a field of {}".format(name, cls.__name__))
+        elif isinstance(recorded, str):
+            if not brace:
+                return recorded
+            # the objects nested in the field are cached by their id
+            return "%s{id %s" % (field_name(recorded), rest)
+        elif not brace:
+            raise ValueError("{} is a list, prefetch the fields of its items, e.g. {}{{id}}".format(name, name))
+
+        return "%s{%s %s" % (recorded._field, recorded._item_selection, rest)
+
+    def _seed(self, selections, values):
+        # values are what fetch's query, or a list prefetching fields,
+        # returned for the selections, the properties read them from the
+        # snapshot and objects nested in them end up in the field cache
+        snapshot = dict(self._snapshot or {})
+        for selection in selections:
+            snapshot[field_name(selection)] = values[field_name(selection)]
+        self._snapshot = snapshot
+
+        cache = getattr(self.client, "field_cache", None)
+        if cache is not None:
+            for selection in selections:
+                value = values[field_name(selection)]
+                cache.set(type(self).__name__, self._id, selection, value)
+                if isinstance(value, dict) and "id" in value:
+                    # what the property selects, e.g. environment{id}
+                    cache.set(type(self).__name__, self._id, field_name(selection) + "{id}", {"id": value["id"]})
+                _seed_nested(cache, value)
+
+    def fetch(self, *fields):
+        # reads all the fields in one query, the properties then return the
+        # fetched values until fetch is called again or a setter is used
+        if self.client.asyncio:
+            return self._fetch_async(fields)
+
+        selections = [self._selection(field) for field in fields]
+        res = self.client.query('query($id:ID!){%s(id:$id){%s}}' % (self._root, " ".join(selections)),
+                                variables={"id": self._id}, keys=[self._root])
+        self._seed(selections, res)
+        return self
+
+    async def _fetch_async(self, fields):
+        # the DataLoader already merges loads made together into one query
+        await asyncio.gather(*[getattr(self, field) if isinstance(getattr(type(self), field, None), property)
+                               else self.loader.load(field) for field in fields])
+        return self
@@ -4,7 +4,8 @@ from .boolean_variable import BooleanVariable
 from .string_variable import StringVariable
 from .float_series_variable import FloatSeriesVariable
 from .category_series_variable import CategorySeriesVariable
-from igloo.utils import get_representation
+from igloo.models.utils import prefetch_fields, prefetch_selection, prefetched, prefetched_items, PAGE_SIZE
+from igloo.utils import get_variable_value
 
 
 def Variable(client, id, resolveType):
@@ -23,33 +24,55 @@ def Variable(client, id, resolveType):
 
 
 class ThingVariablesList:
+    # the field of the thing it lists, a nested prefetch of it selects what
+    # Variable() needs of each item too
+    _field = "values"
+    _item_selection = "id __typename"
+
     def __init__(self, client, thingId):
         self.client = client
         self.thingId = thingId
         self.current = 0
-        self._filter = "{}"
+        self._page = []
+        self._prefetch = ()
+        self._filter = {}
+
+    def prefetch(self, *fields):
+        self._prefetch = prefetch_fields(self.client, (FloatVariable, FileVariable, BooleanVariable, StringVariable, FloatSeriesVariable, CategorySeriesVariable), fields)
+        return self
 
     def filter(self, _filter):
-        self._filter = get_representation(_filter)
+        self._filter = get_variable_value(_filter)
         return self
 
     def __len__(self):
+        items = prefetched_items(self, "Thing", self.thingId)
+        if items is not None:
+            return len(items)
+
         res = self.client.query(
-            '{thing(id:"%s"){valueCount(filter:%s)}}' % (self.thingId, self._filter))
+            'query($id:ID!,$filter:Json){thing(id:$id){valueCount(filter:$filter)}}', variables={"id": self.thingId, "filter": self._filter})
         return res["thing"]["valueCount"]
 
     def __getitem__(self, i):
+        items = prefetched_items(self, "Thing", self.thingId)
+        if items is not None:
+            # prefetched with the thing
+            if isinstance(i, slice):
+                return [prefetched(Variable(self.client, value["id"], value["__typename"]), value) for value in items[i]]
+            return prefetched(Variable(self.client, items[i]["id"], items[i]["__typename"]), items[i])
+
         if isinstance(i, int):
             res = self.client.query(
-                '{thing(id:"%s"){values(limit:1, offset:%d, filter:%s){id __typename}}}' % (self.thingId, i, self._filter))
+                'query($id:ID!,$offset:Int!,$filter:Json){thing(id:$id){values(limit:1,offset:$offset,filter:$filter){id __typename%s}}}' % prefetch_selection(self._prefetch), variables={"id": self.thingId, "offset": i, "filter": self._filter})
             if len(res["thing"]["values"]) != 1:
                 raise IndexError()
-            return Variable(self.client, res["thing"]["values"][0]["id"], res["thing"]["values"][0]["__typename"])
+            return prefetched(Variable(self.client, res["thing"]["values"][0]["id"], res["thing"]["values"][0]["__typename"]), res["thing"]["values"][0], self._prefetch)
         elif isinstance(i, slice):
             start, end, _ = i.indices(len(self))
             res = self.client.query(
-                '{thing(id:"%s"){values(offset:%d, limit:%d, filter:%s){id __typename}}}' % (self.thingId, start, end-start, self._filter))
-            return [Variable(self.client, value["id"], value["__typename"]) for value in res["thing"]["values"]]
+                'query($id:ID!,$offset:Int!,$limit:Int!,$filter:Json){thing(id:$id){values(offset:$offset,limit:$limit,filter:$filter){id __typename%s}}}' % prefetch_selection(self._prefetch), variables={"id": self.thingId, "offset": start, "limit": end-start, "filter": self._filter})
+            return [prefetched(Variable(self.client, value["id"], value["__typename"]), value, self._prefetch) for value in res["thing"]["values"]]
         else:
             raise TypeError("Unexpected type {} passed as index".format(i))
 
@@ -57,14 +80,23 @@ class ThingVariablesList:
         return self
 
     def __next__(self):
-        res = self.client.query(
-            '{thing(id:"%s"){values(limit:1, offset:%d, filter:%s){id __typename}}}' % (self.thingId, self.current, self._filter))
+        items = prefetched_items(self, "Thing", self.thingId)
+        if items is not None:
+            if self.current >= len(items):
+                raise StopIteration
+            self.current += 1
+            return prefetched(Variable(self.client, items[self.current - 1]["id"], items[self.current - 1]["__typename"]), items[self.current - 1])
 
-        if len(res["thing", "values"]) != 1:
-            raise StopIteration
+        if not self._page:
+            res = self.client.query(
+                'query($id:ID!,$offset:Int!,$limit:Int!,$filter:Json){thing(id:$id){values(limit:$limit,offset:$offset,filter:$filter){id __typename%s}}}' % prefetch_selection(self._prefetch), variables={"id": self.thingId, "offset": self.current, "limit": PAGE_SIZE, "filter": self._filter})
+            self._page = res["thing"]["values"]
+            if not self._page:
+                raise StopIteration
 
         self.current += 1
-        return Variable(self.client, res["thing"]["values"][0]["id"], res["thing"]["values"][0]["__typename"])
+        value = self._page.pop(0)
+        return prefetched(Variable(self.client, value["id"], value["__typename"]), value, self._prefetch)
 
     def next(self):
         return self.__next__()
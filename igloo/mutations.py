@@ -14,7 +14,7 @@ from igloo.models.category_series_variable import CategorySeriesVariable
 from igloo.models.category_series_node import CategorySeriesNode
 from igloo.models.file_variable import FileVariable
 from igloo.models.float_series_node import FloatSeriesNode
-from igloo.utils import parse_arg, undefined
+from igloo.utils import parse_variables, undefined
 
 
 async def _asyncWrapWith(res, wrapper_fn):
@@ -41,10 +41,7 @@ class MutationRoot:
         self.client = client
 
     def sendConfirmationEmail(self, email, operation):
-        email_arg = parse_arg("email", email)
-        operation_arg = parse_arg("operation", operation, is_enum=True)
-
-        return self.client.mutation('mutation{sendConfirmationEmail(%s%s)}' % (email_arg, operation_arg))["sendConfirmationEmail"]
+        return self.client.mutation('mutation($email:String!,$operation:Operation!){sendConfirmationEmail(email:$email,operation:$operation)}', variables=parse_variables(email=email, operation=operation))["sendConfirmationEmail"]
 
     async def _wrapLogIn(self, res):
         resDict = await res
@@ -52,15 +49,7 @@ class MutationRoot:
         return resDict
 
     def log_in(self, email, password, totp=undefined, private_cloud=undefined):
-        email_arg = parse_arg("email", email)
-        password_arg = parse_arg("password", password)
-        totp_arg = parse_arg("totp", totp)
-        privateCloud_arg = parse_arg("privateCloud", private_cloud)
-
-        res = self.client.mutation('mutation{logIn(%s%s%s%s){user{id} token}}' % (email_arg,
-                                                                                  password_arg,
-                                                                                  totp_arg,
-                                                                                  privateCloud_arg))["logIn"]
+        res = self.client.mutation('mutation($email:String!,$password:String!,$totp:String,$privateCloud:String){logIn(email:$email,password:$password,totp:$totp,privateCloud:$privateCloud){user{id} token}}', variables=parse_variables(email=email, password=password, totp=totp, privateCloud=private_cloud))["logIn"]
 
         if isinstance(res, dict):
             self.client.set_token(res["token"])
@@ -70,21 +59,13 @@ class MutationRoot:
             return self._wrapLogIn(res)
 
     def create_access_token(self, name, password):
-        name_arg = parse_arg("name", name)
-        password_arg = parse_arg("password", password)
-        return self.client.mutation('mutation{createAccessToken(%s%s)}' % (name_arg, password_arg))["createAccessToken"]
+        return self.client.mutation('mutation($name:String!,$password:String!){createAccessToken(name:$name,password:$password)}', variables=parse_variables(name=name, password=password))["createAccessToken"]
 
     def regenerate_access_token(self, id, password):
-        id_arg = parse_arg("id", id)
-        password_arg = parse_arg("password", password)
-
-        return self.client.mutation('mutation{regenerateAccessToken(%s%s)}' % (id_arg, password_arg))["regenerateAccessToken"]
+        return self.client.mutation('mutation($id:ID!,$password:String!){regenerateAccessToken(id:$id,password:$password)}', variables=parse_variables(id=id, password=password))["regenerateAccessToken"]
 
     def delete_access_token(self, id, password):
-        id_arg = parse_arg("id", id)
-        password_arg = parse_arg("password", password)
-
-        return self.client.mutation('mutation{deleteAccessToken(%s%s)}' % (id_arg, password_arg))["deleteAccessToken"]
+        return self.client.mutation('mutation($id:ID!,$password:String!){deleteAccessToken(id:$id,password:$password)}', variables=parse_variables(id=id, password=password))["deleteAccessToken"]
 
     async def _wrapSignUp(self, res):
         result = await res
@@ -93,19 +74,7 @@ class MutationRoot:
         return result
 
     def sign_up(self, email, name, password, accept_privacy_policy, private_cloud=undefined):
-        email_arg = parse_arg("email", email)
-        name_arg = parse_arg("name", name)
-        password_arg = parse_arg("password", password)
-        privateCloud_arg = parse_arg("privateCloud", private_cloud)
-        acceptPrivacyPolicy_arg = parse_arg(
-            "acceptPrivacyPolicy", accept_privacy_policy)
-
-        res = self.client.mutation('mutation{signUp(%s%s%s%s%s){user{id} token}}' % (
-            email_arg,
-            name_arg,
-            password_arg,
-            privateCloud_arg,
-            acceptPrivacyPolicy_arg))["signUp"]
+        res = self.client.mutation('mutation($email:String!,$name:String!,$password:String!,$privateCloud:String,$acceptPrivacyPolicy:Boolean!){signUp(email:$email,name:$name,password:$password,privateCloud:$privateCloud,acceptPrivacyPolicy:$acceptPrivacyPolicy){user{id} token}}', variables=parse_variables(email=email, name=name, password=password, privateCloud=private_cloud, acceptPrivacyPolicy=accept_privacy_policy))["signUp"]
 
         if isinstance(res, dict):
             res["user"] = User(self.client, res["user"]["id"])
@@ -114,35 +83,31 @@ class MutationRoot:
             return self._wrapSignUp(res)
 
     def accept_legal_documents(self, privacy_policy=undefined):
-        privacy_policy_arg = parse_arg(
-            "privacyPolicy", privacy_policy)
-        res = self.client.mutation("mutation{acceptLegalDocuments(%s) }" % privacy_policy_arg)[
+        res = self.client.mutation('mutation($privacyPolicy:Boolean){acceptLegalDocuments(privacyPolicy:$privacyPolicy)}', variables=parse_variables(privacyPolicy=privacy_policy))[
             "acceptLegalDocuments"]
 
         return res
 
     def initiate_billing_setup(self):
-        res = self.client.mutation("mutation{initiateBillingSetup }")[
+        res = self.client.mutation('mutation{initiateBillingSetup}')[
             "initiateBillingSetup"]
 
         return res
 
     def update_payment_method(self, stripe_payment_method):
-        stripePaymentMethod_arg = parse_arg(
-            "stripePaymentMethod", stripe_payment_method)
-        res = self.client.mutation("mutation{updatePaymentMethod(%s) }" % stripePaymentMethod_arg)[
+        res = self.client.mutation('mutation($stripePaymentMethod:String!){updatePaymentMethod(stripePaymentMethod:$stripePaymentMethod)}', variables=parse_variables(stripePaymentMethod=stripe_payment_method))[
             "updatePaymentMethod"]
 
         return res
 
     def confirm_payment_execution(self):
-        res = self.client.mutation("mutation{confirmPaymentExecution }")[
+        res = self.client.mutation('mutation{confirmPaymentExecution}')[
             "confirmPaymentExecution"]
 
         return res
 
     def retry_payment(self):
-        res = self.client.mutation("mutation{retryPayment }")[
+        res = self.client.mutation('mutation{retryPayment}')[
             "retryPayment"]
 
         return res
@@ -167,51 +132,31 @@ class MutationRoot:
     #     return res
 
     def change_password(self, new_password, old_password):
-        new_password_arg = parse_arg("newPassword", new_password)
-        old_password_arg = parse_arg("oldPassword", old_password)
-
         res = self.client.mutation(
-            'mutation{changePassword(%s%s)}' % (new_password_arg, old_password_arg))["changePassword"]
+            'mutation($newPassword:String!,$oldPassword:String!){changePassword(newPassword:$newPassword,oldPassword:$oldPassword)}', variables=parse_variables(newPassword=new_password, oldPassword=old_password))["changePassword"]
 
         return res
 
     def set_totp(self, totp, secret, password):
-        totp_arg = parse_arg("totp", totp)
-        secret_arg = parse_arg("secret", secret)
-        password_arg = parse_arg("password", password)
-        return self.client.mutation('mutation{setTotp(%s%s%s)}' % (totp_arg, secret_arg, password_arg))["setTotp"]
+        return self.client.mutation('mutation($totp:String!,$secret:String!,$password:String!){setTotp(totp:$totp,secret:$secret,password:$password)}', variables=parse_variables(totp=totp, secret=secret, password=password))["setTotp"]
 
     def disable_totp(self, password):
-        password_arg = parse_arg("password", password)
-        return self.client.mutation('mutation{disableTotp(%s%s%s)}' % password_arg)["disableTotp"]
+        return self.client.mutation('mutation($password:String!){disableTotp(password:$password)}', variables=parse_variables(password=password))["disableTotp"]
 
     def send_disable_totp_email(self, email, redirect_to):
-        email_arg = parse_arg("email", email)
-        redirect_to_arg = parse_arg("redirectTo", redirect_to, is_enum=True)
-        return self.client.mutation('mutation{sendDisableTotpEmail(%s%s)}' % (email_arg, redirect_to_arg))["sendDisableTotpEmail"]
+        return self.client.mutation('mutation($email:String!,$redirectTo:RedirectTo!){sendDisableTotpEmail(email:$email,redirectTo:$redirectTo)}', variables=parse_variables(email=email, redirectTo=redirect_to))["sendDisableTotpEmail"]
 
     def send_verification_email(self, redirect_to):
-        redirect_to_arg = parse_arg("redirectTo", redirect_to, is_enum=True)
-
-        return self.client.mutation('mutation{sendVerificationEmail(%s)}' % (redirect_to_arg))["sendVerificationEmail"]
+        return self.client.mutation('mutation($redirectTo:RedirectTo!){sendVerificationEmail(redirectTo:$redirectTo)}', variables=parse_variables(redirectTo=redirect_to))["sendVerificationEmail"]
 
     def send_password_recovery_email(self, email, redirect_to):
-        email_arg = parse_arg("email", email)
-        redirect_to_arg = parse_arg("redirectTo", redirect_to, is_enum=True)
-        return self.client.mutation('mutation{sendPasswordRecoveryEmail(%s%s)}' % (email_arg, redirect_to_arg))["sendPasswordRecoveryEmail"]
+        return self.client.mutation('mutation($email:String!,$redirectTo:RedirectTo!){sendPasswordRecoveryEmail(email:$email,redirectTo:$redirectTo)}', variables=parse_variables(email=email, redirectTo=redirect_to))["sendPasswordRecoveryEmail"]
 
     def reset_password(self, recovery_token, new_password):
-        recovery_token_arg = parse_arg("recoveryToken", recovery_token)
-        new_password_arg = parse_arg("newPassword", new_password)
-        return self.client.mutation('mutation{resetPassword(%s%s)}' % (recovery_token_arg, new_password_arg))["resetPassword"]
+        return self.client.mutation('mutation($recoveryToken:String!,$newPassword:String!){resetPassword(recoveryToken:$recoveryToken,newPassword:$newPassword)}', variables=parse_variables(recoveryToken=recovery_token, newPassword=new_password))["resetPassword"]
 
     def share_environment(self, environment_id, role, email=undefined, user_id=undefined):
-        environmentId_arg = parse_arg("environmentId", environment_id)
-        role_arg = parse_arg("role", role, is_enum=True)
-        email_arg = parse_arg("email", email)
-        userId_arg = parse_arg("userId", user_id)
-        res = self.client.mutation('mutation{shareEnvironment(%s%s%s%s){id}}' % (
-            environmentId_arg, email_arg, userId_arg, role_arg))["shareEnvironment"]
+        res = self.client.mutation('mutation($environmentId:ID!,$email:String,$userId:ID,$role:Role!){shareEnvironment(environmentId:$environmentId,email:$email,userId:$userId,role:$role){id}}', variables=parse_variables(environmentId=environment_id, email=email, userId=user_id, role=role))["shareEnvironment"]
 
         def wrapper(id):
             return PendingShare(self.client, id)
@@ -219,11 +164,7 @@ class MutationRoot:
         return wrapById(res, wrapper)
 
     def pending_share(self, id, role):
-        id_arg = parse_arg("id", id)
-        role_arg = parse_arg("role", role, is_enum=True)
-
-        res = self.client.mutation('mutation{pendingShare(%s%s){id}}' % (
-            id_arg, role_arg))["pendingShare"]
+        res = self.client.mutation('mutation($id:ID!,$role:Role!){pendingShare(id:$id,role:$role){id}}', variables=parse_variables(id=id, role=role))["pendingShare"]
 
         def wrapper(id):
             return PendingShare(self.client, id)
@@ -231,17 +172,10 @@ class MutationRoot:
         return wrapById(res, wrapper)
 
     def revoke_pending_share(self, id):
-        id_arg = parse_arg(
-            "id", id)
-
-        return self.client.mutation('mutation{revokePendingShare(%s)}' % (id_arg))["revokePendingShare"]
+        return self.client.mutation('mutation($id:ID!){revokePendingShare(id:$id)}', variables=parse_variables(id=id))["revokePendingShare"]
 
     def accept_pending_share(self, id):
-        id_arg = parse_arg(
-            "pendingShareId", id)
-
-        res = self.client.mutation('mutation{acceptPendingShare(%s){sender{id} recipient{id} role environment{id}}}' % (
-            id_arg))["acceptPendingShare"]
+        res = self.client.mutation('mutation($pendingShareId:ID!){acceptPendingShare(pendingShareId:$pendingShareId){sender{id} recipient{id} role environment{id}}}', variables=parse_variables(pendingShareId=id))["acceptPendingShare"]
 
         def wrapper(res):
             res["sender"] = User(self.client, res["sender"]["id"])
@@ -254,17 +188,10 @@ class MutationRoot:
         return wrapWith(res, wrapper)
 
     def decline_pending_share(self, id):
-        id_arg = parse_arg(
-            "id", id)
-
-        return self.client.mutation('mutation{declinePendingShare(%s)}' % (id_arg))["declinePendingShare"]
+        return self.client.mutation('mutation($id:ID!){declinePendingShare(id:$id)}', variables=parse_variables(id=id))["declinePendingShare"]
 
     def stop_sharing_environment(self, environment_id, email=undefined, user_id=undefined):
-        environmentId_arg = parse_arg("environmentId", environment_id)
-        email_arg = parse_arg("email", email)
-        userId_arg = parse_arg("userId", user_id)
-        res = self.client.mutation('mutation{stopSharingEnvironment(%s%s%s){id}}' % (
-            environmentId_arg, email_arg, userId_arg))["stopSharingEnvironment"]
+        res = self.client.mutation('mutation($environmentId:ID!,$email:String,$userId:ID){stopSharingEnvironment(environmentId:$environmentId,email:$email,userId:$userId){id}}', variables=parse_variables(environmentId=environment_id, email=email, userId=user_id))["stopSharingEnvironment"]
 
         def wrapper(id):
             return Environment(self.client, id)
@@ -272,16 +199,10 @@ class MutationRoot:
         return wrapById(res, wrapper)
 
     def leave_environment(self, id):
-        id_arg = parse_arg("id", id)
-
-        return self.client.mutation('mutation{leaveEnvironment(%s)}' % (id_arg))["leaveEnvironment"]
+        return self.client.mutation('mutation($id:ID!){leaveEnvironment(id:$id)}', variables=parse_variables(id=id))["leaveEnvironment"]
 
     def transfer_environment(self, environment_id, email=undefined, user_id=undefined):
-        environmentId_arg = parse_arg("environmentId", environment_id)
-        email_arg = parse_arg("email", email)
-        userId_arg = parse_arg("userId", user_id)
-        res = self.client.mutation('mutation{transferEnvironment(%s%s%s){id}}' % (
-            environmentId_arg, email_arg, userId_arg))["transferEnvironment"]
+        res = self.client.mutation('mutation($environmentId:ID!,$email:String,$userId:ID){transferEnvironment(environmentId:$environmentId,email:$email,userId:$userId){id}}', variables=parse_variables(environmentId=environment_id, email=email, userId=user_id))["transferEnvironment"]
 
         def wrapper(id):
             return PendingTransfer(self.client, id)
@@ -289,17 +210,10 @@ class MutationRoot:
         return wrapById(res, wrapper)
 
     def revoke_pending_transfer(self, id):
-        id_arg = parse_arg(
-            "id", id)
-
-        return self.client.mutation('mutation{revokePendingTransfer(%s)}' % (id_arg))["revokePendingTransfer"]
+        return self.client.mutation('mutation($id:ID!){revokePendingTransfer(id:$id)}', variables=parse_variables(id=id))["revokePendingTransfer"]
 
     def accept_pending_transfer(self, id):
-        id_arg = parse_arg(
-            "id", id)
-
-        res = self.client.mutation('mutation{acceptPendingTransfer(%s){id sender{id} recipient{id} environment{id}}}' % (
-            id_arg))["acceptPendingTransfer"]
+        res = self.client.mutation('mutation($id:ID!){acceptPendingTransfer(id:$id){id sender{id} recipient{id} environment{id}}}', variables=parse_variables(id=id))["acceptPendingTransfer"]
 
         def wrapper(res):
             res["sender"] = User(self.client, res["sender"]["id"])
@@ -312,19 +226,10 @@ class MutationRoot:
         return wrapWith(res, wrapper)
 
     def decline_pending_transfer(self, id):
-        id_arg = parse_arg(
-            "id", id)
-
-        return self.client.mutation('mutation{declinePendingTransfer(%s)}' % (id_arg))["declinePendingTransfer"]
+        return self.client.mutation('mutation($id:ID!){declinePendingTransfer(id:$id)}', variables=parse_variables(id=id))["declinePendingTransfer"]
 
     def change_role(self, environment_id, new_role, email=undefined, user_id=undefined):
-        environmentId_arg = parse_arg("environmentId", environment_id)
-        email_arg = parse_arg("email", email)
-        user_id_arg = parse_arg("userId", user_id)
-        newRole_arg = parse_arg("newRole", new_role)
-
-        res = self.client.mutation('mutation{changeRole(%s%s%s%s){id}}' % (
-            environmentId_arg, newRole_arg, user_id_arg, email_arg))["changeRole"]
+        res = self.client.mutation('mutation($environmentId:ID!,$newRole:Role!,$userId:ID,$email:String){changeRole(environmentId:$environmentId,newRole:$newRole,userId:$userId,email:$email){id}}', variables=parse_variables(environmentId=environment_id, newRole=new_role, userId=user_id, email=email))["changeRole"]
 
         def wrapper(id):
             return Environment(self.client, id)
@@ -332,12 +237,7 @@ class MutationRoot:
         return wrapById(res, wrapper)
 
     def create_environment(self, name, picture=undefined, index=undefined, muted=undefined):
-        name_arg = parse_arg("name", name)
-        picture_arg = parse_arg("picture", picture, is_enum=True)
-        index_arg = parse_arg("index", index)
-        muted_arg = parse_arg("muted", muted)
-        res = self.client.mutation('mutation{createEnvironment(%s%s%s%s){id}}' % (
-            name_arg, picture_arg, index_arg, muted_arg))["createEnvironment"]
+        res = self.client.mutation('mutation($name:String!,$picture:EnvironmentPicture,$index:Int,$muted:Boolean){createEnvironment(name:$name,picture:$picture,index:$index,muted:$muted){id}}', variables=parse_variables(name=name, picture=picture, index=index, muted=muted))["createEnvironment"]
 
         def wrapper(id):
             return Environment(self.client, id)
@@ -345,12 +245,7 @@ class MutationRoot:
         return wrapById(res, wrapper)
 
     def create_thing(self, type, firmware=undefined, stored_notifications=undefined):
-        type_arg = parse_arg("type", type)
-        firmware_arg = parse_arg("firmware", firmware)
-        stored_notifications_arg = parse_arg(
-            "storedNotifications", stored_notifications)
-        res = self.client.mutation('mutation{createThing(%s%s%s){id}}' % (
-            type_arg, firmware_arg, stored_notifications_arg))["createThing"]
+        res = self.client.mutation('mutation($type:String!,$firmware:String,$storedNotifications:Int){createThing(type:$type,firmware:$firmware,storedNotifications:$storedNotifications){id}}', variables=parse_variables(type=type, firmware=firmware, storedNotifications=stored_notifications))["createThing"]
 
         # FIXME: if we choose to keep the createThingPayload implement it here
         def wrapper(id):
@@ -359,12 +254,7 @@ class MutationRoot:
         return wrapById(res, wrapper)
 
     def pair_thing(self, pair_code, name, environment_id, index=undefined):
-        pairCode_arg = parse_arg("pairCode", pair_code)
-        name_arg = parse_arg("name", name)
-        environmentId_arg = parse_arg("environmentId", environment_id)
-        index_arg = parse_arg("index", index)
-        res = self.client.mutation('mutation{pairThing(%s%s%s%s){id}}' % (
-            pairCode_arg, name_arg, index_arg, environmentId_arg))["pairThing"]
+        res = self.client.mutation('mutation($pairCode:String!,$name:String!,$index:Int,$environmentId:ID!){pairThing(pairCode:$pairCode,name:$name,index:$index,environmentId:$environmentId){id}}', variables=parse_variables(pairCode=pair_code, name=name, index=index, environmentId=environment_id))["pairThing"]
 
         def wrapper(id):
             return Thing(self.client, id)
@@ -372,11 +262,7 @@ class MutationRoot:
         return wrapById(res, wrapper)
 
     def create_notification(self, thing_id, content, timestamp=undefined):
-        thingId_arg = parse_arg("thingId", thing_id)
-        content_arg = parse_arg("content", content)
-        timestamp_arg = parse_arg("timestamp", timestamp)
-        res = self.client.mutation('mutation{createNotification(%s%s%s){id}}' % (
-            thingId_arg, content_arg, timestamp_arg))["createNotification"]
+        res = self.client.mutation('mutation($thingId:ID!,$content:String!,$timestamp:DateTime){createNotification(thingId:$thingId,content:$content,timestamp:$timestamp){id}}', variables=parse_variables(thingId=thing_id, content=content, timestamp=timestamp))["createNotification"]
 
         def wrapper(id):
             return Notification(self.client, id)
@@ -384,22 +270,7 @@ class MutationRoot:
         return wrapById(res, wrapper)
 
     def create_float_variable(self, user_permission, name, thing_id=undefined, developer_only=undefined, allowed_values=undefined, unit_of_measurement=undefined, value=undefined, precision=undefined, min=undefined, max=undefined, index=undefined):
-        thingId_arg = parse_arg("thingId", thing_id)
-        user_permission_arg = parse_arg(
-            "userPermission", user_permission, is_enum=True)
-        name_arg = parse_arg("name", name)
-        developer_only_arg = parse_arg("developerOnly", developer_only)
-        allowed_values_arg = parse_arg("hidden", allowed_values)
-        unitOfMeasurement_arg = parse_arg(
-            "unitOfMeasurement", unit_of_measurement)
-        value_arg = parse_arg("value", value)
-        precision_arg = parse_arg("precision", precision)
-        min_arg = parse_arg("min", min)
-        max_arg = parse_arg("max", max)
-
-        index_arg = parse_arg("index", index)
-        res = self.client.mutation('mutation{createFloatVariable(%s%s%s%s%s%s%s%s%s%s%s){id}}' % (thingId_arg, user_permission_arg, allowed_values_arg, developer_only_arg,
-                                                                                                  unitOfMeasurement_arg, value_arg, precision_arg, min_arg, max_arg, name_arg, index_arg))["createFloatVariable"]
+        res = self.client.mutation('mutation($thingId:ID,$userPermission:Permission!,$allowedValues:[Float!],$developerOnly:Boolean,$unitOfMeasurement:String,$value:Float,$precision:Int,$min:Float,$max:Float,$name:String!,$index:Int){createFloatVariable(thingId:$thingId,userPermission:$userPermission,allowedValues:$allowedValues,developerOnly:$developerOnly,unitOfMeasurement:$unitOfMeasurement,value:$value,precision:$precision,min:$min,max:$max,name:$name,index:$index){id}}', variables=parse_variables(thingId=thing_id, userPermission=user_permission, allowedValues=allowed_values, developerOnly=developer_only, unitOfMeasurement=unit_of_measurement, value=value, precision=precision, min=min, max=max, name=name, index=index))["createFloatVariable"]
 
         def wrapper(id):
             return FloatVariable(self.client, id)
@@ -407,18 +278,7 @@ class MutationRoot:
         return wrapById(res, wrapper)
 
     def create_string_variable(self, user_permission, name, thing_id=undefined, developer_only=undefined, value=undefined, max_characters=undefined, allowed_values=undefined, index=undefined):
-        thingId_arg = parse_arg("thingId", thing_id)
-        user_permission_arg = parse_arg(
-            "userPermission", user_permission, is_enum=True)
-        name_arg = parse_arg("name", name)
-        developer_only_arg = parse_arg("developerOnly", developer_only)
-        value_arg = parse_arg("value", value)
-        maxChars_arg = parse_arg("maxChars", max_characters)
-
-        allowedValues_arg = parse_arg("allowedValues", allowed_values)
-        index_arg = parse_arg("index", index)
-        res = self.client.mutation('mutation{createStringVariable(%s%s%s%s%s%s%s%s){id}}' % (
-            thingId_arg, user_permission_arg, developer_only_arg, value_arg, maxChars_arg, name_arg, allowedValues_arg, index_arg))["createStringVariable"]
+        res = self.client.mutation('mutation($thingId:ID,$userPermission:Permission!,$developerOnly:Boolean,$value:String,$maxChars:Int,$name:String!,$allowedValues:[String!],$index:Int){createStringVariable(thingId:$thingId,userPermission:$userPermission,developerOnly:$developerOnly,value:$value,maxChars:$maxChars,name:$name,allowedValues:$allowedValues,index:$index){id}}', variables=parse_variables(thingId=thing_id, userPermission=user_permission, developerOnly=developer_only, value=value, maxChars=max_characters, name=name, allowedValues=allowed_values, index=index))["createStringVariable"]
 
         def wrapper(id):
             return StringVariable(self.client, id)
@@ -426,16 +286,7 @@ class MutationRoot:
         return wrapById(res, wrapper)
 
     def create_boolean_variable(self, user_permission, name, thing_id=undefined, developer_only=undefined,  value=undefined, index=undefined):
-        thingId_arg = parse_arg("thingId", thing_id)
-        user_permission_arg = parse_arg(
-            "userPermission", user_permission, is_enum=True)
-        name_arg = parse_arg("name", name)
-        developer_only_arg = parse_arg("developerOnly", developer_only)
-        value_arg = parse_arg("value", value)
-
-        index_arg = parse_arg("index", index)
-        res = self.client.mutation('mutation{createBooleanVariable(%s%s%s%s%s%s){id}}' % (
-            thingId_arg, user_permission_arg, developer_only_arg, value_arg, name_arg, index_arg))["createBooleanVariable"]
+        res = self.client.mutation('mutation($thingId:ID,$userPermission:Permission!,$developerOnly:Boolean,$value:Boolean,$name:String!,$index:Int){createBooleanVariable(thingId:$thingId,userPermission:$userPermission,developerOnly:$developerOnly,value:$value,name:$name,index:$index){id}}', variables=parse_variables(thingId=thing_id, userPermission=user_permission, developerOnly=developer_only, value=value, name=name, index=index))["createBooleanVariable"]
 
         def wrapper(id):
             return BooleanVariable(self.client, id)
@@ -443,20 +294,7 @@ class MutationRoot:
         return wrapById(res, wrapper)
 
     def create_float_series_variable(self, name, shown_nodes=undefined, thing_id=undefined, developer_only=undefined, unit_of_measurement=undefined, precision=undefined, min=undefined, max=undefined, index=undefined, stored_nodes=undefined):
-        thingId_arg = parse_arg("thingId", thing_id)
-        name_arg = parse_arg("name", name)
-        developer_only_arg = parse_arg("private", developer_only)
-        unitOfMeasurement_arg = parse_arg(
-            "unitOfMeasurement", unit_of_measurement)
-        precision_arg = parse_arg("precision", precision)
-        min_arg = parse_arg("min", min)
-        max_arg = parse_arg("max", max)
-        shown_nodes_arg = parse_arg("max", shown_nodes)
-        stored_nodes_arg = parse_arg("max", stored_nodes)
-
-        index_arg = parse_arg("index", index)
-        res = self.client.mutation('mutation{createFloatSeriesVariable(%s%s%s%s%s%s%s%s%s%s){id}}' % (
-            shown_nodes_arg, stored_nodes_arg, thingId_arg, developer_only_arg, unitOfMeasurement_arg, precision_arg, min_arg, max_arg, name_arg, index_arg))["createFloatSeriesVariable"]
+        res = self.client.mutation('mutation($shownNodes:Int,$storedNodes:Int,$thingId:ID,$developerOnly:Boolean,$unitOfMeasurement:String,$precision:Int,$min:Float,$max:Float,$name:String!,$index:Int){createFloatSeriesVariable(shownNodes:$shownNodes,storedNodes:$storedNodes,thingId:$thingId,developerOnly:$developerOnly,unitOfMeasurement:$unitOfMeasurement,precision:$precision,min:$min,max:$max,name:$name,index:$index){id}}', variables=parse_variables(shownNodes=shown_nodes, storedNodes=stored_nodes, thingId=thing_id, developerOnly=developer_only, unitOfMeasurement=unit_of_measurement, precision=precision, min=min, max=max, name=name, index=index))["createFloatSeriesVariable"]
 
         def wrapper(id):
             return FloatSeriesVariable(self.client, id)
@@ -464,11 +302,7 @@ class MutationRoot:
         return wrapById(res, wrapper)
 
     def create_float_series_node(self, series_id, value=undefined, timestamp=undefined):
-        seriesId_arg = parse_arg("seriesId", series_id)
-        value_arg = parse_arg("value", value)
-        timestamp_arg = parse_arg("timestamp", timestamp)
-        res = self.client.mutation('mutation{createFloatSeriesNode(%s%s%s){id}}' % (
-            seriesId_arg, timestamp_arg, value_arg))["createFloatSeriesNode"]
+        res = self.client.mutation('mutation($seriesId:ID!,$timestamp:DateTime,$value:Float){createFloatSeriesNode(seriesId:$seriesId,timestamp:$timestamp,value:$value){id}}', variables=parse_variables(seriesId=series_id, timestamp=timestamp, value=value))["createFloatSeriesNode"]
 
         def wrapper(id):
             return FloatSeriesNode(self.client, id)
@@ -495,32 +329,7 @@ class MutationRoot:
                     address_country_or_territory=undefined
                     ):
 
-        company_name_arg = parse_arg("company_name", company_name)
-        quiet_mode_arg = parse_arg("quiet_mode", quiet_mode)
-        name_arg = parse_arg("name", name)
-        vat_number_arg = parse_arg("vat_number", vat_number)
-        lenght_and_mass_arg = parse_arg(
-            "lenght_and_mass", lenght_and_mass)
-        temperature_arg = parse_arg("temperature", temperature)
-        date_format_arg = parse_arg("date_format", date_format)
-        time_format_arg = parse_arg("time_format", time_format)
-        password_change_email_arg = parse_arg(
-            "password_change_email", password_change_email)
-        shares_email_arg = parse_arg("shares_email", shares_email)
-        access_token_created_email_arg = parse_arg(
-            "access_token_created_email", access_token_created_email)
-        address_line1_arg = parse_arg("address_line1", address_line1)
-        address_line2_arg = parse_arg("address_line2", address_line2)
-        address_postal_code_arg = parse_arg(
-            "address_postal_code", address_postal_code)
-        address_city_arg = parse_arg("address_city", address_city)
-        address_state_arg = parse_arg("address_state", address_state)
-        address_country_or_territory_arg = parse_arg(
-            "address_country_or_territory", address_country_or_territory)
-
-        res = self.client.mutation('mutation{updateUser(%s%s%s%s%s%s%s%s%s%s%s%s%s%s%s%s%s){id}}' % (
-            company_name_arg, quiet_mode_arg, name_arg, vat_number_arg, lenght_and_mass_arg, temperature_arg, date_format_arg, time_format_arg, password_change_email_arg, shares_email_arg, access_token_created_email_arg, address_line1_arg, address_line2_arg, address_postal_code_arg, address_city_arg, address_state_arg, address_country_or_territory_arg
-        ))["updateUser"]
+        res = self.client.mutation('mutation($companyName:String,$quietMode:Boolean,$name:String,$vatNumber:String,$lengthAndMass:LengthAndMass,$temperature:Temperature,$dateFormat:DateFormat,$timeFormat:TimeFormat,$passwordChangeEmail:Boolean,$sharesEmail:Boolean,$accessTokenCreatedEmail:Boolean,$addressLine1:String,$addressLine2:String,$addressPostalCode:String,$addressCity:String,$addressState:String,$addressCountryOrTerritory:String){updateUser(companyName:$companyName,quietMode:$quietMode,name:$name,vatNumber:$vatNumber,lengthAndMass:$lengthAndMass,temperature:$temperature,dateFormat:$dateFormat,timeFormat:$timeFormat,passwordChangeEmail:$passwordChangeEmail,sharesEmail:$sharesEmail,accessTokenCreatedEmail:$accessTokenCreatedEmail,addressLine1:$addressLine1,addressLine2:$addressLine2,addressPostalCode:$addressPostalCode,addressCity:$addressCity,addressState:$addressState,addressCountryOrTerritory:$addressCountryOrTerritory){id}}', variables=parse_variables(companyName=company_name, quietMode=quiet_mode, name=name, vatNumber=vat_number, lengthAndMass=lenght_and_mass, temperature=temperature, dateFormat=date_format, timeFormat=time_format, passwordChangeEmail=password_change_email, sharesEmail=shares_email, accessTokenCreatedEmail=access_token_created_email, addressLine1=address_line1, addressLine2=address_line2, addressPostalCode=address_postal_code, addressCity=address_city, addressState=address_state, addressCountryOrTerritory=address_country_or_territory))["updateUser"]
 
         def wrapper(id):
             return User(self.client)
@@ -528,20 +337,10 @@ class MutationRoot:
         return wrapById(res, wrapper)
 
     def change_email(self, newEmail, password, redirect_to):
-        newEmail_arg = parse_arg("newEmail", newEmail)
-        password_arg = parse_arg("password", password)
-        redirect_to_arg = parse_arg("redirectTo", redirect_to)
-
-        return self.client.mutation('mutation{changeEmail(%s%s%s)}' % (newEmail_arg, password_arg, redirect_to_arg))["changeEmail"]
+        return self.client.mutation('mutation($newEmail:String!,$password:String!,$redirectTo:RedirectTo!){changeEmail(newEmail:$newEmail,password:$password,redirectTo:$redirectTo)}', variables=parse_variables(newEmail=newEmail, password=password, redirectTo=redirect_to))["changeEmail"]
 
     def update_environment(self, id, name=undefined, picture=undefined, index=undefined, muted=undefined):
-        id_arg = parse_arg("id", id)
-        name_arg = parse_arg("name", name)
-        picture_arg = parse_arg("picture", picture, is_enum=True)
-        index_arg = parse_arg("index", index)
-        muted_arg = parse_arg("muted", muted)
-        res = self.client.mutation('mutation{updateEnvironment(%s%s%s%s%s){id}}' % (
-            id_arg, name_arg, picture_arg, index_arg, muted_arg))["updateEnvironment"]
+        res = self.client.mutation('mutation($id:ID!,$name:String,$picture:EnvironmentPicture,$index:Int,$muted:Boolean){updateEnvironment(id:$id,name:$name,picture:$picture,index:$index,muted:$muted){id}}', variables=parse_variables(id=id, name=name, picture=picture, index=index, muted=muted))["updateEnvironment"]
 
         def wrapper(id):
             return Environment(self.client, id)
@@ -549,21 +348,7 @@ class MutationRoot:
         return wrapById(res, wrapper)
 
     def update_thing(self, id, online=undefined, type=undefined, name=undefined, index=undefined, signal=undefined, battery=undefined, battery_charging=undefined, firmware=undefined, muted=undefined, starred=undefined, stored_notifications=undefined):
-        id_arg = parse_arg("id", id)
-        thingType_arg = parse_arg("type", type)
-        name_arg = parse_arg("name", name)
-        index_arg = parse_arg("index", index)
-        signal_arg = parse_arg("signal", signal)
-        battery_arg = parse_arg("battery", battery)
-        batteryCharging_arg = parse_arg("batteryCharging", battery_charging)
-        firmware_arg = parse_arg("firmware", firmware)
-        muted_arg = parse_arg("muted", muted)
-        starred_arg = parse_arg("starred", starred)
-        online_arg = parse_arg("online", online)
-        stored_notifications_arg = parse_arg(
-            "storedNotifications", stored_notifications)
-        res = self.client.mutation('mutation{updateThing(%s%s%s%s%s%s%s%s%s%s%s%s){id}}' % (
-            online_arg, stored_notifications_arg, id_arg, thingType_arg, name_arg, index_arg, signal_arg, battery_arg, batteryCharging_arg, firmware_arg, muted_arg, starred_arg))["updateThing"]
+        res = self.client.mutation('mutation($online:Boolean,$storedNotifications:Int,$id:ID!,$type:String,$name:String,$index:Int,$signal:Int,$battery:Float,$batteryCharging:Boolean,$firmware:String,$muted:Boolean,$starred:Boolean){updateThing(online:$online,storedNotifications:$storedNotifications,id:$id,type:$type,name:$name,index:$index,signal:$signal,battery:$battery,batteryCharging:$batteryCharging,firmware:$firmware,muted:$muted,starred:$starred){id}}', variables=parse_variables(online=online, storedNotifications=stored_notifications, id=id, type=type, name=name, index=index, signal=signal, battery=battery, batteryCharging=battery_charging, firmware=firmware, muted=muted, starred=starred))["updateThing"]
 
         def wrapper(id):
             return Thing(self.client, id)
@@ -571,12 +356,7 @@ class MutationRoot:
         return wrapById(res, wrapper)
 
     def move_thing(self, thing_id, new_environment_id):
-        thing_id_arg = parse_arg("thingId", thing_id)
-        new_environment_id_arg = parse_arg(
-            "newEnvironmentId", new_environment_id)
-
-        res = self.client.mutation('mutation{moveThing(%s%s){id}}' % (
-            thing_id_arg, new_environment_id_arg))["moveThing"]
+        res = self.client.mutation('mutation($thingId:ID!,$newEnvironmentId:ID!){moveThing(thingId:$thingId,newEnvironmentId:$newEnvironmentId){id}}', variables=parse_variables(thingId=thing_id, newEnvironmentId=new_environment_id))["moveThing"]
 
         def wrapper(id):
             return Thing(self.client, id)
@@ -584,14 +364,7 @@ class MutationRoot:
         return wrapById(res, wrapper)
 
     def variable(self, id, developer_only=undefined, hidden=undefined, name=undefined, index=undefined):
-        id_arg = parse_arg("id", id)
-        developer_only_arg = parse_arg("developerOnly", developer_only)
-        hidden_arg = parse_arg("hidden", hidden)
-
-        name_arg = parse_arg("name", name)
-        index_arg = parse_arg("index", index)
-        res = self.client.mutation('mutation{updateVariable(%s%s%s%s%s){id __typename}}' % (
-            id_arg, developer_only_arg, hidden_arg, name_arg, index_arg))["updateFloatVariable"]
+        res = self.client.mutation('mutation($id:ID!,$developerOnly:Boolean,$hidden:Boolean,$name:String,$index:Int){updateVariable(id:$id,developerOnly:$developerOnly,hidden:$hidden,name:$name,index:$index){id __typename}}', variables=parse_variables(id=id, developerOnly=developer_only, hidden=hidden, name=name, index=index))["updateVariable"]
 
         def wrapper(res):
             return Variable(self.client, res["id"], res["__typename"])
@@ -599,23 +372,7 @@ class MutationRoot:
         return wrapWith(res, wrapper)
 
     def update_float_variable(self, id, user_permission=undefined, developer_only=undefined, hidden=undefined, unit_of_measurement=undefined, value=undefined, precision=undefined, min=undefined, max=undefined, name=undefined, index=undefined, allowed_values=undefined):
-        id_arg = parse_arg("id", id)
-        user_permission_arg = parse_arg(
-            "userPermission", user_permission, is_enum=True)
-        developer_only_arg = parse_arg("developerOnly", developer_only)
-        hidden_arg = parse_arg("hidden", hidden)
-        unit_of_measurement_arg = parse_arg(
-            "unitOfMeasurement", unit_of_measurement)
-        value_arg = parse_arg("value", value)
-        precision_arg = parse_arg("precision", precision)
-        min_arg = parse_arg("min", min)
-        max_arg = parse_arg("max", max)
-        name_arg = parse_arg("name", name)
-        allowed_values_arg = parse_arg("allowedValues", allowed_values)
-
-        index_arg = parse_arg("index", index)
-        res = self.client.mutation('mutation{updateFloatVariable(%s%s%s%s%s%s%s%s%s%s%s%s){id}}' % (
-            id_arg, user_permission_arg, developer_only_arg, allowed_values_arg, hidden_arg, unit_of_measurement_arg, value_arg, precision_arg, min_arg, max_arg, name_arg, index_arg))["updateFloatVariable"]
+        res = self.client.mutation('mutation($id:ID!,$userPermission:Permission,$developerOnly:Boolean,$allowedValues:[Float!],$hidden:Boolean,$unitOfMeasurement:String,$value:Float,$precision:Int,$min:Float,$max:Float,$name:String,$index:Int){updateFloatVariable(id:$id,userPermission:$userPermission,developerOnly:$developerOnly,allowedValues:$allowedValues,hidden:$hidden,unitOfMeasurement:$unitOfMeasurement,value:$value,precision:$precision,min:$min,max:$max,name:$name,index:$index){id}}', variables=parse_variables(id=id, userPermission=user_permission, developerOnly=developer_only, allowedValues=allowed_values, hidden=hidden, unitOfMeasurement=unit_of_measurement, value=value, precision=precision, min=min, max=max, name=name, index=index))["updateFloatVariable"]
 
         def wrapper(id):
             return FloatVariable(self.client, id)
@@ -623,11 +380,7 @@ class MutationRoot:
         return wrapById(res, wrapper)
 
     def increment_float_variable(self, id, increment_by):
-        id_arg = parse_arg("id", id)
-        incrementBy_arg = parse_arg("incrementBy", increment_by)
-
-        res = self.client.mutation('mutation{incrementFloatVariable(%s%s){id}}' % (
-            id_arg, incrementBy_arg))["incrementFloatVariable"]
+        res = self.client.mutation('mutation($id:ID!,$incrementBy:Float!){incrementFloatVariable(id:$id,incrementBy:$incrementBy){id}}', variables=parse_variables(id=id, incrementBy=increment_by))["incrementFloatVariable"]
 
         def wrapper(id):
             return FloatVariable(self.client, id)
@@ -635,19 +388,7 @@ class MutationRoot:
         return wrapById(res, wrapper)
 
     def update_string_variable(self, id, user_permission=undefined, developer_only=undefined, hidden=undefined, value=undefined, max_characters=undefined, name=undefined, allowed_values=undefined, index=undefined):
-        id_arg = parse_arg("id", id)
-        user_permission_arg = parse_arg(
-            "userPermission", user_permission, is_enum=True)
-        private_arg = parse_arg("developerOnly", developer_only)
-        hidden_arg = parse_arg("hidden", hidden)
-        value_arg = parse_arg("value", value)
-        maxChars_arg = parse_arg("maxCharacters", max_characters)
-        name_arg = parse_arg("name", name)
-
-        allowedValues_arg = parse_arg("allowedValues", allowed_values)
-        index_arg = parse_arg("index", index)
-        res = self.client.mutation('mutation{updateStringVariable(%s%s%s%s%s%s%s%s%s){id}}' % (
-            id_arg, user_permission_arg, private_arg, hidden_arg, value_arg, maxChars_arg, name_arg, allowedValues_arg, index_arg))["updateStringVariable"]
+        res = self.client.mutation('mutation($id:ID!,$userPermission:Permission,$developerOnly:Boolean,$hidden:Boolean,$value:String,$maxCharacters:Int,$name:String,$allowedValues:[String!],$index:Int){updateStringVariable(id:$id,userPermission:$userPermission,developerOnly:$developerOnly,hidden:$hidden,value:$value,maxCharacters:$maxCharacters,name:$name,allowedValues:$allowedValues,index:$index){id}}', variables=parse_variables(id=id, userPermission=user_permission, developerOnly=developer_only, hidden=hidden, value=value, maxCharacters=max_characters, name=name, allowedValues=allowed_values, index=index))["updateStringVariable"]
 
         def wrapper(id):
             return StringVariable(self.client, id)
@@ -655,17 +396,7 @@ class MutationRoot:
         return wrapById(res, wrapper)
 
     def update_boolean_variable(self, id, user_permission=undefined, developer_only=undefined, hidden=undefined, value=undefined, name=undefined, index=undefined):
-        id_arg = parse_arg("id", id)
-        user_permission_arg = parse_arg(
-            "userPermission", user_permission, is_enum=True)
-        private_arg = parse_arg("developerOnly", developer_only)
-        hidden_arg = parse_arg("hidden", hidden)
-        value_arg = parse_arg("value", value)
-        name_arg = parse_arg("name", name)
-
-        index_arg = parse_arg("index", index)
-        res = self.client.mutation('mutation{updateBooleanVariable(%s%s%s%s%s%s%s){id}}' % (
-            id_arg, user_permission_arg, private_arg, hidden_arg, value_arg, name_arg, index_arg))["updateBooleanVariable"]
+        res = self.client.mutation('mutation($id:ID!,$userPermission:Permission,$developerOnly:Boolean,$hidden:Boolean,$value:Boolean,$name:String,$index:Int){updateBooleanVariable(id:$id,userPermission:$userPermission,developerOnly:$developerOnly,hidden:$hidden,value:$value,name:$name,index:$index){id}}', variables=parse_variables(id=id, userPermission=user_permission, developerOnly=developer_only, hidden=hidden, value=value, name=name, index=index))["updateBooleanVariable"]
 
         def wrapper(id):
             return BooleanVariable(self.client, id)
@@ -673,21 +404,7 @@ class MutationRoot:
         return wrapById(res, wrapper)
 
     def update_float_series_variable(self, id, developer_only=undefined, hidden=undefined, unit_of_measurement=undefined, precision=undefined, min=undefined, max=undefined, name=undefined, index=undefined, shown_nodes=undefined, stored_nodes=undefined):
-        id_arg = parse_arg("id", id)
-        private_arg = parse_arg("developerOnly", developer_only)
-        hidden_arg = parse_arg("hidden", hidden)
-        unitOfMeasurement_arg = parse_arg(
-            "unitOfMeasurement", unit_of_measurement)
-        precision_arg = parse_arg("precision", precision)
-        min_arg = parse_arg("min", min)
-        max_arg = parse_arg("max", max)
-        name_arg = parse_arg("name", name)
-        shown_nodes_arg = parse_arg("shownNodes", shown_nodes)
-        stored_nodes_arg = parse_arg("storedNodes", stored_nodes)
-
-        index_arg = parse_arg("index", index)
-        res = self.client.mutation('mutation{updateFloatSeriesVariable(%s%s%s%s%s%s%s%s%s%s%s){id}}' % (
-            id_arg, private_arg, shown_nodes_arg, stored_nodes_arg, hidden_arg, unitOfMeasurement_arg, precision_arg, min_arg, max_arg, name_arg, index_arg))["updateFloatSeriesVariable"]
+        res = self.client.mutation('mutation($id:ID!,$developerOnly:Boolean,$shownNodes:Int,$storedNodes:Int,$hidden:Boolean,$unitOfMeasurement:String,$precision:Int,$min:Float,$max:Float,$name:String,$index:Int){updateFloatSeriesVariable(id:$id,developerOnly:$developerOnly,shownNodes:$shownNodes,storedNodes:$storedNodes,hidden:$hidden,unitOfMeasurement:$unitOfMeasurement,precision:$precision,min:$min,max:$max,name:$name,index:$index){id}}', variables=parse_variables(id=id, developerOnly=developer_only, shownNodes=shown_nodes, storedNodes=stored_nodes, hidden=hidden, unitOfMeasurement=unit_of_measurement, precision=precision, min=min, max=max, name=name, index=index))["updateFloatSeriesVariable"]
 
         def wrapper(id):
             return FloatSeriesVariable(self.client, id)
@@ -695,11 +412,7 @@ class MutationRoot:
         return wrapById(res, wrapper)
 
     def update_float_series_node(self, id, value=undefined, timestamp=undefined):
-        id_arg = parse_arg("id", id)
-        value_arg = parse_arg("value", value)
-        timestamp_arg = parse_arg("timestamp", timestamp)
-        res = self.client.mutation('mutation{updateFloatSeriesNode(%s%s%s){id}}' % (
-            id_arg, value_arg, timestamp_arg))["updateFloatSeriesNode"]
+        res = self.client.mutation('mutation($id:ID!,$value:Float,$timestamp:DateTime){updateFloatSeriesNode(id:$id,value:$value,timestamp:$timestamp){id}}', variables=parse_variables(id=id, value=value, timestamp=timestamp))["updateFloatSeriesNode"]
 
         def wrapper(id):
             return FloatSeriesNode(self.client, id)
@@ -737,11 +450,7 @@ class MutationRoot:
     #     return wrapById(res, wrapper)
 
     def update_notification(self, id, content=undefined, read=undefined):
-        id_arg = parse_arg("id", id)
-        content_arg = parse_arg("content", content)
-        read_arg = parse_arg("read", read)
-        res = self.client.mutation('mutation{updateNotification(%s%s%s){id}}' % (
-            id_arg, content_arg, read_arg))["updateNotification"]
+        res = self.client.mutation('mutation($id:ID!,$content:String,$read:Boolean){updateNotification(id:$id,content:$content,read:$read){id}}', variables=parse_variables(id=id, content=content, read=read))["updateNotification"]
 
         def wrapper(id):
             return Notification(self.client, id)
@@ -749,39 +458,25 @@ class MutationRoot:
         return wrapById(res, wrapper)
 
     def delete_notification(self, id):
-        id_arg = parse_arg("id", id)
-
-        return self.client.mutation('mutation{deleteNotification(%s)}' % (id_arg))["deleteNotification"]
+        return self.client.mutation('mutation($id:ID!){deleteNotification(id:$id)}', variables=parse_variables(id=id))["deleteNotification"]
 
     def delete_variable(self, id):
-        id_arg = parse_arg("id", id)
-
-        return self.client.mutation('mutation{deleteVariable(%s)}' % (id_arg))["deleteVariable"]
+        return self.client.mutation('mutation($id:ID!){deleteVariable(id:$id)}', variables=parse_variables(id=id))["deleteVariable"]
 
     def delete_thing(self, id):
-        id_arg = parse_arg("id", id)
-
-        return self.client.mutation('mutation{deleteThing(%s)}' % (id_arg))["deleteThing"]
+        return self.client.mutation('mutation($id:ID!){deleteThing(id:$id)}', variables=parse_variables(id=id))["deleteThing"]
 
     def unpairThing(self, id, reset):
-        id_arg = parse_arg("id", id)
-        reset_arg = parse_arg("reset", reset)
-
-        return self.client.mutation('mutation{unpairThing(%s%s){id}}' % (id_arg, reset_arg))["unpairThing"]
+        return self.client.mutation('mutation($id:ID!,$reset:Boolean!){unpairThing(id:$id,reset:$reset){id}}', variables=parse_variables(id=id, reset=reset))["unpairThing"]
 
     def delete_environment(self, id):
-        id_arg = parse_arg("id", id)
-
-        return self.client.mutation('mutation{deleteEnvironment(%s)}' % (id_arg))["deleteEnvironment"]
+        return self.client.mutation('mutation($id:ID!){deleteEnvironment(id:$id)}', variables=parse_variables(id=id))["deleteEnvironment"]
 
     def delete_user(self, ):
-
-        return self.client.mutation('mutation{deleteUser()}' % ())["deleteUser"]
+        return self.client.mutation('mutation{deleteUser}')["deleteUser"]
 
     def delete_float_series_node(self, id):
-        id_arg = parse_arg("id", id)
-
-        return self.client.mutation('mutation{deleteFloatSeriesNode(%s)}' % (id_arg))["deleteFloatSeriesNode"]
+        return self.client.mutation('mutation($id:ID!){deleteFloatSeriesNode(id:$id)}', variables=parse_variables(id=id))["deleteFloatSeriesNode"]
 
     # def delete_category_series_node(self, id):
     #     id_arg = parse_arg("id", id)
@@ -0,0 +1,65 @@
+import collections
+import hashlib
+import threading
+
+PERSISTED_QUERY_NOT_FOUND = "PersistedQueryNotFound"
+PERSISTED_QUERY_NOT_SUPPORTED = "PersistedQueryNotSupported"
+
+
+class PersistedQueryRegistry:
+    def __init__(self, max_documents=1000):
+        # the SDK's documents are constants, but batching and prefetching
+        # generate new ones, so only the most recently used max_documents
+        # are kept
+        self.max_documents = max_documents
+
+        self._lock = threading.Lock()
+        self._hashes = collections.OrderedDict()
+        self._registered = set()
+
+    def hash(self, query):
+        with self._lock:
+            sha = self._hashes.get(query)
+            if sha is not None:
+                self._hashes.move_to_end(query)
+                return sha
+
+        sha = hashlib.sha256(query.encode("utf-8")).hexdigest()
+        with self._lock:
+            self._hashes[query] = sha
+            while len(self._hashes) > self.max_documents:
+                # a dropped document is registered again if it is sent again
+                self._registered.discard(self._hashes.popitem(last=False)[1])
+
+        return sha
+
+    def is_registered(self, sha):
+        return sha in self._registered
+
+    def register(self, sha):
+        with self._lock:
+            self._registered.add(sha)
+
+    def unregister(self, sha):
+        with self._lock:
+            self._registered.discard(sha)
+
+    def clear(self):
+        with self._lock:
+            self._registered.clear()
+
+    def __len__(self):
+        return len(self._registered)
+
+
+def get_error_code(parsedRes):
+    for error in parsedRes.get("errors") or []:
+        code = (error.get("extensions") or {}).get("code")
+        if error.get("message") in (PERSISTED_QUERY_NOT_FOUND, PERSISTED_QUERY_NOT_SUPPORTED):
+            return error["message"]
+        elif code == "PERSISTED_QUERY_NOT_FOUND":
+            return PERSISTED_QUERY_NOT_FOUND
+        elif code == "PERSISTED_QUERY_NOT_SUPPORTED":
+            return PERSISTED_QUERY_NOT_SUPPORTED
+
+    return None
@@ -14,7 +14,7 @@ from igloo.models.category_series_variable import CategorySeriesVariable
 from igloo.models.category_series_node import CategorySeriesNode
 from igloo.models.file_variable import FileVariable
 from igloo.models.float_series_node import FloatSeriesNode
-from igloo.utils import undefined, parse_arg
+from igloo.utils import undefined, parse_variables
 
 
 class QueryRoot:
@@ -74,9 +74,9 @@ class QueryRoot:
         return self.client.query("{totpSecret{secret,qrCode}}", keys=["totpSecret"])
 
     def verify_password(self, password, email=undefined):
-        email_arg = parse_arg("email", email)
-        return self.client.query('{verifyPassword(password:"%s" %s)}' % (password, email_arg), keys=["verifyPassword"])
+        return self.client.query('query($password:String!,$email:String){verifyPassword(password:$password,email:$email)}',
+                                 variables=parse_variables(password=password, email=email), keys=["verifyPassword"])
 
     def verify_totp(self, code, email=undefined):
-        email_arg = parse_arg("email", email)
-        return self.client.query('{verifyTotp(code:"%s" %s)}' % (code, email_arg), keys=["verifyTotp"])
+        return self.client.query('query($code:String!,$email:String){verifyTotp(code:$code,email:$email)}',
+                                 variables=parse_variables(code=code, email=email), keys=["verifyTotp"])
@@ -0,0 +1,146 @@
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+# statuses a load balancer or an overloaded server answer with
+TRANSIENT_STATUSES = (429, 502, 503, 504)
+
+
+class TransientError(Exception):
+    def __init__(self, message, status=None, retry_after=None):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+
+class CircuitOpenError(Exception):
+    pass
+
+
+def full_jitter(attempt, base_delay, max_delay):
+    # "full jitter": a random delay between 0 and the exponential ceiling,
+    # so that clients failing together don't come back together
+    return random.uniform(0, min(max_delay, base_delay * 2 ** attempt))
+
+
+def parse_retry_after(value):
+    if value is None:
+        return None
+
+    try:
+        return max(0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        return max(0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def is_mutation(query):
+    return query is not None and query.lstrip().startswith("mutation")
+
+
+class RetryPolicy:
+    def __init__(self, max_attempts=3, base_delay=0.2, max_delay=10, retry_mutations=False,
+                 retry_statuses=TRANSIENT_STATUSES, respect_retry_after=True, max_retry_after=60):
+        # mutations are not idempotent, so by default a failed one is never
+        # sent again: it might have been applied before the connection dropped
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retry_mutations = retry_mutations
+        self.retry_statuses = retry_statuses
+        self.respect_retry_after = respect_retry_after
+        self.max_retry_after = max_retry_after
+
+    def is_retryable_status(self, status):
+        return status in self.retry_statuses
+
+    def should_retry(self, attempt, exception, idempotent):
+        if attempt + 1 >= self.max_attempts:
+            return False
+        elif not idempotent and not self.retry_mutations:
+            return False
+        elif isinstance(exception, TransientError) and exception.retry_after is not None and \
+                self.respect_retry_after and exception.retry_after > self.max_retry_after:
+            return False
+
+        return True
+
+    def delay(self, attempt, exception=None):
+        retry_after = getattr(exception, "retry_after", None)
+        if self.respect_retry_after and retry_after is not None:
+            return retry_after
+
+        return full_jitter(attempt, self.base_delay, self.max_delay)
+
+
+class CircuitBreaker:
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold=5, recovery_timeout=30):
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = None
+        self._probing = False
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._state == self.OPEN and \
+                    time.monotonic() - self._opened_at >= self.recovery_timeout:
+                return self.HALF_OPEN
+            return self._state
+
+    @property
+    def failures(self):
+        return self._failures
+
+    def before_request(self):
+        with self._lock:
+            if self._state == self.CLOSED:
+                return
+
+            if self._state == self.OPEN:
+                if time.monotonic() - self._opened_at < self.recovery_timeout:
+                    raise CircuitOpenError("The endpoint is unavailable, not sending the request")
+                self._state = self.HALF_OPEN
+                self._probing = False
+
+            # while half open a single request probes the endpoint, the
+            # others keep failing fast until it comes back
+            if self._probing:
+                raise CircuitOpenError("The endpoint is unavailable, not sending the request")
+            self._probing = True
+
+    def record_success(self):
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._probing = False
+
+    def release(self):
+        # the request was abandoned before the endpoint answered, so it
+        # tells nothing: a half open breaker lets another request probe
+        with self._lock:
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._probing = False
+
+    def reset(self):
+        self.record_success()
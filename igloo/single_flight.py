@@ -0,0 +1,107 @@
+import asyncio
+import json
+import threading
+from igloo.timeouts import DeadlineExceeded
+
+
+class _Call:
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = None
+        self.exception = None
+
+
+class _Flight:
+    def __init__(self, task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._tasks = {}
+
+        # hits are callers that shared someone else's request
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(query, variables, token, keys=()):
+        return (token, query, json.dumps(variables, sort_keys=True, default=str), tuple(keys))
+
+    @property
+    def in_flight(self):
+        return len(self._calls) + len(self._tasks)
+
+    def do(self, key, fn, timeout=None):
+        # timeout bounds how long a caller waits for someone else's request,
+        # the leader's own is enforced by fn
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.misses += 1
+            else:
+                self.hits += 1
+
+        if not leader:
+            if not call.event.wait(timeout):
+                raise DeadlineExceeded("The request did not complete within {}s".format(timeout))
+            if call.exception is not None:
+                raise call.exception
+            return call.value
+
+        try:
+            call.value = fn()
+            return call.value
+        except BaseException as e:
+            call.exception = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+
+    async def do_async(self, key, fn, timeout=None):
+        loop = asyncio.get_running_loop()
+        # futures can't be awaited from other loops, so calls are only
+        # shared between coroutines running in the same one
+        key = (id(loop), key)
+
+        with self._lock:
+            flight = self._tasks.get(key)
+            if flight is None:
+                flight = self._tasks[key] = _Flight(loop.create_task(fn()))
+                flight.task.add_done_callback(lambda _: self._forget(key, flight))
+                self.misses += 1
+            else:
+                self.hits += 1
+            flight.waiters += 1
+
+        # a waiter that gets cancelled or gives up must not cancel the
+        # request for the others, the last one to leave does
+        try:
+            return await asyncio.wait_for(asyncio.shield(flight.task), timeout)
+        except asyncio.TimeoutError:
+            if flight.task.done():
+                raise
+            raise DeadlineExceeded("The request did not complete within {}s".format(timeout))
+        finally:
+            with self._lock:
+                flight.waiters -= 1
+                abandoned = flight.waiters == 0 and not flight.task.done()
+            if abandoned:
+                self._forget(key, flight)
+                flight.task.cancel()
+
+    def _forget(self, key, flight):
+        # a new flight may have taken the key after this one was abandoned
+        with self._lock:
+            if self._tasks.get(key) is flight:
+                del self._tasks[key]
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "in_flight": self.in_flight}
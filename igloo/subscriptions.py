@@ -15,7 +15,7 @@ from igloo.models.category_series_variable import CategorySeriesVariable
 from igloo.models.category_series_node import CategorySeriesNode
 from igloo.models.file_variable import FileVariable
 from igloo.models.float_series_node import FloatSeriesNode
-from igloo.utils import undefined, parse_arg
+from igloo.utils import undefined, parse_variables
 
 
 class SubscriptionRoot:
@@ -23,34 +23,23 @@ class SubscriptionRoot:
         self.client = client
 
     async def thing_created(self, environment_id=undefined):
-        environmentId_arg = parse_arg("environmentId", environment_id)
-
-        async for data in self.client.subscribe(('subscription{thingCreated(%s){id}}' % (environmentId_arg)).replace('()', '')):
+        async for data in self.client.subscribe('subscription($environmentId:ID){thingCreated(environmentId:$environmentId){id}}', variables=parse_variables(environmentId=environment_id)):
             yield Thing(self.client, data["thingCreated"]["id"])
 
     async def thing_paired(self, environment_id=undefined, id=undefined):
-        environmentId_arg = parse_arg(
-            "environmentId", environment_id)
-        id_arg = parse_arg("id", id)
-
-        async for data in self.client.subscribe(('subscription{thingPaired(%s%s){id}}' % (environmentId_arg, id_arg)).replace('()', '')):
+        async for data in self.client.subscribe('subscription($environmentId:ID,$id:ID){thingPaired(environmentId:$environmentId,id:$id){id}}', variables=parse_variables(environmentId=environment_id, id=id)):
             yield Thing(self.client, data["thingPaired"]["id"])
 
     async def environment_created(self):
-        async for data in self.client.subscribe(('subscription{environmentCreated(){id}}' % ()).replace('()', '')):
+        async for data in self.client.subscribe('subscription{environmentCreated{id}}'):
             yield Environment(self.client, data["environmentCreated"]["id"])
 
     async def variable_created(self, thing_id=undefined, hidden=undefined):
-        thingId_arg = parse_arg("thingId", thing_id)
-        hidden_arg = parse_arg("hidden", hidden)
-
-        async for data in self.client.subscribe(('subscription{variableCreated(%s%s){id __typename}}' % (thingId_arg, hidden_arg)).replace('()', '')):
+        async for data in self.client.subscribe('subscription($thingId:ID,$hidden:Boolean){variableCreated(thingId:$thingId,hidden:$hidden){id __typename}}', variables=parse_variables(thingId=thing_id, hidden=hidden)):
             yield Variable(self.client, data["variableCreated"]["id"], data["variableCreated"]["__typename"])
 
     async def float_series_node_created(self, series_id=undefined):
-        seriesId_arg = parse_arg("seriesId", series_id)
-
-        async for data in self.client.subscribe(('subscription{floatSeriesNodeCreated(%s){id}}' % (seriesId_arg)).replace('()', '')):
+        async for data in self.client.subscribe('subscription($seriesId:ID){floatSeriesNodeCreated(seriesId:$seriesId){id}}', variables=parse_variables(seriesId=series_id)):
             yield FloatSeriesNode(self.client, data["floatSeriesNodeCreated"]["id"])
 
     # async def category_series_node_created(self, series_id=undefined):
@@ -60,44 +49,39 @@ class SubscriptionRoot:
     #         yield CategorySeriesNode(self.client, data["categorySeriesNodeCreated"]["id"])
 
     async def access_token_created(self):
-        async for data in self.client.subscribe(('subscription{accessTokenCreated(){id}}' % ()).replace('()', '')):
+        async for data in self.client.subscribe('subscription{accessTokenCreated{id}}'):
             yield AccessToken(self.client, data["accessTokenCreated"]["id"])
 
     async def notification_created(self):
-        async for data in self.client.subscribe(('subscription{notificationCreated(){id}}' % ()).replace('()', '')):
+        async for data in self.client.subscribe('subscription{notificationCreated{id}}'):
             yield Notification(self.client, data["notificationCreated"]["id"])
 
     async def thing_moved(self, environment_id=undefined, id=undefined):
-        environmentId_arg = parse_arg("environmentId", environment_id)
-        id_arg = parse_arg("id", id)
-
-        async for data in self.client.subscribe(('subscription{thingMoved(%s%s){id}}' % (environmentId_arg, id_arg)).replace('()', '')):
+        async for data in self.client.subscribe('subscription($environmentId:ID,$id:ID){thingMoved(environmentId:$environmentId,id:$id){id}}', variables=parse_variables(environmentId=environment_id, id=id)):
             yield Thing(self.client, data["thingMoved"]["id"])
 
     async def pending_share_created(self, ):
-        async for data in self.client.subscribe(('subscription{pendingShareCreated(){id}}' % ()).replace('()', '')):
+        async for data in self.client.subscribe('subscription{pendingShareCreated{id}}'):
             yield PendingShare(self.client, data["pendingShareCreated"]["id"])
 
     async def pending_share_updated(self, ):
-        async for data in self.client.subscribe(('subscription{pendingShareUpdated(){id}}' % ()).replace('()', '')):
+        async for data in self.client.subscribe('subscription{pendingShareUpdated{id}}'):
             yield PendingShare(self.client, data["pendingShareUpdated"]["id"])
 
     async def pending_share_accepted(self, ):
-        async for data in self.client.subscribe(('subscription{pendingShareAccepted(){id sender recipient role environment}}' % ()).replace('()', '')):
+        async for data in self.client.subscribe('subscription{pendingShareAccepted{id sender recipient role environment}}'):
             yield data["pendingShareAccepted"]
 
     async def pending_share_declined(self, ):
-        async for data in self.client.subscribe(('subscription{pendingShareDeclined()}' % ()).replace('()', '')):
+        async for data in self.client.subscribe('subscription{pendingShareDeclined}'):
             yield data["pendingShareDeclined"]
 
     async def pending_share_revoked(self, ):
-        async for data in self.client.subscribe(('subscription{pendingShareRevoked()}' % ()).replace('()', '')):
+        async for data in self.client.subscribe('subscription{pendingShareRevoked}'):
             yield data["pendingShareRevoked"]
 
     async def user_left_environment(self, environment_id=undefined, user_id=undefined):
-        environmentId_arg = parse_arg("environmentId", environment_id)
-        userId_arg = parse_arg("userId", user_id)
-        async for data in self.client.subscribe(('subscription{userLeftEnvironment(%s%s){environment{id} user{id}}}' % (environmentId_arg, userId_arg)).replace('()', '')):
+        async for data in self.client.subscribe('subscription($environmentId:ID,$userId:ID){userLeftEnvironment(environmentId:$environmentId,userId:$userId){environment{id} user{id}}}', variables=parse_variables(environmentId=environment_id, userId=user_id)):
             res = data["userLeftEnvironment"]
             res["environment"] = Environment(
                 self.client, res["environment"]["id"])
@@ -107,11 +91,11 @@ class SubscriptionRoot:
             yield res
 
     async def pending_transfer_created(self, ):
-        async for data in self.client.subscribe(('subscription{pendingTransferCreated(){id}}' % ()).replace('()', '')):
+        async for data in self.client.subscribe('subscription{pendingTransferCreated{id}}'):
             yield PendingTransfer(self.client, data["pendingTransferCreated"]["id"])
 
     async def pending_transfer_accepted(self):
-        async for data in self.client.subscribe(('subscription{pendingTransferAccepted(){sender{id} recipient{id} environment{id} id}}').replace('()', '')):
+        async for data in self.client.subscribe('subscription{pendingTransferAccepted{sender{id} recipient{id} environment{id} id}}'):
             res = data["pendingTransferAccepted"]
             res["sender"] = User(
                 self.client, res["sender"]["id"])
@@ -123,46 +107,31 @@ class SubscriptionRoot:
             yield res
 
     async def pending_transfer_declined(self, ):
-        async for data in self.client.subscribe(('subscription{pendingTransferDeclined()}' % ()).replace('()', '')):
+        async for data in self.client.subscribe('subscription{pendingTransferDeclined}'):
             yield data["pendingTransferDeclined"]
 
     async def pending_transfer_revoked(self, ):
-        async for data in self.client.subscribe(('subscription{pendingTransferRevoked()}' % ()).replace('()', '')):
+        async for data in self.client.subscribe('subscription{pendingTransferRevoked}'):
             yield data["pendingTransferRevoked"]
 
     async def user_updated(self, id=undefined, email=undefined):
-        id_arg = parse_arg("id", id)
-        email_arg = parse_arg("email", email)
-
-        async for data in self.client.subscribe(('subscription{userUpdated(%s%s){id}}' % (id_arg, email_arg)).replace('()', '')):
+        async for data in self.client.subscribe('subscription($id:ID,$email:String){userUpdated(id:$id,email:$email){id}}', variables=parse_variables(id=id, email=email)):
             yield User(self.client, data["userUpdated"]["id"])
 
     async def thing_updated(self, environment_id=undefined, id=undefined):
-        environmentId_arg = parse_arg("environmentId", environment_id)
-        id_arg = parse_arg("id", id)
-
-        async for data in self.client.subscribe(('subscription{thingUpdated(%s%s){id}}' % (environmentId_arg, id_arg)).replace('()', '')):
+        async for data in self.client.subscribe('subscription($environmentId:ID,$id:ID){thingUpdated(environmentId:$environmentId,id:$id){id}}', variables=parse_variables(environmentId=environment_id, id=id)):
             yield Thing(self.client, data["thingUpdated"]["id"])
 
     async def environment_updated(self, id=undefined):
-        id_arg = parse_arg("id", id)
-
-        async for data in self.client.subscribe(('subscription{environmentUpdated(%s){id}}' % (id_arg)).replace('()', '')):
+        async for data in self.client.subscribe('subscription($id:ID){environmentUpdated(id:$id){id}}', variables=parse_variables(id=id)):
             yield Environment(self.client, data["environmentUpdated"]["id"])
 
     async def variable_updated(self, thing_id=undefined, id=undefined, hidden=undefined):
-        thingId_arg = parse_arg("thingId", thing_id)
-        id_arg = parse_arg("id", id)
-        hidden_arg = parse_arg("hidden", hidden)
-
-        async for data in self.client.subscribe(('subscription{variableUpdated(%s%s%s){id __typename}}' % (thingId_arg, id_arg, hidden_arg)).replace('()', '')):
+        async for data in self.client.subscribe('subscription($thingId:ID,$id:ID,$hidden:Boolean){variableUpdated(thingId:$thingId,id:$id,hidden:$hidden){id __typename}}', variables=parse_variables(thingId=thing_id, id=id, hidden=hidden)):
             yield Variable(self.client, data["variableUpdated"]["id"], data["variableUpdated"]["__typename"])
 
     async def float_series_node_updated(self, series_id=undefined, id=undefined):
-        seriesId_arg = parse_arg("seriesId", series_id)
-        id_arg = parse_arg("id", id)
-
-        async for data in self.client.subscribe(('subscription{floatSeriesNodeUpdated(%s%s){id}}' % (seriesId_arg, id_arg)).replace('()', '')):
+        async for data in self.client.subscribe('subscription($seriesId:ID,$id:ID){floatSeriesNodeUpdated(seriesId:$seriesId,id:$id){id}}', variables=parse_variables(seriesId=series_id, id=id)):
             yield FloatSeriesNode(self.client, data["floatSeriesNodeUpdated"]["id"])
 
     # async def category_series_node_updated(self, series_id=undefined, id=undefined):
@@ -173,25 +142,15 @@ class SubscriptionRoot:
     #         yield CategorySeriesNode(self.client, data["categorySeriesNodeUpdated"]["id"])
 
     async def notification_updated(self, thing_id=undefined, id=undefined):
-        thingId_arg = parse_arg("thingId", thing_id)
-        id_arg = parse_arg("id", id)
-
-        async for data in self.client.subscribe(('subscription{notificationUpdated(%s%s){id}}' % (thingId_arg, id_arg)).replace('()', '')):
+        async for data in self.client.subscribe('subscription($thingId:ID,$id:ID){notificationUpdated(thingId:$thingId,id:$id){id}}', variables=parse_variables(thingId=thing_id, id=id)):
             yield Notification(self.client, data["notificationUpdated"]["id"])
 
     async def variable_deleted(self, thing_id=undefined, id=undefined, hidden=undefined):
-        thingId_arg = parse_arg("thingId", thing_id)
-        id_arg = parse_arg("id", id)
-        hidden_arg = parse_arg("hidden", hidden)
-
-        async for data in self.client.subscribe(('subscription{variableDeleted(%s%s%s)}' % (thingId_arg, id_arg, hidden_arg)).replace('()', '')):
+        async for data in self.client.subscribe('subscription($thingId:ID,$id:ID,$hidden:Boolean){variableDeleted(thingId:$thingId,id:$id,hidden:$hidden)}', variables=parse_variables(thingId=thing_id, id=id, hidden=hidden)):
             yield data["variableDeleted"]
 
     async def float_series_node_deleted(self, series_id=undefined, id=undefined):
-        seriesId_arg = parse_arg("seriesId", series_id)
-        id_arg = parse_arg("id", id)
-
-        async for data in self.client.subscribe(('subscription{floatSeriesNodeDeleted(%s%s)}' % (seriesId_arg, id_arg)).replace('()', '')):
+        async for data in self.client.subscribe('subscription($seriesId:ID,$id:ID){floatSeriesNodeDeleted(seriesId:$seriesId,id:$id)}', variables=parse_variables(seriesId=series_id, id=id)):
             yield data["floatSeriesNodeDeleted"]
 
     # async def category_series_node_deleted(self, series_id=undefined, id=undefined):
@@ -202,45 +161,29 @@ class SubscriptionRoot:
     #         yield data["categorySeriesNodeDeleted"]
 
     async def thing_deleted(self, environment_id=undefined, id=undefined):
-        environmentId_arg = parse_arg("environmentId", environment_id)
-        id_arg = parse_arg("id", id)
-
-        async for data in self.client.subscribe(('subscription{thingDeleted(%s%s)}' % (environmentId_arg, id_arg)).replace('()', '')):
+        async for data in self.client.subscribe('subscription($environmentId:ID,$id:ID){thingDeleted(environmentId:$environmentId,id:$id)}', variables=parse_variables(environmentId=environment_id, id=id)):
             yield data["thingDeleted"]
 
     async def thing_unpaired(self, environment_id=undefined, id=undefined):
-        environmentId_arg = parse_arg("environmentId", environment_id)
-        id_arg = parse_arg("id", id)
-
-        async for data in self.client.subscribe(('subscription{thingUnpaired(%s%s)}' % (environmentId_arg, id_arg)).replace('()', '')):
+        async for data in self.client.subscribe('subscription($environmentId:ID,$id:ID){thingUnpaired(environmentId:$environmentId,id:$id)}', variables=parse_variables(environmentId=environment_id, id=id)):
             yield data["thingUnpaired"]
 
     async def environment_deleted(self, id=undefined):
-        id_arg = parse_arg("id", id)
-
-        async for data in self.client.subscribe(('subscription{environmentDeleted(%s)}' % (id_arg)).replace('()', '')):
+        async for data in self.client.subscribe('subscription($id:ID){environmentDeleted(id:$id)}', variables=parse_variables(id=id)):
             yield data["environmentDeleted"]
 
     async def user_deleted(self, id=undefined, email=undefined):
-        id_arg = parse_arg("id", id)
-        email_arg = parse_arg("id", email)
-
-        async for data in self.client.subscribe(('subscription{userDeleted(%s%s)}' % (id_arg, email_arg)).replace('()', '')):
+        async for data in self.client.subscribe('subscription($id:ID,$email:String){userDeleted(id:$id,email:$email)}', variables=parse_variables(id=id, email=email)):
             yield data["userDeleted"]
 
     async def access_token_deleted(self, ):
-        async for data in self.client.subscribe(('subscription{accessTokenDeleted()}' % ()).replace('()', '')):
+        async for data in self.client.subscribe('subscription{accessTokenDeleted}'):
             yield data["accessTokenDeleted"]
 
     async def notification_deleted(self, thing_id=undefined, id=undefined):
-        thingId_arg = parse_arg("thingId", thing_id)
-        id_arg = parse_arg("id", id)
-
-        async for data in self.client.subscribe(('subscription{notificationDeleted(%s%s)}' % (thingId_arg, id_arg)).replace('()', '')):
+        async for data in self.client.subscribe('subscription($thingId:ID,$id:ID){notificationDeleted(thingId:$thingId,id:$id)}', variables=parse_variables(thingId=thing_id, id=id)):
             yield data["notificationDeleted"]
 
     async def keep_online(self, thing_id):
-        thingId_arg = parse_arg("thingId", thing_id)
-
-        async for data in self.client.subscribe(('subscription{keepOnline(%s)}' % (thingId_arg)).replace('()', '')):
+        async for data in self.client.subscribe('subscription($thingId:ID!){keepOnline(thingId:$thingId)}', variables=parse_variables(thingId=thing_id)):
             yield data["keepOnline"]
@@ -0,0 +1,2 @@
+from igloo.testing.store import Store, StoreError, seed
+from igloo.testing.server import StandInServer
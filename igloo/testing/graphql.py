@@ -0,0 +1,232 @@
+import re
+
+# just enough GraphQL to run the documents the SDK sends: operations with
+# variables, nested selections, aliases and arguments, no fragments
+
+_token = re.compile(r'''
+    (?P<ignored>[\s,\ufeff]+|\#[^\n]*) |
+    (?P<punctuator>\.\.\.|[!$():=@\[\]{}|]) |
+    (?P<name>[_A-Za-z][_0-9A-Za-z]*) |
+    (?P<number>-?\d+(?:\.\d+)?(?:[eE][+-]?\d+)?) |
+    (?P<string>"(?:[^"\\\n]|\\.)*")
+''', re.VERBOSE)
+
+_escapes = {'"': '"', '\\': '\\', '/': '/', 'b': '\b', 'f': '\f', 'n': '\n', 'r': '\r', 't': '\t'}
+
+
+class GraphQLSyntaxError(Exception):
+    pass
+
+
+class Field:
+    def __init__(self, name, alias=None, arguments=None, selections=None):
+        self.name = name
+        self.alias = alias
+        self.arguments = arguments or {}
+        self.selections = selections
+
+    @property
+    def key(self):
+        return self.alias or self.name
+
+
+class Variable:
+    def __init__(self, name):
+        self.name = name
+
+
+class Operation:
+    def __init__(self, operation, name, variable_definitions, selections):
+        self.operation = operation
+        self.name = name
+        self.variable_definitions = variable_definitions
+        self.selections = selections
+
+    def coerce_variables(self, variables):
+        variables = dict(variables or {})
+        for name, (type_name, default) in self.variable_definitions.items():
+            if name not in variables and default is not None:
+                variables[name] = default
+            if variables.get(name) is None and type_name.endswith("!"):
+                raise GraphQLSyntaxError(
+                    'Variable "${}" of required type "{}" was not provided.'.format(name, type_name))
+
+        return variables
+
+
+def _tokenize(source):
+    tokens = []
+    position = 0
+    while position < len(source):
+        match = _token.match(source, position)
+        if match is None:
+            raise GraphQLSyntaxError("Unexpected character {!r} at {}".format(source[position], position))
+
+        kind = match.lastgroup
+        if kind != "ignored":
+            tokens.append((kind, match.group(kind)))
+        position = match.end()
+
+    return tokens
+
+
+class _Parser:
+    def __init__(self, source):
+        self.tokens = _tokenize(source)
+        self.position = 0
+
+    def peek(self, value=None):
+        if self.position >= len(self.tokens):
+            return None if value is not None else (None, None)
+        token = self.tokens[self.position]
+        if value is not None:
+            return token[1] == value and token[0] != "string"
+        return token
+
+    def next(self, value=None):
+        kind, token = self.peek()
+        if kind is None or (value is not None and (token != value or kind == "string")):
+            raise GraphQLSyntaxError("Expected {!r}, found {!r}".format(value or "token", token))
+        self.position += 1
+        return kind, token
+
+    def name(self):
+        kind, token = self.next()
+        if kind != "name":
+            raise GraphQLSyntaxError("Expected a name, found {!r}".format(token))
+        return token
+
+    def document(self):
+        operation = "query"
+        name = None
+        variable_definitions = {}
+
+        if not self.peek("{"):
+            operation = self.name()
+            if operation not in ("query", "mutation", "subscription"):
+                raise GraphQLSyntaxError("Unsupported definition {!r}".format(operation))
+            if self.peek()[0] == "name":
+                name = self.name()
+            if self.peek("("):
+                variable_definitions = self.variable_definitions()
+
+        selections = self.selection_set()
+        if self.peek()[0] is not None:
+            raise GraphQLSyntaxError("Only documents with a single operation are supported")
+
+        return Operation(operation, name, variable_definitions, selections)
+
+    def variable_definitions(self):
+        definitions = {}
+        self.next("(")
+        while not self.peek(")"):
+            self.next("$")
+            name = self.name()
+            self.next(":")
+            type_name = self.type_reference()
+            default = None
+            if self.peek("="):
+                self.next("=")
+                default = self.value(constant=True)
+            definitions[name] = (type_name, default)
+        self.next(")")
+
+        return definitions
+
+    def type_reference(self):
+        if self.peek("["):
+            self.next("[")
+            type_name = "[" + self.type_reference() + "]"
+            self.next("]")
+        else:
+            type_name = self.name()
+
+        if self.peek("!"):
+            self.next("!")
+            type_name += "!"
+
+        return type_name
+
+    def selection_set(self):
+        selections = []
+        self.next("{")
+        while not self.peek("}"):
+            if self.peek("..."):
+                raise GraphQLSyntaxError("Fragments are not supported by the stand-in server")
+            selections.append(self.field())
+        self.next("}")
+
+        return selections
+
+    def field(self):
+        alias = None
+        name = self.name()
+        if self.peek(":"):
+            self.next(":")
+            alias, name = name, self.name()
+
+        arguments = {}
+        if self.peek("("):
+            self.next("(")
+            while not self.peek(")"):
+                argument = self.name()
+                self.next(":")
+                arguments[argument] = self.value()
+            self.next(")")
+
+        selections = self.selection_set() if self.peek("{") else None
+        return Field(name, alias, arguments, selections)
+
+    def value(self, constant=False):
+        kind, token = self.peek()
+        if token == "$" and kind == "punctuator" and not constant:
+            self.next("$")
+            return Variable(self.name())
+        elif token == "[" and kind == "punctuator":
+            self.next("[")
+            values = []
+            while not self.peek("]"):
+                values.append(self.value(constant))
+            self.next("]")
+            return values
+        elif token == "{" and kind == "punctuator":
+            self.next("{")
+            values = {}
+            while not self.peek("}"):
+                key = self.name()
+                self.next(":")
+                values[key] = self.value(constant)
+            self.next("}")
+            return values
+
+        self.next()
+        if kind == "number":
+            return float(token) if any(c in token for c in ".eE") else int(token)
+        elif kind == "string":
+            return re.sub(r'\\u([0-9a-fA-F]{4})|\\(.)',
+                          lambda m: chr(int(m.group(1), 16)) if m.group(1) else _escapes.get(m.group(2), m.group(2)),
+                          token[1:-1])
+        elif kind == "name":
+            return {"true": True, "false": False, "null": None}.get(token, token)
+
+        raise GraphQLSyntaxError("Unexpected {!r}".format(token))
+
+
+def parse(source):
+    return _Parser(source).document()
+
+
+def resolve_arguments(arguments, variables):
+    def resolve(value):
+        if isinstance(value, Variable):
+            return variables.get(value.name)
+        elif isinstance(value, list):
+            return [resolve(v) for v in value]
+        elif isinstance(value, dict):
+            return {k: resolve(v) for k, v in value.items()}
+        return value
+
+    # an argument bound to a variable that was not provided is left out, so
+    # e.g. update mutations only change the fields they were given
+    return {name: resolve(value) for name, value in arguments.items()
+            if not isinstance(value, Variable) or value.name in variables}
@@ -0,0 +1,263 @@
+import asyncio
+import hashlib
+import json
+from aiohttp import web, WSMsgType
+from igloo.event_loop import BackgroundLoop
+from igloo.testing.graphql import parse, resolve_arguments, GraphQLSyntaxError
+from igloo.testing.store import Store, StoreError
+
+
+class _RequestError(Exception):
+    def __init__(self, message, code=None):
+        super().__init__(message)
+        self.code = code
+
+    def as_response(self):
+        error = {"message": str(self)}
+        if self.code is not None:
+            error["extensions"] = {"code": self.code}
+        return {"errors": [error]}
+
+
+class _Subscription:
+    def __init__(self, websocket, id, operation, variables):
+        self.websocket = websocket
+        self.id = id
+        self.operation = operation
+        self.variables = variables
+        self.field = operation.selections[0]
+        self.arguments = resolve_arguments(self.field.arguments, variables)
+
+
+class StandInServer:
+    def __init__(self, store=None, latency=0, host="127.0.0.1", port=0, persisted_queries=True,
+                 batching=True, keepalive=10):
+        # latency is a number of seconds or a function taking the payload
+        # and returning one, it is waited before answering each request
+        self.store = store if store is not None else Store()
+        self.latency = latency
+        self.host = host
+        self.port = port
+        self.persisted_queries = persisted_queries
+        self.batching = batching
+        self.keepalive = keepalive
+
+        self.requests = 0
+        self.operations = 0
+        self._documents = {}
+        self._parsed = {}
+        self._subscriptions = {}
+        self._loop = BackgroundLoop("igloo-stand-in")
+        self._runner = None
+
+    @property
+    def url(self):
+        return "http://{}:{}/graphql".format(self.host, self.port)
+
+    @property
+    def subscriptions_url(self):
+        return "ws://{}:{}/subscriptions".format(self.host, self.port)
+
+    def client(self, token="stand-in-token", **kwargs):
+        from igloo.main import Client
+        return Client(token, url=self.url, subscriptions_url=self.subscriptions_url, **kwargs)
+
+    def start(self):
+        self._loop.run(self._start())
+        self.store.add_listener(self._on_event)
+        return self
+
+    async def _start(self):
+        app = web.Application()
+        app.router.add_post("/graphql", self._handle_http)
+        app.router.add_get("/subscriptions", self._handle_websocket)
+
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.port = self._runner.addresses[0][1]
+
+    def stop(self):
+        if self._runner is None:
+            return
+
+        self.store.remove_listener(self._on_event)
+        self._loop.run(self._runner.cleanup())
+        self._runner = None
+        self._loop.stop()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    async def _delay(self, payload):
+        latency = self.latency(payload) if callable(self.latency) else self.latency
+        if latency:
+            await asyncio.sleep(latency)
+
+    # execution
+
+    def _document(self, payload):
+        persisted = (payload.get("extensions") or {}).get("persistedQuery")
+        query = payload.get("query")
+        if persisted is None:
+            if query is None:
+                raise _RequestError("Must provide query string.")
+            return query
+        elif not self.persisted_queries:
+            raise _RequestError("PersistedQueryNotSupported", "PERSISTED_QUERY_NOT_SUPPORTED")
+
+        sha = persisted.get("sha256Hash")
+        if query is None:
+            if sha not in self._documents:
+                raise _RequestError("PersistedQueryNotFound", "PERSISTED_QUERY_NOT_FOUND")
+            return self._documents[sha]
+        elif hashlib.sha256(query.encode("utf-8")).hexdigest() != sha:
+            raise _RequestError("provided sha does not match query")
+
+        self._documents[sha] = query
+        return query
+
+    def _parse(self, query):
+        operation = self._parsed.get(query)
+        if operation is None:
+            operation = self._parsed[query] = parse(query)
+        return operation
+
+    def execute(self, payload):
+        self.operations += 1
+        try:
+            operation = self._parse(self._document(payload))
+            if operation.operation == "subscription":
+                raise _RequestError("Subscriptions are only served over websockets")
+
+            variables = operation.coerce_variables(payload.get("variables"))
+            data = {}
+            for field in operation.selections:
+                arguments = resolve_arguments(field.arguments, variables)
+                if operation.operation == "mutation":
+                    value = self.store.mutate(field.name, arguments)
+                else:
+                    value = self.store.query(field.name, arguments)
+                data[field.key] = self.store.select(value, field.selections, variables, resolve_arguments)
+
+            return {"data": data}
+        except _RequestError as e:
+            return e.as_response()
+        except (GraphQLSyntaxError, StoreError) as e:
+            return {"errors": [{"message": str(e)}]}
+
+    async def _handle_http(self, request):
+        self.requests += 1
+        # aiohttp already undoes gzip and deflate request bodies
+        body = await request.read()
+
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            return web.json_response({"errors": [{"message": "Invalid JSON body"}]}, status=400)
+
+        await self._delay(payload)
+        if isinstance(payload, list):
+            if not self.batching:
+                return web.json_response({"errors": [{"message": "Batching is not enabled"}]}, status=400)
+            result = [self.execute(p) for p in payload]
+        else:
+            result = self.execute(payload)
+
+        response = web.json_response(result)
+        if len(response.body) > 1024:
+            response.enable_compression()
+        return response
+
+    # subscriptions, over the graphql-ws protocol
+
+    async def _keepalive(self, websocket):
+        while not websocket.closed:
+            await asyncio.sleep(self.keepalive)
+            await websocket.send_json({"type": "ka"})
+
+    async def _handle_websocket(self, request):
+        websocket = web.WebSocketResponse(protocols=("graphql-ws",))
+        await websocket.prepare(request)
+        subscriptions = self._subscriptions[websocket] = {}
+        keepalive = None
+
+        try:
+            async for message in websocket:
+                if message.type != WSMsgType.TEXT:
+                    continue
+
+                message = json.loads(message.data)
+                if message.get("type") == "connection_init":
+                    await self._delay(message)
+                    await websocket.send_json({"type": "connection_ack"})
+                    if self.keepalive:
+                        keepalive = asyncio.ensure_future(self._keepalive(websocket))
+                elif message.get("type") == "start":
+                    await self._start_subscription(websocket, subscriptions, message)
+                elif message.get("type") == "stop":
+                    subscription = subscriptions.pop(message.get("id"), None)
+                    if subscription is not None:
+                        self._end_subscription(subscription)
+                    await websocket.send_json({"type": "complete", "id": message.get("id")})
+                elif message.get("type") == "connection_terminate":
+                    break
+        finally:
+            if keepalive is not None:
+                keepalive.cancel()
+            for subscription in self._subscriptions.pop(websocket, {}).values():
+                self._end_subscription(subscription)
+
+        return websocket
+
+    async def _start_subscription(self, websocket, subscriptions, message):
+        id = message.get("id")
+        payload = message.get("payload") or {}
+        try:
+            operation = self._parse(self._document(payload))
+            variables = operation.coerce_variables(payload.get("variables"))
+        except _RequestError as e:
+            return await websocket.send_json({"type": "error", "id": id, "payload": e.as_response()["errors"][0]})
+        except GraphQLSyntaxError as e:
+            return await websocket.send_json({"type": "error", "id": id, "payload": {"message": str(e)}})
+
+        if operation.operation != "subscription":
+            await websocket.send_json({"type": "data", "id": id, "payload": self.execute(payload)})
+            return await websocket.send_json({"type": "complete", "id": id})
+
+        subscription = subscriptions[id] = _Subscription(websocket, id, operation, variables)
+        if subscription.field.name == "keepOnline":
+            self.store.update(subscription.arguments["thingId"], online=True)
+
+    def _end_subscription(self, subscription):
+        if subscription.field.name == "keepOnline":
+            try:
+                self.store.update(subscription.arguments["thingId"], online=False)
+            except StoreError:
+                pass
+
+    def _on_event(self, event, record):
+        # mutations can come from any thread, e.g. tests changing the store
+        # directly, the websockets are only touched from the server's loop
+        loop = self._loop.loop
+        if loop is not None and self._subscriptions:
+            loop.call_soon_threadsafe(self._dispatch, event, dict(record))
+
+    def _dispatch(self, event, record):
+        for subscriptions in self._subscriptions.values():
+            for subscription in subscriptions.values():
+                field = subscription.field
+                if field.name != event or not self.store.matches(record, subscription.arguments):
+                    continue
+
+                if event.endswith("Deleted"):
+                    value = record["id"]
+                else:
+                    value = self.store.select(record, field.selections, subscription.variables, resolve_arguments)
+
+                asyncio.ensure_future(subscription.websocket.send_json(
+                    {"type": "data", "id": subscription.id, "payload": {"data": {field.key: value}}}))
@@ -0,0 +1,272 @@
+import datetime
+import threading
+import uuid
+
+VARIABLE_TYPES = ("FloatVariable", "StringVariable", "BooleanVariable", "FloatSeriesVariable")
+
+# relations hold the id of another record, lists are the records of a type
+# pointing back at this one and counts their length
+SCHEMA = {
+    "User": {
+        "relations": {},
+        "lists": {"environments": ("Environment", "owner"),
+                  "developerThings": ("Thing", "producer")},
+        "counts": {"environmentCount": "environments",
+                   "developerThingCount": "developerThings"},
+    },
+    "Environment": {
+        "relations": {"owner": "User"},
+        "lists": {"things": ("Thing", "environment")},
+        "counts": {"thingCount": "things"},
+    },
+    "Thing": {
+        "relations": {"environment": "Environment", "producer": "User"},
+        "lists": {"values": (VARIABLE_TYPES, "thing"),
+                  "notifications": ("Notification", "thing")},
+        "counts": {"valueCount": "values",
+                   "notificationCount": "notifications"},
+    },
+    "FloatVariable": {"relations": {"thing": "Thing"}},
+    "StringVariable": {"relations": {"thing": "Thing"}},
+    "BooleanVariable": {"relations": {"thing": "Thing"}},
+    "FloatSeriesVariable": {
+        "relations": {"thing": "Thing"},
+        "lists": {"nodes": ("FloatSeriesNode", "series")},
+        "counts": {"nodeCount": "nodes"},
+    },
+    "FloatSeriesNode": {"relations": {"series": "FloatSeriesVariable", "thing": "Thing"}},
+    "Notification": {"relations": {"thing": "Thing"}},
+}
+
+# the name subscription events are published under
+EVENT_PREFIXES = {typename: "variable" if typename in VARIABLE_TYPES else typename[0].lower() + typename[1:]
+                  for typename in SCHEMA}
+
+
+class StoreError(Exception):
+    pass
+
+
+def _now():
+    return datetime.datetime.now(datetime.timezone.utc).isoformat()
+
+
+def _root_field(typename):
+    return typename[0].lower() + typename[1:]
+
+
+class Store:
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._records = {}
+        self._listeners = []
+        self.viewer = self.add("User", name="Stand-in user", email="user@example.com",
+                               maxThroughput=1000000, usedThroughput=0)
+
+    def add(self, typename, id=None, **fields):
+        if typename not in SCHEMA:
+            raise StoreError("Unknown type {}".format(typename))
+
+        record = {"id": id or str(uuid.uuid4()), "__typename": typename,
+                  "createdAt": _now(), "updatedAt": _now()}
+        if typename == "FloatSeriesNode" and "series" in fields and "thing" not in fields:
+            fields["thing"] = self.get(fields["series"])["thing"]
+        record.update(fields)
+
+        with self._lock:
+            self._records[record["id"]] = record
+        self._publish("Created", record)
+        return record["id"]
+
+    def get(self, id, typename=None):
+        record = self._records.get(id)
+        if record is None or (typename is not None and record["__typename"] not in
+                              (typename if isinstance(typename, tuple) else (typename,))):
+            return None
+        return record
+
+    def update(self, id, **fields):
+        with self._lock:
+            record = self._records.get(id)
+            if record is None:
+                raise StoreError("{} not found".format(id))
+            record.update(fields)
+            record["updatedAt"] = _now()
+        self._publish("Updated", record)
+        return record
+
+    def delete(self, id):
+        with self._lock:
+            record = self._records.pop(id, None)
+        if record is None:
+            raise StoreError("{} not found".format(id))
+        self._publish("Deleted", record)
+        return record
+
+    def find(self, typename, **fields):
+        typenames = typename if isinstance(typename, tuple) else (typename,)
+        with self._lock:
+            records = list(self._records.values())
+
+        return [record for record in records if record["__typename"] in typenames and
+                all(record.get(key) == value for key, value in fields.items())]
+
+    def __len__(self):
+        return len(self._records)
+
+    def add_listener(self, listener):
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener):
+        self._listeners.remove(listener)
+
+    def _publish(self, kind, record):
+        event = EVENT_PREFIXES[record["__typename"]] + kind
+        for listener in list(self._listeners):
+            listener(event, record)
+
+    # field resolution
+
+    def _list(self, record, name, arguments):
+        typename, backref = SCHEMA[record["__typename"]]["lists"][name]
+        records = self.find(typename, **{backref: record["id"]})
+
+        # only equality on top level fields, which is what the SDK filters on
+        for key, value in (arguments.get("filter") or {}).items():
+            if not isinstance(value, dict):
+                records = [r for r in records if r.get(key) == value]
+
+        if typename == "FloatSeriesNode":
+            records.sort(key=lambda r: r.get("timestamp") or "", reverse=True)
+        else:
+            records.sort(key=lambda r: (r.get("index") or 0, r["createdAt"]))
+
+        offset = arguments.get("offset") or 0
+        limit = arguments.get("limit")
+        return records[offset:] if limit is None else records[offset:offset + limit]
+
+    def resolve_field(self, record, name, arguments):
+        schema = SCHEMA[record["__typename"]]
+        if name == "__typename":
+            return record["__typename"]
+        elif name in schema.get("relations", {}):
+            return self.get(record.get(name))
+        elif name in schema.get("lists", {}):
+            return self._list(record, name, arguments)
+        elif name in schema.get("counts", {}):
+            return len(self._list(record, schema["counts"][name], {"filter": arguments.get("filter")}))
+        elif name == "lastNotification" and record["__typename"] == "Thing":
+            notifications = self._list(record, "notifications", {})
+            return max(notifications, key=lambda r: r.get("timestamp") or "", default=None)
+        elif name == "lastNode" and record["__typename"] == "FloatSeriesVariable":
+            nodes = self._list(record, "nodes", {"limit": 1})
+            return nodes[0] if nodes else None
+        elif name == "myRole":
+            return record.get("myRole", "OWNER")
+
+        return record.get(name)
+
+    def select(self, value, selections, variables, resolve_arguments):
+        if value is None or selections is None:
+            return value
+        elif isinstance(value, list):
+            return [self.select(v, selections, variables, resolve_arguments) for v in value]
+
+        result = {}
+        for field in selections:
+            arguments = resolve_arguments(field.arguments, variables)
+            result[field.key] = self.select(self.resolve_field(value, field.name, arguments),
+                                            field.selections, variables, resolve_arguments)
+        return result
+
+    # root fields
+
+    def query(self, name, arguments):
+        if name == "user":
+            if arguments.get("email") is not None:
+                users = self.find("User", email=arguments["email"])
+                return users[0] if users else None
+            return self.get(arguments.get("id") or self.viewer, "User")
+        elif name == "variable":
+            return self.get(arguments.get("id"), VARIABLE_TYPES)
+
+        for typename in SCHEMA:
+            if _root_field(typename) == name:
+                return self.get(arguments.get("id"), typename)
+
+        raise StoreError('Cannot query field "{}" on the stand-in server'.format(name))
+
+    def _relation_fields(self, typename, arguments):
+        # thingId: "..." sets the thing relation, and so on
+        fields = {}
+        relations = SCHEMA[typename].get("relations", {})
+        for key, value in arguments.items():
+            if key.endswith("Id") and key[:-2] in relations:
+                fields[key[:-2]] = value
+            elif key != "id":
+                fields[key] = value
+        return fields
+
+    def mutate(self, name, arguments):
+        for typename in SCHEMA:
+            if name == "create" + typename:
+                return self.get(self.add(typename, **self._relation_fields(typename, arguments)))
+            elif name == "update" + typename:
+                if self.get(arguments.get("id"), typename) is None:
+                    raise StoreError("{} not found".format(arguments.get("id")))
+                return self.update(arguments["id"], **self._relation_fields(typename, arguments))
+            elif name == "delete" + typename:
+                return self.delete(arguments["id"])["id"]
+
+        if name == "updateVariable":
+            if self.get(arguments.get("id"), VARIABLE_TYPES) is None:
+                raise StoreError("{} not found".format(arguments.get("id")))
+            return self.update(arguments["id"], **self._relation_fields("FloatVariable", arguments))
+        elif name == "deleteVariable":
+            return self.delete(arguments["id"])["id"]
+        elif name == "incrementFloatVariable":
+            record = self.get(arguments["id"], "FloatVariable")
+            return self.update(record["id"], value=(record.get("value") or 0) + arguments["incrementBy"])
+        elif name == "moveThing":
+            record = self.update(arguments["thingId"], environment=arguments["newEnvironmentId"])
+            self._publish("Moved", record)
+            return record
+
+        raise StoreError('Cannot query field "{}" on the stand-in server'.format(name))
+
+    def matches(self, record, arguments):
+        # subscription arguments filter events: environmentId compares with
+        # the environment relation, id with the id and so on
+        for key, value in arguments.items():
+            if value is None:
+                continue
+            field = key[:-2] if key.endswith("Id") and key != "id" else key
+            if record.get(field) != value:
+                return False
+        return True
+
+
+def seed(store, environments=1, things=10, variables=4, nodes=0):
+    # a user with `environments` environments, each with `things` things
+    # carrying `variables` float variables; nodes > 0 adds a float series
+    # with that many nodes to every thing
+    for e in range(environments):
+        environment = store.add("Environment", owner=store.viewer, name="Environment {}".format(e), index=e)
+        for t in range(things):
+            thing = store.add("Thing", environment=environment, producer=store.viewer,
+                              name="Thing {}".format(t), index=t, online=True, battery=100.0,
+                              batteryCharging=False, signal=90, firmware="1.0", muted=False,
+                              starred=False, type="stand-in", storedNotifications=10)
+            for v in range(variables):
+                store.add("FloatVariable", thing=thing, name="Variable {}".format(v), index=v,
+                          value=float(v), hidden=False, developerOnly=False, userPermission="READ_WRITE",
+                          min=0.0, max=100.0, precision=0.1, unitOfMeasurement="")
+            if nodes:
+                series = store.add("FloatSeriesVariable", thing=thing, name="Series", index=variables,
+                                   hidden=False, developerOnly=False, shownNodes=nodes, storedNodes=nodes)
+                start = datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc)
+                for n in range(nodes):
+                    store.add("FloatSeriesNode", series=series, value=float(n),
+                              timestamp=(start + datetime.timedelta(minutes=n)).isoformat())
+
+    return store
@@ -0,0 +1,73 @@
+import time
+
+
+class DeadlineExceeded(TimeoutError):
+    pass
+
+
+class Timeout:
+    def __init__(self, connect=None, read=None, total=None):
+        # connect covers opening the connection (and the websocket
+        # handshake), read the wait for each response, total the whole call
+        # including retries; None means no limit
+        self.connect = connect
+        self.read = read
+        self.total = total
+
+    def start(self):
+        return Deadline(self)
+
+    def __repr__(self):
+        return "Timeout(connect={}, read={}, total={})".format(self.connect, self.read, self.total)
+
+
+def get_timeout(timeout, default=None):
+    if timeout is None:
+        return default if default is not None else Timeout()
+    elif isinstance(timeout, Timeout):
+        return timeout
+
+    # a bare number is a deadline for the whole call
+    return Timeout(connect=timeout, read=timeout, total=timeout)
+
+
+class Deadline:
+    def __init__(self, timeout):
+        self.timeout = timeout
+        self.expires = None if timeout.total is None else time.monotonic() + timeout.total
+
+    def remaining(self):
+        if self.expires is None:
+            return None
+        return max(0.0, self.expires - time.monotonic())
+
+    def expired(self):
+        return self.expires is not None and time.monotonic() >= self.expires
+
+    def check(self):
+        if self.expired():
+            raise DeadlineExceeded("The request did not complete within {}s".format(self.timeout.total))
+
+    def _bound(self, value):
+        remaining = self.remaining()
+        if remaining is None:
+            return value
+        elif value is None:
+            return remaining
+        return min(value, remaining)
+
+    @property
+    def connect(self):
+        return self._bound(self.timeout.connect)
+
+    @property
+    def read(self):
+        return self._bound(self.timeout.read)
+
+    @property
+    def total(self):
+        return self.remaining()
+
+    def allows(self, delay):
+        remaining = self.remaining()
+        return remaining is None or delay < remaining
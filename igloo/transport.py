@@ -0,0 +1,180 @@
+import asyncio
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from aiohttp import ClientConnectionError, ClientSession, ClientTimeout, TCPConnector
+
+
+class SyncTransport:
+    # errors after which the same request may succeed if sent again
+    transient_errors = (requests.ConnectionError, requests.Timeout)
+    # the transient errors raised when a connect or read timeout expires
+    timeout_errors = (requests.Timeout,)
+
+    def __init__(self, pool_connections=10, pool_maxsize=10, pool_block=False, max_idle_time=60):
+        # pool_connections is the number of hosts we keep a pool for,
+        # pool_maxsize is the number of keep-alive connections per host
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.pool_block = pool_block
+        self.max_idle_time = max_idle_time
+
+        self._lock = threading.Lock()
+        self._session = None
+        self._in_flight = 0
+        self._last_used = time.monotonic()
+
+    def _new_session(self):
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.pool_connections,
+                              pool_maxsize=self.pool_maxsize,
+                              pool_block=self.pool_block)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+
+        return session
+
+    def _is_idle(self):
+        return self.max_idle_time is not None and \
+            self._in_flight == 0 and \
+            time.monotonic() - self._last_used > self.max_idle_time
+
+    def _acquire(self):
+        with self._lock:
+            if self._session is not None and self._is_idle():
+                # the server has most likely dropped the idle sockets already,
+                # start from a clean pool instead of discovering it one by one
+                self._session.close()
+                self._session = None
+
+            if self._session is None:
+                self._session = self._new_session()
+
+            self._in_flight += 1
+            return self._session
+
+    def _release(self):
+        with self._lock:
+            self._in_flight -= 1
+            self._last_used = time.monotonic()
+
+    def reap_idle(self):
+        with self._lock:
+            if self._session is not None and self._is_idle():
+                self._session.close()
+                self._session = None
+                return True
+
+        return False
+
+    def post(self, url, data, headers, connect_timeout=None, read_timeout=None):
+        session = self._acquire()
+        try:
+            # requests has no total timeout, the read timeout applies to
+            # each read from the socket
+            return session.post(url, data=data, headers=headers,
+                                timeout=(connect_timeout, read_timeout))
+        finally:
+            self._release()
+
+    def wire_size(self, response):
+        # urllib3 counts the bytes read from the socket, before decoding
+        return response.raw.tell() or len(response.content)
+
+    def close(self):
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+
+
+class AsyncTransport:
+    transient_errors = (ClientConnectionError, asyncio.TimeoutError)
+    timeout_errors = (asyncio.TimeoutError,)
+
+    def __init__(self, limit=100, limit_per_host=0, keepalive_timeout=15, ttl_dns_cache=10):
+        # limit_per_host=0 means no limit other than the global one
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.ttl_dns_cache = ttl_dns_cache
+
+        self._session = None
+        self._loop = None
+        self._guard = None
+
+    @property
+    def session(self):
+        return self._session
+
+    async def _get_session(self):
+        loop = asyncio.get_running_loop()
+
+        # aiohttp sessions are bound to the loop they are created in, so a
+        # client reused across asyncio.run calls needs a fresh one
+        if self._session is None or self._session.closed or self._loop is not loop:
+            if self._loop is not loop:
+                self._close_elsewhere(self._session, self._loop)
+
+            connector = TCPConnector(limit=self.limit,
+                                     limit_per_host=self.limit_per_host,
+                                     keepalive_timeout=self.keepalive_timeout,
+                                     ttl_dns_cache=self.ttl_dns_cache)
+            self._session = ClientSession(connector=connector)
+            self._loop = loop
+
+            # asyncio.run closes the async generators left open before it
+            # closes the loop, the session goes with its guard then
+            self._guard = _close_at_shutdown(self._session)
+            await self._guard.__anext__()
+
+        return self._session
+
+    async def post(self, url, data, headers, connect_timeout=None, read_timeout=None, total_timeout=None):
+        session = await self._get_session()
+        timeout = ClientTimeout(total=total_timeout, sock_connect=connect_timeout, sock_read=read_timeout)
+
+        # if the caller is cancelled halfway through, leaving the block closes
+        # the connection instead of returning a half read one to the pool
+        async with session.post(url, data=data, headers=headers, timeout=timeout) as response:
+            # read the body before the connection goes back to the pool
+            body = await response.read()
+
+        return response, body
+
+    def wire_size(self, response, body):
+        # older aiohttp versions only know the decoded size
+        return getattr(response.content, "total_raw_bytes", None) or len(body)
+
+    async def close(self):
+        session, self._session, self._loop, self._guard = self._session, None, None, None
+
+        if session is not None and not session.closed:
+            await session.close()
+
+    def close_nowait(self):
+        session, loop = self._session, self._loop
+        self._session, self._loop, self._guard = None, None, None
+
+        if session is None or session.closed or loop.is_closed():
+            return
+
+        if loop.is_running():
+            asyncio.run_coroutine_threadsafe(session.close(), loop)
+        else:
+            loop.run_until_complete(session.close())
+
+    def _close_elsewhere(self, session, loop):
+        # the session of another loop can only be closed from it: if that
+        # loop has ended its guard closed it already, if it is idle the
+        # dropped guard is closed the next time it runs
+        if session is not None and not session.closed and loop.is_running():
+            asyncio.run_coroutine_threadsafe(session.close(), loop)
+
+
+async def _close_at_shutdown(session):
+    try:
+        yield
+    finally:
+        await session.close()
@@ -49,3 +49,25 @@ def get_representation(arg_value, is_enum=False):
         return '"%s"' % arg_value.isoformat()
     else:
         return str(arg_value)
+
+
+def parse_variables(**kwargs):
+    # undefined arguments are left out of the payload, graphql then treats
+    # them as not passed at all
+    variables = {}
+    for name, value in kwargs.items():
+        if not isinstance(value, _Undefined):
+            variables[name] = get_variable_value(value)
+
+    return variables
+
+
+def get_variable_value(value):
+    if isinstance(value, dict):
+        return {key: get_variable_value(item) for key, item in value.items()}
+    elif isinstance(value, list):
+        return [get_variable_value(item) for item in value]
+    elif isinstance(value, datetime):
+        return value.isoformat()
+    else:
+        return value
@@ -8,7 +8,7 @@ with open(path.join(this_directory, 'README.md'), encoding='utf-8') as f:
 
 setuptools.setup(
     name='igloo-python',
-    packages=['igloo', 'igloo.models'],
+    packages=['igloo', 'igloo.models', 'igloo.testing'],
     version='1.0.15',
     license='MIT',
     description='Python SDK for Igloo',
@@ -21,6 +21,9 @@ setuptools.setup(
     install_requires=[
         'requests', 'asyncio', 'pathlib', 'websockets', 'aiodataloader', 'aiohttp'
     ],
+    extras_require={
+        'fast': ['orjson'],
+    },
     classifiers=[
         'Development Status :: 5 - Production/Stable',
         'Intended Audience :: Developers',